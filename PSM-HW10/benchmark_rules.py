@@ -0,0 +1,71 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from l_system import compile_rules
+from productions import LSystem
+
+# Rewriting throughput of the compiled rule table of productions.py in symbols per second (symbols written over
+# all generations, divided by the time), for each kind of rule set of plants.json, grown to about a million
+# symbols. For the deterministic plant also the per-character dict lookup the scripts started from, and
+# str.translate (l_system.expand), which only handles deterministic context-free rules.
+
+config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plants.json')
+iterations = {'plant': 9, 'stochastic': 10, 'parametric': 20, 'context': 44}
+
+
+def dict_per_char(axiom, rules, iterations):
+    word, written = axiom, 0
+    for _ in range(iterations):
+        word = ''.join([rules.get(char, char) for char in word])
+        written += len(word)
+    return written, len(word)
+
+
+def translate(axiom, rules, iterations):
+    table = compile_rules(rules)
+    word, written = axiom, 0
+    for _ in range(iterations):
+        word = word.translate(table)
+        written += len(word)
+    return written, len(word)
+
+
+def rewrite(system, iterations):
+    rng = np.random.default_rng(system.seed)
+    codes, params = system.axiom, system.axiom_params
+    written = 0
+    for _ in range(iterations):
+        codes, params = system.rules.rewrite(codes, params, rng)
+        written += len(codes)
+    return written, len(codes)
+
+
+def throughput(function, *args):
+    start = time.perf_counter()
+    written, final = function(*args)
+    elapsed = time.perf_counter() - start
+    return elapsed, written, final
+
+
+if __name__ == "__main__":
+    with open(config) as file:
+        settings = json.load(file)
+    # Deeper parametric plant: the config stops branching at s < 5
+    settings['parametric']['productions'][0]['condition'] = 's >= 1e-3'
+
+    print(f"{'rule set':>12} {'method':>14} {'generations':>11} {'final length':>12} {'time (s)':>9} "
+          f"{'symbols/s':>10}")
+    for name, n in iterations.items():
+        options = dict(settings[name])
+        system = LSystem(options.pop('axiom'), options.pop('productions'), **options)
+        elapsed, written, final = throughput(rewrite, system, n)
+        print(f"{name:>12} {'rule table':>14} {n:>11} {final:>12} {elapsed:>9.3f} {written / elapsed:>10.2e}")
+
+    rules = dict(production.split(' -> ') for production in settings['plant']['productions'])
+    n = iterations['plant']
+    for method, function in (('dict per char', dict_per_char), ('str.translate', translate)):
+        elapsed, written, final = throughput(function, settings['plant']['axiom'], rules, n)
+        print(f"{'plant':>12} {method:>14} {n:>11} {final:>12} {elapsed:>9.3f} {written / elapsed:>10.2e}")
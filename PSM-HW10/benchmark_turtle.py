@@ -0,0 +1,64 @@
+import math
+import time
+
+from l_system import RULES, expand_array
+from turtle_geometry import GeometryCache, compile_segments, rasterize, save_image
+
+# Time to turn the fractal plant into line segments and an 800x800 image: the vectorized compiler of
+# turtle_geometry.py (on the expanded word) and GeometryCache (no expansion, instanced subtrees) against a
+# Python loop doing the turtle's bookkeeping (what draw_l_system does before any drawing), for growing numbers
+# of iterations. The totals are from the axiom to the image: expansion, compiler and rasterizer, or GeometryCache
+# and rasterizer. The compiler is linear in the length of the word but with a dozen passes over it (bracket
+# matching, two cumulative sums for each of the turn count, x and y); for the million-segment plant only the
+# GeometryCache path stays well under a second. The largest plant is saved as plant.png. Then GeometryCache
+# with cache budgets too small to keep the largest subtrees, which are recomputed from smaller ones.
+
+iterations = [6, 7, 8, 9, 10]
+
+
+def walk(word, angle=25, length=1.0):
+    x, y, heading, stack, segments = 0.0, 0.0, math.radians(90), [], []
+    turn = math.radians(angle)
+    for symbol in word:
+        if symbol == 'F':
+            new_x, new_y = x + length * math.cos(heading), y + length * math.sin(heading)
+            segments.append((x, y, new_x, new_y))
+            x, y = new_x, new_y
+        elif symbol == '+':
+            heading -= turn
+        elif symbol == '-':
+            heading += turn
+        elif symbol == '[':
+            stack.append((x, y, heading))
+        elif symbol == ']':
+            x, y, heading = stack.pop()
+    return segments
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    print(f"{'iterations':>10} {'segments':>9} {'loop (s)':>9} {'expand (s)':>11} {'compile (s)':>12} "
+          f"{'cache (s)':>10} {'raster (s)':>11} {'compiled total':>15} {'cached total':>13} {'max difference':>15}")
+    for n in iterations:
+        expand_time, word = timed(expand_array, 'X', RULES, n)
+        compile_time, segments = timed(compile_segments, word)
+        cache_time, instanced = timed(GeometryCache(RULES).segments, 'X', n)
+        raster_time, image = timed(rasterize, instanced)
+        loop_time, _ = timed(walk, word.tobytes().decode('ascii'))
+        print(f"{n:>10} {len(segments):>9} {loop_time:>9.3f} {expand_time:>11.3f} {compile_time:>12.3f} "
+              f"{cache_time:>10.3f} {raster_time:>11.3f} {expand_time + compile_time + raster_time:>15.3f} "
+              f"{cache_time + raster_time:>13.3f} {abs(segments - instanced).max():>15.1e}")
+    save_image(image, 'plant.png')
+
+    n = iterations[-1]
+    print(f"\nGeometryCache, {n} iterations")
+    print(f"{'budget':>9} {'time (s)':>9} {'hits':>6} {'misses':>7} {'cached':>9}")
+    for budget in [2**22, 2**18, 2**14, 2**10]:
+        cache = GeometryCache(RULES, max_segments=budget)
+        elapsed, _ = timed(cache.segments, 'X', n)
+        print(f"{budget:>9} {elapsed:>9.3f} {cache.hits:>6} {cache.misses:>7} {cache.size:>9}")
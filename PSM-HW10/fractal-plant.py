@@ -1,5 +1,6 @@
 import turtle
 
+from l_system import WordSummary, iter_expand
 
 rules = {
     'X': 'F+[[X]-X]-F[-FX]+X',
@@ -12,20 +13,12 @@ iterations = 7  # Can be adjusted
 
 
 def generate_l_system(w, rules, iterations):
+    table = str.maketrans(rules)  # Characters without a rule are left as they are
     for _ in range(iterations):
-        new_w = ""
-        # Apply rules in parallel
-        for char in w:
-            new_w += rules.get(char, char)  # Default to the character itself if no rule applies
-        w = new_w
+        w = w.translate(table)  # Apply rules in parallel, in one pass over the word
     return w
 
 
-# Generate the L-system
-final_word = generate_l_system(initial_word, rules, iterations)
-print(final_word)
-
-
 def draw_l_system(instructions, angle, length):
     stack = []
     for command in instructions:
@@ -45,21 +38,27 @@ def draw_l_system(instructions, angle, length):
             turtle.pendown()
 
 
-# Set up the turtle environment
-turtle.setup(width=800, height=800)
-turtle.speed(0)  # Set speed to fastest
-turtle.tracer(500, 0)
+if __name__ == "__main__":
+    # The word is generated lazily while drawing (iter_expand), it is never held in memory as a whole.
+    # generate_l_system(initial_word, rules, iterations) still gives the full word when it is needed.
+    instructions = iter_expand(initial_word, rules, iterations)
+
+    # Size of the plant from the per-symbol summaries, without expanding the word: scale it to fit the window
+    xmin, ymin, xmax, ymax = WordSummary(rules, angle=25).bounds(initial_word, iterations)
+    length = min(700 / (ymax - ymin), 700 / (xmax - xmin))
 
-turtle.penup()
-turtle.goto(0, -350)  # Start near the bottom of the screen
-turtle.pendown()
-turtle.left(90)  # Orient the turtle to start pointing upwards
+    # Set up the turtle environment
+    turtle.setup(width=800, height=800)
+    turtle.speed(0)  # Set speed to fastest
+    turtle.tracer(500, 0)
 
-# Calculate length based on iterations to fit in the window
-length = 15 / (2 ** (iterations // 2))  # Scaling factor calculation
+    turtle.penup()
+    turtle.goto(-(xmin + xmax) / 2 * length, -350)  # Start near the bottom of the screen, plant centred
+    turtle.pendown()
+    turtle.left(90)  # Orient the turtle to start pointing upwards
 
-# Draw the L-system
-draw_l_system(final_word, 25, length)
+    # Draw the L-system
+    draw_l_system(instructions, 25, length)
 
-turtle.update()
-turtle.done()
+    turtle.update()
+    turtle.done()
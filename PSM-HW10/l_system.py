@@ -0,0 +1,215 @@
+import math
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Expansion of context-free L-systems like the fractal plant of fractal-plant.py / stole1.py, in time linear in
+# the length of the result. All productions of a generation are applied simultaneously:
+#   expand          - str.translate with a table compiled from the rules (one C-level pass per generation)
+#   expand_array    - the same on a NumPy array of symbol codes, output preallocated from the predicted length
+#   expand_parallel - the last generations of disjoint pieces of the word in worker processes, each writing its
+#                     part straight into a shared output buffer at the offset predicted for it
+#   iter_expand     - generator over the symbols of the final word, memory proportional to the number of
+#                     iterations instead of the word length (draw_l_system / FractalPlant.rysuj consume it as is)
+#   WordSummary     - segment count, convex hull / bounding box and end transform of the turtle path of any
+#                     (symbol, depth), memoized, so the size of a deep plant is known without expanding it
+# Symbols are single ASCII characters, symbols without a rule stay as they are.
+
+RULES = {
+    'X': 'F+[[X]-X]-F[-FX]+X',
+    'F': 'FF'
+}
+
+
+def compile_rules(rules):
+    # Translation table for str.translate
+    for symbol in rules:
+        if len(symbol) != 1:
+            raise ValueError(f"L-system symbols must be single characters, got {symbol!r}")
+    return str.maketrans(dict(rules))
+
+
+def expand(axiom, rules, iterations):
+    table = compile_rules(rules)
+    word = axiom
+    for _ in range(iterations):
+        word = word.translate(table)
+    return word
+
+
+def _production_arrays(rules):
+    # Code -> production (uint8 array) and code -> production length, for all 256 byte codes
+    productions = [np.array([code], dtype=np.uint8) for code in range(256)]
+    for symbol, production in rules.items():
+        productions[ord(symbol)] = np.frombuffer(production.encode('ascii'), dtype=np.uint8)
+    lengths = np.array([len(production) for production in productions], dtype=np.int64)
+    return productions, lengths
+
+
+def expanded_lengths(rules, iterations):
+    # (iterations + 1, 256) table: length of every symbol code after each number of generations
+    productions, lengths = _production_arrays(rules)
+    table = np.ones((iterations + 1, 256), dtype=np.int64)
+    for generation in range(1, iterations + 1):
+        previous = table[generation - 1]
+        table[generation] = [previous[production].sum() for production in productions]
+    return table
+
+
+def word_lengths(axiom, rules, iterations):
+    # Length of the word in every generation 0..iterations, without expanding it
+    codes = np.frombuffer(axiom.encode('ascii'), dtype=np.uint8)
+    return expanded_lengths(rules, iterations)[:, codes].sum(axis=1)
+
+
+def expand_array(axiom, rules, iterations):
+    # Returns the final word as a uint8 array of ASCII codes
+    productions, lengths = _production_arrays(rules)
+    word = np.frombuffer(axiom.encode('ascii'), dtype=np.uint8)
+    for _ in range(iterations):
+        ends = np.cumsum(lengths[word])
+        new_word = np.empty(ends[-1] if len(ends) else 0, dtype=np.uint8)
+        starts = ends - lengths[word]
+        for code in np.unique(word):
+            at = starts[word == code]
+            production = productions[code]
+            if len(production) == 1:
+                new_word[at] = production[0]
+            else:
+                new_word[at[:, None] + np.arange(len(production))] = production
+        word = new_word
+    return word
+
+
+def _expand_piece(piece, rules, iterations, name, offset):
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        result = expand(piece, rules, iterations).encode('ascii')
+        memory.buf[offset:offset + len(result)] = result
+    finally:
+        memory.close()
+
+
+def expand_parallel(axiom, rules, iterations, processes=None, as_array=False):
+    # The first generations are expanded here until the word can be split into a few pieces per process; every
+    # piece then expands independently (the rules are context-free), into its own slice of the output
+    processes = processes or os.cpu_count()
+    table = expanded_lengths(rules, iterations)
+    total = int(table[:, np.frombuffer(axiom.encode('ascii'), dtype=np.uint8)].sum(axis=1)[-1])
+
+    word, done = axiom, 0
+    translate = compile_rules(rules)
+    while done < iterations and len(word) < 16 * processes:
+        word, done = word.translate(translate), done + 1
+    remaining = iterations - done
+    codes = np.frombuffer(word.encode('ascii'), dtype=np.uint8)
+    ends = np.cumsum(table[remaining][codes])
+    # Cut where the expanded pieces have about equal lengths
+    cuts = np.searchsorted(ends, np.linspace(0, total, 4 * processes + 1)[1:-1], side='right')
+    cuts = np.unique(np.concatenate([[0], cuts, [len(word)]]))
+    offsets = np.concatenate([[0], ends])[cuts]
+
+    memory = shared_memory.SharedMemory(create=True, size=max(total, 1))
+    try:
+        tasks = [(word[cuts[i]:cuts[i + 1]], rules, remaining, memory.name, int(offsets[i]))
+                 for i in range(len(cuts) - 1)]
+        with mp.Pool(processes) as pool:
+            pool.starmap(_expand_piece, tasks)
+        result = np.ndarray((total,), dtype=np.uint8, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+    return result if as_array else result.tobytes().decode('ascii')
+
+
+def iter_expand(axiom, rules, iterations):
+    # Depth-first walk of the derivation tree: one iterator over a production per level below the axiom
+    stack = [(iter(axiom), iterations)]
+    while stack:
+        symbols, depth = stack[-1]
+        for symbol in symbols:
+            if depth and symbol in rules:
+                if depth == 1:
+                    yield from rules[symbol]
+                else:
+                    stack.append((iter(rules[symbol]), depth - 1))
+                    break
+            else:
+                yield symbol
+        else:
+            stack.pop()
+
+
+def _hull(points):
+    # Convex hull (monotone chain) of an (n, 2) array, counter-clockwise without repeated points
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return points
+
+    def half(ordered):
+        chain = []
+        for point in ordered:
+            while len(chain) >= 2 and ((chain[-1][0] - chain[-2][0]) * (point[1] - chain[-2][1]) -
+                                       (chain[-1][1] - chain[-2][1]) * (point[0] - chain[-2][0])) <= 0:
+                chain.pop()
+            chain.append(tuple(point))
+        return chain
+
+    lower, upper = half(points), half(points[::-1])
+    return np.array(lower[:-1] + upper[:-1])
+
+
+class WordSummary:
+    # Turtle path summaries in the local frame of a symbol (start at the origin, heading along +x):
+    # summary(symbol, depth) -> (segments, hull, (x, y, heading)) after `depth` rewrites of the symbol.
+    # forward: symbols that draw a segment of `length`; turns: symbol -> +1 (counter-clockwise) or -1 by `angle`
+    # degrees. The defaults follow draw_l_system in fractal-plant.py ('+' turns right, '-' left).
+    def __init__(self, rules, angle=25, length=1.0, forward='F', turns=None):
+        self.rules = rules
+        self.angle = math.radians(angle)
+        self.length = length
+        self.forward = set(forward)
+        self.turns = turns if turns is not None else {'+': -1, '-': 1}
+        self._memo = {}
+
+    def summary(self, symbol, depth):
+        key = (symbol, depth)
+        if key not in self._memo:
+            if depth and symbol in self.rules:
+                self._memo[key] = self.summarize(self.rules[symbol], depth - 1)
+            elif symbol in self.forward:
+                self._memo[key] = (1, np.array([[0.0, 0.0], [self.length, 0.0]]), (self.length, 0.0, 0.0))
+            else:
+                heading = self.turns.get(symbol, 0) * self.angle
+                self._memo[key] = (0, np.zeros((1, 2)), (0.0, 0.0, heading))
+        return self._memo[key]
+
+    def summarize(self, word, depth):
+        # Summary of a word whose symbols are each rewritten `depth` more times (brackets must balance)
+        x, y, heading = 0.0, 0.0, 0.0
+        segments, hulls, stack = 0, [np.zeros((1, 2))], []
+        for symbol in word:
+            if symbol == '[':
+                stack.append((x, y, heading))
+            elif symbol == ']':
+                x, y, heading = stack.pop()
+            else:
+                count, hull, (dx, dy, turn) = self.summary(symbol, depth)
+                cos, sin = math.cos(heading), math.sin(heading)
+                if count:
+                    segments += count
+                    hulls.append(hull @ np.array([[cos, sin], [-sin, cos]]) + (x, y))
+                x, y, heading = x + cos * dx - sin * dy, y + sin * dx + cos * dy, heading + turn
+        if stack:
+            raise ValueError(f"Unbalanced brackets in {word!r}")
+        return segments, _hull(np.concatenate(hulls)), (x, y, heading)
+
+    def bounds(self, axiom, iterations, heading=90):
+        # (xmin, ymin, xmax, ymax) of the drawing of the axiom after `iterations` rewrites, started at the
+        # origin with the given heading in degrees (90: growing upwards as in the scripts)
+        _, hull, _ = self.summarize(axiom, iterations)
+        angle = math.radians(heading)
+        rotated = hull @ np.array([[math.cos(angle), math.sin(angle)], [-math.sin(angle), math.cos(angle)]])
+        return (*rotated.min(axis=0), *rotated.max(axis=0))
@@ -0,0 +1,303 @@
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from turtle_geometry import compile_segments
+
+# Configurable L-systems: deterministic, stochastic, parametric and context-sensitive productions, read from a
+# JSON file of named rule sets (plants.json) and compiled once into a dispatch table indexed by symbol code.
+# A word is a uint8 array of symbol codes, plus for parametric systems a float array of the symbols'
+# parameters (one column per parameter, NaN where a symbol has fewer). Every generation rewrites all symbols at
+# once with NumPy: the symbols of one code are matched against that code's productions together, and every
+# production's successor is scattered to all its occurrences in one step.
+#
+# A rule set in the config file:
+#   "axiom": "X", "angle": 25, "length": 1, "iterations": 5,
+#   "seed": 1           - seed of the random generator of stochastic productions (same seed, same plant)
+#   "ignore": "+-F"     - symbols skipped when looking for the context of a symbol
+#   "productions": [
+#       "X -> F+[[X]-X]-F[-FX]+X",                                       deterministic
+#       {"predecessor": "F", "successor": "F[+F]F", "probability": 0.5},  stochastic
+#       {"predecessor": "A(s)", "condition": "s > 1", "successor": "F(s)[+(30)A(s/2)]"},  parametric
+#       {"left": "0", "predecessor": "1", "right": "1", "successor": "0"},  context-sensitive
+#   ]
+# The first listed production of a symbol whose context and condition match is applied; consecutive
+# productions of a symbol with the same context and condition are alternatives, chosen with their
+# probabilities. A symbol without a matching production stays as it is. Contexts are single symbols (with
+# parameters, whose names can be used in the condition and successor): the left context is the previous symbol
+# on the path from the root, skipping finished branches, the right context the next symbol on the same branch,
+# skipping the branches in between. Parameter expressions are Python expressions over NumPy arrays.
+
+Production = namedtuple('Production', ['predecessor', 'successor', 'left', 'right', 'condition', 'probability'])
+Production.__new__.__defaults__ = ('', '', None, 1.0)
+
+# Functions usable in conditions and parameter expressions
+_NAMESPACE = {'__builtins__': {}, 'pi': np.pi, 'e': np.e, 'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+              'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'abs': np.abs, 'min': np.minimum, 'max': np.maximum}
+
+
+def parse_production(entry):
+    # "A -> successor" or a dict with the fields of Production
+    if isinstance(entry, str):
+        predecessor, successor = entry.split('->')
+        return Production(predecessor.strip(), successor.strip())
+    return Production(**entry)
+
+
+def _arguments(text):
+    # Split at the commas outside of parentheses
+    arguments, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        if char == ',' and depth == 0:
+            arguments.append(text[start:i])
+            start = i + 1
+    return arguments + [text[start:]] if text else []
+
+
+def parse_modules(text):
+    # 'F(s)[+(30)A(s*0.6)]' -> [('F', ['s']), ('[', []), ('+', ['30']), ('A', ['s*0.6']), (']', [])]
+    text = text.replace(' ', '')
+    modules, i = [], 0
+    while i < len(text):
+        symbol, i = text[i], i + 1
+        arguments = []
+        if i < len(text) and text[i] == '(':
+            depth = 0
+            for j in range(i, len(text)):
+                depth += {'(': 1, ')': -1}.get(text[j], 0)
+                if depth == 0:
+                    break
+            else:
+                raise ValueError(f"Unbalanced parentheses in {text!r}")
+            arguments, i = _arguments(text[i + 1:j]), j + 1
+        modules.append((symbol, arguments))
+    return modules
+
+
+def _pattern(text):
+    # Context or predecessor: one symbol, optionally with parameter names -> (code, names)
+    if not text:
+        return -1, []
+    modules = parse_modules(text)
+    if len(modules) != 1:
+        raise ValueError(f"A predecessor or context is one symbol, got {text!r}")
+    symbol, names = modules[0]
+    return ord(symbol), names
+
+
+def _evaluate(expression, variables, count):
+    return np.broadcast_to(np.asarray(eval(expression, _NAMESPACE, variables), dtype=float), (count,))
+
+
+# One group of alternative productions of a symbol: indices of the productions, their cumulative probabilities,
+# the context codes (-1: any), the parameter names of the predecessor and the contexts and the compiled condition
+Group = namedtuple('Group', ['productions', 'cumulative', 'left', 'right', 'names', 'left_names', 'right_names',
+                             'condition'])
+
+
+class RuleTable:
+    # Productions compiled into arrays: for production p, successors[p] holds the codes of its successor,
+    # expressions[p] the compiled parameter expressions of each of its symbols; table[code] lists the groups of
+    # the productions of a symbol code in order of priority (an empty list: the symbol is copied)
+    def __init__(self, productions, ignore=''):
+        productions = [parse_production(entry) for entry in productions]
+        self.table = [[] for _ in range(256)]
+        self.successors, self.expressions = [], []
+        self.ignore = np.zeros(256, dtype=bool)
+        self.ignore[[ord(symbol) for symbol in ignore]] = True
+        self.arity = 0  # Largest number of parameters of a symbol
+        self.stochastic = self.context = self.parametric = False
+
+        for production in productions:
+            code, names = _pattern(production.predecessor)
+            left, left_names = _pattern(production.left)
+            right, right_names = _pattern(production.right)
+            modules = parse_modules(production.successor)
+            self.successors.append(np.array([ord(symbol) for symbol, _ in modules], dtype=np.uint8))
+            self.expressions.append([[compile(argument, production.successor, 'eval') for argument in arguments]
+                                     for _, arguments in modules])
+            self.arity = max([self.arity, len(names), len(left_names), len(right_names)] +
+                             [len(arguments) for _, arguments in modules])
+            condition = compile(production.condition, production.condition, 'eval') if production.condition else None
+            key = (left, right, tuple(names), tuple(left_names), tuple(right_names), production.condition)
+            groups = self.table[code]
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append((len(self.successors) - 1, production.probability))
+            else:
+                groups.append((key, [(len(self.successors) - 1, production.probability)], condition))
+            self.context |= left >= 0 or right >= 0
+            self.parametric |= bool(names or left_names or right_names or production.condition or
+                                    any(arguments for _, arguments in modules))
+
+        for code, groups in enumerate(self.table):
+            compiled = []
+            for (left, right, names, left_names, right_names, _), members, condition in groups:
+                indices, probabilities = np.array(members).T
+                cumulative = np.cumsum(probabilities) / probabilities.sum()
+                self.stochastic |= len(indices) > 1
+                compiled.append(Group(indices.astype(np.intp), cumulative, left, right, names, left_names,
+                                      right_names, condition))
+            self.table[code] = compiled
+        # All successors one after the other, followed by every symbol code once (the symbol copied unchanged,
+        # production len(successors) + code)
+        self.flat = np.concatenate(self.successors + [np.arange(256, dtype=np.uint8)])
+        self.lengths = np.array([len(successor) for successor in self.successors] + [1] * 256, dtype=np.int64)
+        self.offsets = np.cumsum(self.lengths) - self.lengths
+
+    def neighbours(self, codes):
+        # Index of the left and right context of every symbol (-1: none), ignoring the symbols in self.ignore.
+        # One pass per bracket depth: at depth e, the last symbol of depth e is on the path of a later symbol as
+        # long as no ']' has left depth e since; the next symbol of depth e is on the same branch if it comes
+        # before the next ']' leaving depth e. The passes run over the symbols that are not ignored only.
+        size = len(codes)
+        kept = np.flatnonzero(~self.ignore[codes])
+        codes = codes[kept]
+        index = np.arange(len(codes))
+        opening, closing = codes == ord('['), codes == ord(']')
+        depth = np.cumsum(opening.astype(np.int32) - closing) - opening  # Depth of a symbol (of '[' before it)
+        considered = ~opening & ~closing
+        left, right = np.full(len(codes), -1), np.full(len(codes), -1)
+        for level in range(depth.max(initial=0) + 1):
+            at = considered & (depth == level)
+            leaving = closing & (depth == level - 1)  # A ']' has the depth it returns to
+            last = np.maximum.accumulate(np.where(at, index, -1))
+            last_leave = np.maximum.accumulate(np.where(leaving, index, -1))
+            candidate = np.where(last > last_leave, last, -1)
+            # For the symbols at this depth or deeper, the symbol of this depth before them (if still on the path)
+            deeper = np.flatnonzero(considered[1:] & (depth[1:] >= level)) + 1
+            left[deeper] = np.maximum(left[deeper], candidate[deeper - 1])
+
+            following = np.minimum.accumulate(np.where(at, index, len(codes))[::-1])[::-1]
+            next_leave = np.minimum.accumulate(np.where(leaving, index, len(codes))[::-1])[::-1]
+            same = np.flatnonzero(at[:-1])
+            after = following[same + 1]
+            right[same] = np.where(after < next_leave[same + 1], after, -1)
+        # Back to positions in the full word
+        positions = np.append(kept, -1)  # Index -1 (no context) stays -1
+        full_left, full_right = np.full(size, -1), np.full(size, -1)
+        full_left[kept], full_right[kept] = positions[left], positions[right]
+        return full_left, full_right
+
+    def rewrite(self, codes, params, rng):
+        # One generation: the new (codes, params)
+        copy = len(self.successors)
+        choice = codes.astype(np.intp) + copy  # Production per symbol, at first copying every symbol
+        chosen = []  # (group, production, positions of the symbols it rewrites)
+        left, right = self.neighbours(codes) if self.context else (None, None)
+        for code in np.flatnonzero(np.bincount(codes, minlength=256)):
+            groups = self.table[code]
+            if not groups:
+                continue
+            at = np.flatnonzero(codes == code)
+            for group in groups:
+                match = np.ones(len(at), dtype=bool) if group is groups[0] else choice[at] >= copy
+                for context, wanted in ((left, group.left), (right, group.right)):
+                    if wanted >= 0:
+                        neighbour = context[at]
+                        match &= (neighbour >= 0) & (codes[neighbour] == wanted)
+                if group.condition is not None and match.any():
+                    where = at[match]
+                    match[match] = _evaluate(group.condition, self._variables(group, where, params, left, right),
+                                             len(where)).astype(bool)
+                where = at if match.all() else at[match]
+                if not len(where):
+                    continue
+                if len(group.productions) > 1:
+                    pick = np.searchsorted(group.cumulative, rng.random(len(where)), side='right')
+                    pick = np.minimum(pick, len(group.productions) - 1)  # Rounding of the cumulative sum
+                    choice[where] = group.productions[pick]
+                    chosen += [(group, production, where[pick == k])
+                               for k, production in enumerate(group.productions)]
+                else:
+                    choice[where] = group.productions[0]
+                    chosen.append((group, group.productions[0], where))
+
+        lengths = self.lengths[choice]
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        # Output symbol k is symbol k - starts[i] of the production of the symbol i it comes from
+        source = np.repeat(self.offsets[choice] - starts, lengths)
+        source += np.arange(len(source))
+        new_codes = self.flat[source]
+        new_params = None
+        if params is not None:
+            new_params = np.full((len(new_codes), params.shape[1]), np.nan)
+            copied = choice >= copy
+            new_params[starts[copied]] = params[copied]
+            for group, production, where in chosen:
+                variables = self._variables(group, where, params, left, right)
+                for offset, expressions in enumerate(self.expressions[production]):
+                    for column, expression in enumerate(expressions):
+                        new_params[starts[where] + offset, column] = _evaluate(expression, variables, len(where))
+        return new_codes, new_params
+
+    def _variables(self, group, where, params, left, right):
+        # Parameter names of the predecessor and its contexts -> values for the symbols at `where`
+        variables = {}
+        if params is None:
+            return variables
+        for names, positions in ((group.names, where), (group.left_names, None if left is None else left[where]),
+                                 (group.right_names, None if right is None else right[where])):
+            for column, name in enumerate(names):
+                variables[name] = params[positions, column]
+        return variables
+
+
+class LSystem:
+    def __init__(self, axiom, productions, angle=25, length=1.0, iterations=5, seed=None, ignore='',
+                 forward='F', turns=None):
+        self.rules = RuleTable(productions, ignore)
+        self.axiom_text = axiom
+        modules = parse_modules(axiom)
+        self.axiom = np.array([ord(symbol) for symbol, _ in modules], dtype=np.uint8)
+        self.axiom_params = None
+        arity = max([self.rules.arity] + [len(arguments) for _, arguments in modules])
+        if self.rules.parametric or arity:
+            self.axiom_params = np.full((len(modules), max(arity, 1)), np.nan)
+            for i, (_, arguments) in enumerate(modules):
+                for column, argument in enumerate(arguments):
+                    self.axiom_params[i, column] = float(eval(argument, _NAMESPACE))
+        self.angle = angle
+        self.length = length
+        self.iterations = iterations
+        self.seed = seed
+        self.forward = forward
+        self.turns = turns if turns is not None else {'+': 1, '-': -1}  # As FractalPlant: '+' turns left
+
+    @classmethod
+    def from_config(cls, path, name):
+        with open(path) as file:
+            settings = dict(json.load(file)[name])
+        return cls(settings.pop('axiom'), settings.pop('productions'), **settings)
+
+    def expand(self, iterations=None):
+        # (codes, params) after the given number of generations; params is None unless the system is parametric.
+        # The random generator starts from the seed on every call, so the same seed gives the same word.
+        rng = np.random.default_rng(self.seed)
+        codes, params = self.axiom, self.axiom_params
+        for _ in range(self.iterations if iterations is None else iterations):
+            codes, params = self.rules.rewrite(codes, params, rng)
+        return codes, params
+
+    def word(self, iterations=None):
+        # The word as text, parameters in parentheses
+        codes, params = self.expand(iterations)
+        if params is None:
+            return codes.tobytes().decode('ascii')
+        return ''.join(chr(code) + ('(' + ','.join(f"{value:g}" for value in row[~np.isnan(row)]) + ')'
+                                    if not np.isnan(row).all() else '')
+                       for code, row in zip(codes.tolist(), params))
+
+    def segments(self, iterations=None, heading=90):
+        codes, params = self.expand(iterations)
+        return compile_segments(codes, self.angle, self.length, heading, self.forward, self.turns,
+                                params=None if params is None else params[:, 0])
+
+
+def load_config(path):
+    # All rule sets of a config file by name
+    with open(path) as file:
+        names = list(json.load(file))
+    return {name: LSystem.from_config(path, name) for name in names}
@@ -8,11 +8,13 @@ import sys
 
 
 def generate(n, result='[X]'):
+    # Both rules at once: replacing X first and then F would also double the F's that rule #1 just produced
+    rules = str.maketrans({
+        'X': 'F+[[X]-X]-F[-FX]+X',  # rule #1
+        'F': 'FF',                  # rule #2
+    })
     for _ in range(n):
-        # rule #1
-        result = result.replace('X', 'F+[[X]-X]-F[-FX]+X')
-        # rule #2
-        result = result.replace('F', 'FF')
+        result = result.translate(rules)
     return result
 
 def draw(cmds, size=2):
@@ -1,8 +1,11 @@
+import math
+import os
 import turtle
 import sys
+from itertools import repeat
 
-# Zwiększenie limitu by nie było Stack Overflow
-sys.setrecursionlimit(10000)
+from l_system import iter_expand
+from productions import LSystem
 
 
 class FractalPlant:
@@ -16,16 +19,25 @@ class FractalPlant:
         self.liczba_iteracji = liczba_iteracji
         self.kat = kat
         self.dlugosc = dlugosc
+        # System z pliku konfiguracyjnego (productions.LSystem), zastępuje powyższe reguły
+        self.system = None
+
+    @classmethod
+    def z_konfiguracji(cls, sciezka, nazwa):
+        # Roślina z zestawu reguł `nazwa` w pliku JSON (np. plants.json): deterministyczne, stochastyczne,
+        # parametryczne lub kontekstowe
+        system = LSystem.from_config(sciezka, nazwa)
+        roslina = cls(system.axiom_text, system.iterations, system.angle, system.length)
+        roslina.system = system
+        return roslina
 
     def ustaw_zasady(self, slowo):
-        # Na przechowywanie przekształconych znaków
-        nowe_slowo = ""
-        for char in slowo:
-            # Dodajemy znaki do nowego słowa przechowującego ciąg znaków z zamienienia
-            nowe_slowo += self.reguly.get(char, char)
-        return nowe_slowo
+        # Zamieniamy wszystkie znaki jednocześnie w jednym przejściu; znaki bez reguły zostają bez zmian
+        return slowo.translate(str.maketrans(self.reguly))
 
     def wygeneruj_slowo(self):
+        if self.system is not None:
+            return self.system.word(self.liczba_iteracji)
         slowo = self.slowo_poczatkowe
         # Pętla wykona się tyle razy, ile wynosi self.liczba_iteracji
         for _ in range(self.liczba_iteracji):
@@ -33,7 +45,12 @@ class FractalPlant:
             slowo = self.ustaw_zasady(slowo)
         return slowo
 
-    def rysuj(self, slowo):
+    def wygeneruj_slowo_leniwie(self):
+        # Generator znaków końcowego słowa: znaki powstają w trakcie rysowania, całe słowo nigdy nie jest w pamięci
+        return iter_expand(self.slowo_poczatkowe, self.reguly, self.liczba_iteracji)
+
+    def rysuj(self, slowo, parametry=None):
+        # parametry: opcjonalny parametr każdego znaku (NaN gdy brak): F(s) idzie o s * dlugosc, +(a) obraca o a st
         # Prędkość rysowania
         turtle.speed(0)
         # Kolor tła
@@ -55,16 +72,16 @@ class FractalPlant:
         turtle.setheading(90)
 
         stack = []
-        for char in slowo:
+        for char, parametr in zip(slowo, repeat(math.nan) if parametry is None else parametry):
             # Idź do przodu zostawiając ślad
             if char == "F":
-                turtle.forward(self.dlugosc)
+                turtle.forward(self.dlugosc if math.isnan(parametr) else self.dlugosc * parametr)
             # Obrót o 25 st
             elif char == "+":
-                turtle.left(self.kat)
+                turtle.left(self.kat if math.isnan(parametr) else parametr)
             # Obrót o 25 st
             elif char == "-":
-                turtle.right(self.kat)
+                turtle.right(self.kat if math.isnan(parametr) else parametr)
             # Odłóż wartości na stos
             elif char == "[":
                 pozycja = turtle.position()
@@ -79,11 +96,21 @@ class FractalPlant:
                 turtle.pendown()
 
     def run(self):
-        slowo_koncowe = self.wygeneruj_slowo()
-        self.rysuj(slowo_koncowe)
+        if self.system is not None:
+            # Słowo z tablicy reguł; w systemie parametrycznym rysujemy też pierwszy parametr każdego znaku
+            znaki, parametry = self.system.expand(self.liczba_iteracji)
+            self.rysuj(znaki.tobytes().decode('ascii'), None if parametry is None else parametry[:, 0].tolist())
+        else:
+            slowo_koncowe = self.wygeneruj_slowo_leniwie()
+            self.rysuj(slowo_koncowe)
         turtle.done()
 
 
 if __name__ == "__main__":
-    wzrost_rosliny = FractalPlant("X", 5, 25, 3)
+    if len(sys.argv) > 1:
+        # python stole1.py <nazwa>: zestaw reguł z plants.json (plant, stochastic, parametric, context)
+        wzrost_rosliny = FractalPlant.z_konfiguracji(os.path.join(os.path.dirname(__file__), "plants.json"),
+                                                     sys.argv[1])
+    else:
+        wzrost_rosliny = FractalPlant("X", 5, 25, 3)
     wzrost_rosliny.run()
\ No newline at end of file
@@ -0,0 +1,273 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from l_system import RULES
+
+# Turtle graphics without the turtle: an L-system word is compiled into an (M, 4) array of line segments
+# (x0, y0, x1, y1), one per drawing symbol, with NumPy instead of one turtle call per symbol.
+# Headings are a cumulative sum of the turns and positions a cumulative sum of the steps. A ']' jumps back to
+# the state of its '[': it gets the turn (and later the step) that undoes everything between the two. Those
+# corrections are differences of the plain cumulative sum, so every quantity costs two cumulative sums over the
+# word instead of a Python loop over it (plus one vectorized pass per bracket depth to match the brackets).
+# Being differences of sums over the whole word, floating-point sums would lose accuracy with the word's length
+# (4e-4 at 1.5 million segments), so turns are counted in integers and positions summed in fixed point.
+# GeometryCache produces the same segments without expanding the word at all, by instancing cached subtrees,
+# several times faster; compile_segments remains for words that do not come from an L-system.
+# The segments can then be rasterized (NumPy, saved with Pillow), written as SVG or drawn with matplotlib.
+
+
+def _codes(word):
+    if isinstance(word, str):
+        return np.frombuffer(word.encode('ascii'), dtype=np.uint8)
+    return np.asarray(word, dtype=np.uint8)
+
+
+_DEPTH = np.zeros(256, dtype=np.int8)
+_DEPTH[ord('[')], _DEPTH[ord(']')] = 1, -1
+
+
+def _bracket_pairs(codes):
+    # Positions of matching '[' and ']' (starts, ends), and the nested pairs grouped by the pair enclosing them:
+    # the pairs from groups[i] to groups[i + 1] are the children of pair owners[i]
+    brackets = np.flatnonzero(_DEPTH[codes])
+    change = _DEPTH[codes[brackets]]
+    depth = np.cumsum(change, dtype=np.int32)  # Only the brackets change the depth
+    if depth[-1:].any() or depth.min(initial=0) < 0:
+        raise ValueError("Unbalanced brackets")
+    if depth.max(initial=0) >= 2**16:
+        raise ValueError("Brackets nested too deeply")
+    level = (depth + (change < 0)).astype(np.uint16)  # A ']' gets the level of its '['
+    # By level, then position: open, close, open, close, ... (stable sort of small integers is a radix sort)
+    order = np.argsort(level, kind='stable')
+    pairs = brackets[order].reshape(-1, 2)
+    starts, ends, levels = pairs[:, 0].copy(), pairs[:, 1].copy(), level[order][::2]
+    # Pairs of one level are disjoint and sorted, so the enclosing pair is the last one of the level above that
+    # opens before. The nested pairs (level 2 and up) are the tail of the pairs, grouped by enclosing pair.
+    first = np.searchsorted(levels, np.arange(levels.max(initial=0) + 3))
+    parents = np.empty(len(starts) - first[2], dtype=np.intp)
+    for k in range(2, len(first) - 1):
+        outer, inner = slice(first[k - 1], first[k]), slice(first[k], first[k + 1])
+        parents[inner.start - first[2]:inner.stop - first[2]] = (
+            first[k - 1] + np.searchsorted(starts[outer], starts[inner]) - 1)
+    groups = first[2] + np.flatnonzero(np.diff(parents, prepend=-1))
+    return starts, ends, parents[groups - first[2]], groups
+
+
+def _undo_brackets(values, starts, ends, owners, groups):
+    # values[k]: change at symbol k (zero at the brackets). Returns the running sum of the values, in which every
+    # ']' brings the sum back to its value at the matching '['. The change a ']' needs is minus what was added
+    # between the brackets outside of the inner pairs, which undo their own parts: the sum over the pair minus
+    # the sums over its children, all from one cumulative sum.
+    total = np.cumsum(values, dtype=values.dtype)
+    correction = total[starts] - total[ends - 1]
+    if len(groups):
+        correction[owners] -= np.add.reduceat(correction, groups)
+    values[ends] = correction
+    return np.cumsum(values, out=values)
+
+
+def compile_segments(word, angle=25, length=1.0, heading=90, forward='F', turns=None, origin=(0.0, 0.0),
+                     params=None):
+    # word: str or uint8 array of symbol codes. forward: symbols drawing a segment; turns: symbol -> +1 for a
+    # counter-clockwise turn by `angle` degrees, -1 for clockwise (default as draw_l_system: '+' right, '-' left).
+    # params: optional parameter of every symbol (parametric L-systems, NaN for none): a drawing symbol with
+    # parameter p draws length * p, a turn with parameter p turns by p degrees.
+    turns = turns if turns is not None else {'+': -1, '-': 1}
+    codes = _codes(word)
+    relevant = np.zeros(256, dtype=bool)
+    relevant[[ord(symbol) for symbol in '[]' + ''.join(forward) + ''.join(turns)]] = True
+    kept = relevant[codes]  # Other symbols (e.g. X) do not move the turtle
+    codes = codes[kept]
+    brackets = _bracket_pairs(codes)
+
+    draws = np.zeros(256, dtype=bool)
+    draws[[ord(symbol) for symbol in forward]] = True
+    index = np.flatnonzero(draws[codes])
+    turn = np.zeros(256, dtype=np.int32)
+    for symbol, direction in turns.items():
+        turn[ord(symbol)] = direction
+    if params is None:
+        # Every heading is a whole number of turns by `angle`: the count is an exact integer sum, and the step of
+        # each count comes from a table (as complex numbers x + iy)
+        count = _undo_brackets(turn[codes], *brackets)[index]
+        low = count.min(initial=0)
+        table = length * np.exp(1j * (math.radians(angle) * np.arange(low, count.max(initial=0) + 1)
+                                      + math.radians(heading)))
+        steps = table[count - low]
+    else:
+        params = np.asarray(params, dtype=float)[kept]
+        headings = turn[codes] * np.radians(np.where(np.isnan(params), angle, params))
+        headings = _undo_brackets(headings, *brackets)[index] + math.radians(heading)
+        steps = length * np.exp(1j * headings)
+        steps *= np.where(np.isnan(params[index]), 1.0, params[index])
+
+    # Positions in fixed point, as int64 multiples of 1 / scale with room for the sum of all steps, so that the
+    # cumulative sums and their differences are exact; only the steps are rounded, by 1e-18 of the drawing's size
+    reach = np.abs(steps.real).sum() + np.abs(steps.imag).sum()
+    scale = 2.0**(61 - math.frexp(reach)[1])
+    segments = np.empty((len(index), 4))
+    step = np.empty(len(codes), dtype=np.int64)
+    for column, part in enumerate((steps.real, steps.imag)):
+        fixed = np.rint(part * scale).astype(np.int64)
+        step.fill(0)
+        step[index] = fixed
+        end = _undo_brackets(step, *brackets)[index]
+        np.multiply(end, 1 / scale, out=segments[:, column + 2])
+        end -= fixed
+        np.multiply(end, 1 / scale, out=segments[:, column])
+    segments += np.tile(np.asarray(origin, dtype=float), 2)
+    return segments
+
+
+def plant_segments(iterations, rules=None, axiom='X', angle=25, length=1.0):
+    # The fractal plant of fractal-plant.py
+    return GeometryCache(rules or RULES, angle, length).segments(axiom, iterations)
+
+
+class GeometryCache:
+    # Segments of every (symbol, remaining depth) subtree in its local frame (start at the origin, heading
+    # along +x), each computed once from the cached geometry of the symbols of its production, which are placed
+    # (instanced) under the rigid transform of the turtle at that point: a rotation and a shift of whole arrays.
+    # Building depth n costs one array copy per symbol of one production per level instead of a walk over the
+    # word, so the Python work grows with the depth, not with the exponentially long word.
+    # The cache keeps at most max_segments segments, evicting the least recently used subtrees (a subtree larger
+    # than that is returned without being kept). Same conventions as WordSummary in l_system.py.
+    def __init__(self, rules, angle=25, length=1.0, forward='F', turns=None, max_segments=2**22):
+        self.rules = rules
+        self.angle = math.radians(angle)
+        self.length = length
+        self.forward = set(forward)
+        self.turns = turns if turns is not None else {'+': -1, '-': 1}
+        self.max_segments = max_segments
+        self._cache = OrderedDict()  # (symbol, depth) -> (segments, (x, y, heading)), oldest use first
+        self.size = 0  # Segments in the cache
+        self.hits = self.misses = 0
+
+    def geometry(self, symbol, depth):
+        # (segments, (x, y, heading) at the end) of the symbol rewritten `depth` times
+        key = (symbol, depth)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+        if depth and symbol in self.rules:
+            result = self.instance(self.rules[symbol], depth - 1)
+        elif symbol in self.forward:
+            result = np.array([[0.0, 0.0, self.length, 0.0]]), (self.length, 0.0, 0.0)
+        else:
+            result = np.empty((0, 4)), (0.0, 0.0, self.turns.get(symbol, 0) * self.angle)
+        if len(result[0]) <= self.max_segments:
+            self._cache[key] = result
+            self.size += len(result[0])
+            while self.size > self.max_segments:
+                segments, _ = self._cache.popitem(last=False)[1]
+                self.size -= len(segments)
+        return result
+
+    def instance(self, word, depth, heading=0.0, origin=(0.0, 0.0)):
+        # Segments of a word whose symbols are each rewritten `depth` more times, in the order a turtle would
+        # draw them, for a turtle starting at origin with the given heading (radians); and the end state
+        x, y = origin
+        stack, parts = [], []
+        for symbol in word:
+            if symbol == '[':
+                stack.append((x, y, heading))
+            elif symbol == ']':
+                x, y, heading = stack.pop()
+            else:
+                segments, (dx, dy, turn) = self.geometry(symbol, depth)
+                cos, sin = math.cos(heading), math.sin(heading)
+                if len(segments):
+                    parts.append((segments, cos, sin, x, y))
+                x, y, heading = x + cos * dx - sin * dy, y + sin * dx + cos * dy, heading + turn
+        if stack:
+            raise ValueError(f"Unbalanced brackets in {word!r}")
+
+        out = np.empty((sum(len(part[0]) for part in parts), 4))
+        start = 0
+        for segments, cos, sin, shift_x, shift_y in parts:
+            points = out[start:start + len(segments)].reshape(-1, 2)
+            np.dot(segments.reshape(-1, 2), np.array([[cos, sin], [-sin, cos]]), out=points)
+            points += (shift_x, shift_y)
+            start += len(segments)
+        return out, (x, y, heading)
+
+    def segments(self, axiom, iterations, heading=90, origin=(0.0, 0.0)):
+        # The same (M, 4) array as compile_segments(expand(axiom, rules, iterations), ...)
+        return self.instance(axiom, iterations, math.radians(heading), origin)[0]
+
+
+def _bounds(segments):
+    # (xmin, ymin), (xmax, ymax); the origin for no segments
+    if not len(segments):
+        return np.zeros(2), np.zeros(2)
+    return (np.array([segments[:, 0::2].min(), segments[:, 1::2].min()]),
+            np.array([segments[:, 0::2].max(), segments[:, 1::2].max()]))
+
+
+def rasterize(segments, width=800, height=800, margin=10, image=None, value=255):
+    # Draws the segments, scaled to fit, into a (height, width) uint8 image (a new black one unless given).
+    # Every segment is sampled at one point per pixel of its length; all samples are set at once.
+    if image is None:
+        image = np.zeros((height, width), dtype=np.uint8)
+    if not len(segments):
+        return image
+    low, high = _bounds(segments)
+    scale = min((width - 1 - 2 * margin) / max(high[0] - low[0], 1e-12),
+                (height - 1 - 2 * margin) / max(high[1] - low[1], 1e-12))
+    offset = (np.array([width - 1, height - 1]) - (high - low) * scale) / 2 - low * scale
+    x0, y0 = segments[:, 0] * scale + offset[0], segments[:, 1] * scale + offset[1]
+    dx, dy = (segments[:, 2] - segments[:, 0]) * scale, (segments[:, 3] - segments[:, 1]) * scale
+    samples = np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(segments)), samples)
+    # Sample number within its segment, as a fraction of the segment
+    fraction = np.arange(len(segment), dtype=float)
+    fraction -= np.repeat(np.cumsum(samples) - samples, samples)
+    fraction *= (1 / np.maximum(samples - 1, 1))[segment]
+    columns = np.rint(x0[segment] + dx[segment] * fraction).astype(np.intp)
+    rows = (height - 1) - np.rint(y0[segment] + dy[segment] * fraction).astype(np.intp)  # y grows upwards
+    image[rows, columns] = value
+    return image
+
+
+def save_image(image, path):
+    from PIL import Image  # Optional dependency, only needed to write image files
+    Image.fromarray(image).save(path)
+
+
+def write_svg(segments, path, stroke='green', width=800, height=800, margin=10):
+    # One <path> of move/line commands, flipped so that y grows upwards as in turtle graphics; an empty
+    # drawing for no segments
+    if not len(segments):
+        with open(path, 'w') as file:
+            file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}"/>\n')
+        return
+    low, high = _bounds(segments)
+    scale = min((width - 2 * margin) / max(high[0] - low[0], 1e-12),
+                (height - 2 * margin) / max(high[1] - low[1], 1e-12))
+    points = (segments.reshape(-1, 2) - low) * scale + margin
+    points[:, 1] = height - points[:, 1]
+    # Consecutive segments that continue each other become one polyline
+    pairs = points.reshape(-1, 4)
+    moves = np.ones(len(pairs), dtype=bool)
+    moves[1:] = np.any(np.abs(pairs[1:, :2] - pairs[:-1, 2:]) > 1e-9, axis=1)
+    commands = np.where(moves, 'M', '')
+    data = ''.join(f"{command}{x0:.2f} {y0:.2f}L{x1:.2f} {y1:.2f}" if command else f" {x1:.2f} {y1:.2f}"
+                   for command, (x0, y0, x1, y1) in zip(commands, pairs.tolist()))
+    with open(path, 'w') as file:
+        file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">\n'
+                   f'<path d="{data}" fill="none" stroke="{stroke}" stroke-width="0.5"/>\n</svg>\n')
+
+
+def plot_segments(segments, ax=None, color='green', linewidth=0.5):
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    if ax is None:
+        ax = plt.gca()
+    ax.add_collection(LineCollection(segments.reshape(-1, 2, 2), colors=color, linewidths=linewidth))
+    ax.autoscale()
+    ax.set_aspect('equal')
+    return ax
@@ -1,7 +1,14 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'PSM-common'))  # Shared solver core
+from models import projectile, simulate
+from ode_core import as_table
+
 # Constants
 m = 1.0   # mass (kg)
 g = -9.81  # gravity (m/s^2)
@@ -20,98 +27,54 @@ s0 = np.array([0, 0])  # initial position (x, y)
 time = 0
 
 
+def projectile_table(method, v0x, v0y, s0, dt, time, k, m, g):
+    # Rows (t, Sx, Sy, Vx, Vy, DSx, DSy, Fx, Fy, ax, ay, DVx, DVy) of a run through the shared solver core, until
+    # the step that takes the projectile below the ground. The intermediates come from the whole state columns:
+    # DS and DV are the differences of consecutive rows, the acceleration used in a step is DV / dt and the
+    # force m * a; the first row holds the force and acceleration at launch.
+    model = projectile(k, m, g)
+    states = simulate(model, [s0[0], s0[1], v0x, v0y], dt, duration - time, method, t0=time)
+    table = np.zeros((len(states), 13))
+    table[:, :5] = as_table(states)
+    np.subtract(table[1:, 1:3], table[:-1, 1:3], out=table[1:, 5:7])  # DSx, DSy
+    np.subtract(table[1:, 3:5], table[:-1, 3:5], out=table[1:, 11:13])  # DVx, DVy
+    np.divide(table[1:, 11:13], dt, out=table[1:, 9:11])  # ax, ay
+    table[0, 9:11] = model.rhs(time, table[0, 1:5], np.empty(4))[2:]
+    np.multiply(table[:, 9:11], m, out=table[:, 7:9])  # Fx, Fy
+    return table
+
+
 def euler_method(v0x, v0y, s0, dt, time, k, m, g):
-    vx, vy = v0x, v0y
-    sx, sy = s0
-    results = [(0, s0[0], s0[1], v0x, v0y, 0, 0, -k*v0x, m*g-k*v0y, -k*v0x/m, (m*g-k*v0y)/m, 0, 0)]  # Initial conditions
-    while time < duration:
-        # Calculate the drag force in both x and y directions
-        Fx = -k * vx
-        Fy = m * g - k * vy
-
-        # Compute the acceleration in both x and y directions
-        ax = Fx / m
-        ay = Fy / m
-
-        # Calculate change in velocity for both x and y directions
-        DVx = ax * dt
-        DVy = ay * dt
-
-        # Calculate change in position for both x and y directions
-        DSx = vx * dt
-        DSy = vy * dt
-
-        # Update position and velocities for the next iteration
-        sx += DSx
-        sy += DSy
-        vx += DVx
-        vy += DVy
-
-        results.append((time, sx, sy, vx, vy, DSx, DSy, Fx, Fy, ax, ay, DVx, DVy))
-        time += dt
-        if sy < 0:
-            break
-    return results
+    return projectile_table('euler', v0x, v0y, s0, dt, time, k, m, g)
 
 
 def midpoint_method(v0x, v0y, s0, dt, time, k, m, g):
-    vx, vy = v0x, v0y
-    sx, sy = s0
-    results = [(0, s0[0], s0[1], v0x, v0y, 0, 0, -k * v0x, m * g - k * v0y, -k * v0x / m, (m * g - k * v0y) / m, 0, 0)]  # Initial conditions
-    while time < duration:
-        # Initial Euler step to estimate midpoint velocity
-        Fx = -k * vx
-        Fy = m * g - k * vy
-        ax = Fx / m
-        ay = Fy / m
-        mid_vx = vx + ax * dt / 2
-        mid_vy = vy + ay * dt / 2
-
-        # Calculate forces, accelerations, and deltas at the midpoint
-        mid_Fx = -k * mid_vx
-        mid_Fy = m * g - k * mid_vy
-        mid_ax = mid_Fx / m
-        mid_ay = mid_Fy / m
-        DVx = mid_ax * dt
-        DVy = mid_ay * dt
-        DSx = mid_vx * dt
-        DSy = mid_vy * dt
-
-        # Update position and velocity using midpoint values
-        sx += DSx
-        sy += DSy
-        vx += DVx
-        vy += DVy
-
-        results.append((time, sx, sy, vx, vy, DSx, DSy, mid_Fx, mid_Fy, mid_ax, mid_ay, DVx, DVy))
-        time += dt
-        if sy < 0:
-            break
-    return results
-
-
-# Perform the simulations
-simulation_results = euler_method(v0x, v0y, s0, dt, time, k, m, g)
-midpoint_simulation_results = midpoint_method(v0x, v0y, s0, dt, time, k, m, g)
-
-# Convert results to a structured format
-simulation_df = pd.DataFrame(simulation_results, columns=['t', 'Sx', 'Sy', 'Vx', 'Vy', 'DSx', 'DSy', 'Fx', 'Fy', 'ax', 'ay', 'DVx', 'DVy'])
-midpoint_simulation_df = pd.DataFrame(midpoint_simulation_results, columns=['t', 'Sx', 'Sy', 'Vx', 'Vy', 'DSx', 'DSy', 'Fx', 'Fy', 'ax', 'ay', 'DVx', 'DVy'])
-
-# Display the DataFrame
-print("Euler's Method")
-print(simulation_df)
-print("\n")
-print("Midpoint Method")
-print(midpoint_simulation_df)
-
-# Plotting
-plt.figure(figsize=(12, 6))
-plt.plot(simulation_df['Sx'], simulation_df['Sy'], label='Euler Method', marker='o')
-plt.plot(midpoint_simulation_df['Sx'], midpoint_simulation_df['Sy'], label='Midpoint Method', marker='x')
-plt.xlabel('Distance (m)')
-plt.ylabel('Height (m)')
-plt.title('Projectile Motion Simulation')
-plt.legend()
-plt.grid(True)
-plt.show()
+    return projectile_table('midpoint', v0x, v0y, s0, dt, time, k, m, g)
+
+
+if __name__ == "__main__":
+    # Perform the simulations
+    simulation_results = euler_method(v0x, v0y, s0, dt, time, k, m, g)
+    midpoint_simulation_results = midpoint_method(v0x, v0y, s0, dt, time, k, m, g)
+
+    # Convert results to a structured format
+    simulation_df = pd.DataFrame(simulation_results, columns=['t', 'Sx', 'Sy', 'Vx', 'Vy', 'DSx', 'DSy', 'Fx', 'Fy', 'ax', 'ay', 'DVx', 'DVy'])
+    midpoint_simulation_df = pd.DataFrame(midpoint_simulation_results, columns=['t', 'Sx', 'Sy', 'Vx', 'Vy', 'DSx', 'DSy', 'Fx', 'Fy', 'ax', 'ay', 'DVx', 'DVy'])
+
+    # Display the DataFrame
+    print("Euler's Method")
+    print(simulation_df)
+    print("\n")
+    print("Midpoint Method")
+    print(midpoint_simulation_df)
+
+    # Plotting
+    plt.figure(figsize=(12, 6))
+    plt.plot(simulation_df['Sx'], simulation_df['Sy'], label='Euler Method', marker='o')
+    plt.plot(midpoint_simulation_df['Sx'], midpoint_simulation_df['Sy'], label='Midpoint Method', marker='x')
+    plt.xlabel('Distance (m)')
+    plt.ylabel('Height (m)')
+    plt.title('Projectile Motion Simulation')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
@@ -1,7 +1,8 @@
-import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from main import pendulum_table
+
 # Constants for pendulum motion
 l = 1  # length of the pendulum (m)
 g = 9.81  # acceleration due to gravity (m/s^2)
@@ -12,36 +13,8 @@ duration = 3.5  # duration of simulation (s)
 m = 1  # mass (kg)
 a = 2  # initial angle (radians)
 
-# Energy calculations
-def calculate_energies(a, w, l, m, g):
-    h = l * (1 - np.cos(a))
-    V = l * w
-    PE = m * g * h  # Potential energy =ABS(mass*g*L5)
-    KE = 0.5 * m * V**2  # Kinetic energy =mass*M5^2/2
-    TE = PE + KE  # Total energy
-    return PE, KE, TE
-
-
 def improved_euler_method(a, w, dt, l, g):
-    results = [(0, a, w, 0, 0, 0)]
-    time = 0
-    while time < duration:
-        k1a = w
-        k1w = -g / l * np.sin(a)
-
-        a_mid = a + k1a * dt / 2
-        w_mid = w + k1w * dt / 2
-
-        k2a = w_mid
-        k2w = -g / l * np.sin(a_mid)
-
-        a += k2a * dt
-        w += k2w * dt
-
-        PE, KE, TE = calculate_energies(a, w, l, m, g)
-        results.append((time, a, w, PE, KE, TE))
-        time += dt
-    return results
+    return pendulum_table('improved_euler', a, w, dt, l, g, m, duration)
 
 # Running the simulation
 euler_results = improved_euler_method(a, w, dt, l, g)
@@ -67,34 +40,7 @@ plt.show()
 
 
 def rk4_method(a, w, dt, l, g):
-    results = [(0, a, w, 0, 0, 0)]
-    time = 0
-    while time < duration:
-        k1a = w
-        k1w = -g / l * np.sin(a)
-
-        a2 = a + k1a * dt / 2
-        w2 = w + k1w * dt / 2
-        k2a = w2
-        k2w = -g / l * np.sin(a2)
-
-        a3 = a + k2a * dt / 2
-        w3 = w + k2w * dt / 2
-        k3a = w3
-        k3w = -g / l * np.sin(a3)
-
-        a4 = a + k3a * dt
-        w4 = w + k3w * dt
-        k4a = w4
-        k4w = -g / l * np.sin(a4)
-
-        a += (k1a + 2*k2a + 2*k3a + k4a) / 6 * dt
-        w += (k1w + 2*k2w + 2*k3w + k4w) / 6 * dt
-
-        PE, KE, TE = calculate_energies(a, w, l, m, g)
-        results.append((time, a, w, PE, KE, TE))
-        time += dt
-    return results
+    return pendulum_table('rk4', a, w, dt, l, g, m, duration)
 
 # Running the simulation
 rk4_results = rk4_method(a, w, dt, l, g)
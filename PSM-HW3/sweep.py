@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from main import calculate_energies
+
+# Parameter sweeps of the pendulum: improved_euler_method / rk4_method of main.py run for N combinations of
+# (a0, w0, l, dt) at once, each quantity an (N,) array. Instead of one DataFrame of rows per run, the sweep keeps
+# running summaries per member (oscillation period, largest total energy drift, final state) and only stores
+# trajectories when asked to.
+# Members with different dt need different numbers of steps; a member whose time is up continues with a zero
+# step, which leaves its state unchanged, until the longest run is finished.
+
+METHODS = ('improved_euler', 'rk4')
+
+
+def _rates(a, w, g_over_l, out_a, out_w):
+    # k-terms of main.py: da/dt = w, dw/dt = -g / l * sin(a)
+    np.copyto(out_a, w)
+    np.sin(a, out=out_w)
+    np.multiply(out_w, g_over_l, out=out_w)
+
+
+def sweep(a0, w0=0.0, l=1.0, dt=0.01, duration=10.0, method='rk4', g=9.81, m=1, trajectories=False, sink=None):
+    # a0, w0, l, dt: scalars or arrays broadcasting to a common shape (flattened to N members).
+    # Returns a DataFrame with one row per member: a0, w0, l, dt, period (NaN when fewer than two upward
+    # zero crossings of a, e.g. for a rotating pendulum), max_TE_drift (largest |TE - TE0|) and the final a, w.
+    # With trajectories=True also returns a (steps + 1, N, 2) array of a, w per step (steps of the smallest dt).
+    # With a sink (PSM-common/trajectory.py, record shape (N, 2)) the a, w of every step are streamed into it
+    # instead, and the sink is returned in place of the array.
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    a0, w0, l, dt = (np.array(p, dtype=float).reshape(-1) for p in np.broadcast_arrays(a0, w0, l, dt))
+    steps = np.round(duration / dt).astype(int)
+    n, total_steps = len(a0), int(steps.max())
+
+    a, w = a0.copy(), w0.copy()
+    g_over_l = -g / l
+    _, _, TE0 = calculate_energies(a0, w0, l, m, g)
+    max_drift = np.zeros(n)
+    first_crossing = np.full(n, np.nan)
+    last_crossing = np.full(n, np.nan)
+    crossings = np.zeros(n, dtype=int)
+    if trajectories or sink is not None:
+        path = np.empty((total_steps + 1 if sink is None else 1, n, 2))  # For a sink one record, reused every step
+        path[0, :, 0], path[0, :, 1] = a, w
+        if sink is not None:
+            sink.append(path[0])
+
+    h = dt.copy()
+    half_h = h / 2
+    ka, kw = np.empty((4, n)), np.empty((4, n))
+    stage_a, stage_w = np.empty(n), np.empty(n)
+    previous_a = np.empty(n)
+    for i in range(1, total_steps + 1):
+        finished = steps == i - 1
+        if finished.any():  # Zero step from now on for the members that are done
+            h[finished] = 0
+            half_h[finished] = 0
+        np.copyto(previous_a, a)
+
+        _rates(a, w, g_over_l, ka[0], kw[0])
+        np.multiply(ka[0], half_h, out=stage_a)
+        np.add(stage_a, a, out=stage_a)
+        np.multiply(kw[0], half_h, out=stage_w)
+        np.add(stage_w, w, out=stage_w)
+        _rates(stage_a, stage_w, g_over_l, ka[1], kw[1])
+        if method == 'improved_euler':
+            da, dw = ka[1], kw[1]
+        else:
+            for s, step in ((2, half_h), (3, h)):
+                np.multiply(ka[s - 1], step, out=stage_a)
+                np.add(stage_a, a, out=stage_a)
+                np.multiply(kw[s - 1], step, out=stage_w)
+                np.add(stage_w, w, out=stage_w)
+                _rates(stage_a, stage_w, g_over_l, ka[s], kw[s])
+            # (k1 + 2 * k2 + 2 * k3 + k4) / 6, accumulated in the k2 rows
+            for k in (ka, kw):
+                np.add(k[1], k[2], out=k[1])
+                np.multiply(k[1], 2, out=k[1])
+                np.add(k[1], k[0], out=k[1])
+                np.add(k[1], k[3], out=k[1])
+                np.divide(k[1], 6, out=k[1])
+            da, dw = ka[1], kw[1]
+        np.multiply(da, h, out=da)
+        np.add(a, da, out=a)
+        np.multiply(dw, h, out=dw)
+        np.add(w, dw, out=w)
+
+        _, _, TE = calculate_energies(a, w, l, m, g)
+        np.maximum(max_drift, np.abs(TE - TE0), out=max_drift)
+
+        # Upward zero crossings of the angle, time interpolated linearly within the step
+        up = (previous_a < 0) & (a >= 0)
+        if up.any():
+            fraction = previous_a[up] / (previous_a[up] - a[up])
+            time = (i - 1 + fraction) * dt[up]
+            first_crossing[up] = np.where(crossings[up] == 0, time, first_crossing[up])
+            last_crossing[up] = time
+            crossings[up] += 1
+
+        if sink is not None:
+            path[0, :, 0], path[0, :, 1] = a, w
+            sink.append(path[0])
+        elif trajectories:
+            path[i, :, 0], path[i, :, 1] = a, w
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        period = np.where(crossings >= 2, (last_crossing - first_crossing) / (crossings - 1), np.nan)
+    summary = pd.DataFrame({'a0': a0, 'w0': w0, 'l': l, 'dt': dt, 'period': period, 'max_TE_drift': max_drift,
+                            'a': a, 'w': w})
+    if sink is not None:
+        return summary, sink
+    if trajectories:
+        return summary, path
+    return summary
@@ -1,7 +1,13 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'PSM-common'))  # Shared solver core
+from models import rolling_sphere, simulate
+
 # Constants
 g = 9.81  # gravity (m/s^2)
 alpha = np.radians(30)  # slope of the incline in radians
@@ -27,48 +33,20 @@ def calculate_energies(Vx, w, I, yc, m, g):
     return PE, KE, TE
 
 
-# Modified update_state function to use the midpoint method
-def update_state_midpoint(Sx, Vx, beta, w, I):
-    # Step 1: Calculate initial acceleration and angular acceleration
-    a_initial = g * np.sin(alpha) / (1 + I / (m * r**2))
-    eps_initial = a_initial / r
-
-    # Step 2: Update to midpoint values for velocity and angular velocity
-    Vx_mid = Vx + a_initial * dt / 2
-    w_mid = w + eps_initial * dt / 2
-
-    # Step 3: Calculate acceleration and angular acceleration at midpoint
-    a_mid = g * np.sin(alpha) / (1 + I / (m * r**2))
-    eps_mid = a_mid / r
-
-    # Step 4: Update actual state using midpoint values
-    Sx += Vx_mid * dt
-    Vx += a_mid * dt
-    beta += w_mid * dt
-    w += eps_mid * dt
+# Function to run the simulation with the midpoint method of the shared solver core; positions and energies are
+# computed from the whole state columns at once
+def run_simulation_midpoint(I):
+    states = simulate(rolling_sphere(I, m, r, alpha, g), [0, 0, 0, 0], dt, duration, 'midpoint')
+    Sx, Vx, beta, w = states['Sx'], states['Vx'], states['beta'], states['w']
+    a = np.full(len(states), g * np.sin(alpha) / (1 + I / (m * r**2)))  # Constant acceleration
+    eps = a / r
 
     # Calculate x and y components of the position
     xc = Sx * np.cos(alpha)
     yc = h - Sx * np.sin(alpha)
 
-    # Calculate energies
     PE, KE, TE = calculate_energies(Vx, w, I, yc, m, g)
-
-    return Sx, Vx, beta, w, a_mid, eps_mid, xc, yc, PE, KE, TE
-
-
-# Function to run the simulation with the midpoint method
-def run_simulation_midpoint(I):
-    time_steps = int(duration / dt)
-    data = np.zeros((time_steps, 12))
-
-    Sx = Vx = beta = w = 0
-
-    for i in range(time_steps):
-        t = i * dt
-        Sx, Vx, beta, w, a, eps, xc, yc, PE, KE, TE = update_state_midpoint(Sx, Vx, beta, w, I)
-        data[i] = [t, Sx, Vx, beta, w, a, eps, xc, yc, PE, KE, TE]
-
+    data = np.column_stack([states['t'], Sx, Vx, beta, w, a, eps, xc, yc, PE, KE, TE])
     return pd.DataFrame(data, columns=["t", "Sx", "Vx", "beta", "w", "a", "eps", "xc", "yc", "PE", "KE", "TE"])
 
 
@@ -0,0 +1,173 @@
+import numpy as np
+
+from main import G
+
+# Barnes-Hut force solver, a drop-in replacement for nbody.DirectSum: BarnesHut(...)(positions, masses, out).
+# Bodies are sorted into a quadtree (2D) or octree (3D), each node keeps its mass and centre of mass, and a node
+# seen from a body at distance r is used as one point mass when its size is below about theta * r, otherwise it
+# is opened. A node containing the body is always opened. theta = 0 gives the direct sum, larger values are
+# faster and less accurate.
+# The tree is built level by level for all bodies at once and walked for all targets at once, as arrays of
+# (target, node) pairs that are accepted, summed directly (leaves) or replaced by the node's children. The node
+# arrays are kept between calls and only grow when a tree needs more nodes than any before it.
+
+
+def _expand(counts):
+    # For groups of the given sizes: the group of every element and its position within the group
+    group = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(group)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return group, offsets
+
+
+class BarnesHut:
+    def __init__(self, G=G, theta=0.5, softening=0.0, leaf_size=8, max_depth=32, chunk=4096):
+        # leaf_size: nodes with at most this many bodies are not split; chunk: targets walked at once
+        self.G = G
+        self.theta = theta
+        self.softening = softening
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+        self.chunk = chunk
+        self._capacity = 0
+        self._d = None
+        self.node_count = 0
+
+    def _reserve(self, nodes, d):
+        # Make room for `nodes` nodes, keeping the ones already built when the arrays have to grow
+        if nodes <= self._capacity and d == self._d:
+            return
+        keep = self._capacity if d == self._d else 0
+        capacity = max(nodes, 2 * keep)
+        for name, shape, dtype in [('center', (capacity, d), float), ('half', (capacity,), float),
+                                   ('mass', (capacity,), float), ('com', (capacity, d), float),
+                                   ('reach2', (capacity,), float),
+                                   ('child_start', (capacity,), np.intp), ('child_count', (capacity,), np.intp),
+                                   ('leaf_start', (capacity,), np.intp), ('leaf_count', (capacity,), np.intp)]:
+            array = np.empty(shape, dtype=dtype)
+            if keep:
+                array[:keep] = getattr(self, name)
+            setattr(self, name, array)
+        self._capacity, self._d = capacity, d
+
+    def build(self, positions, masses):
+        n, d = positions.shape
+        branches = 2**d
+        self._reserve(max(2 * n // self.leaf_size + 1, 16), d)
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        self.center[0] = (low + high) / 2
+        self.half[0] = max(np.max(high - low) / 2, 1e-300) * (1 + 1e-12)
+        count = 1
+
+        members = np.arange(n)                   # Bodies still descending
+        node_of = np.zeros(n, dtype=np.intp)    # Their node at the current level
+        leaf_of = np.empty(n, dtype=np.intp)    # Leaf each body ends up in
+        level_start, level_end, depth = 0, 1, 0
+        bits = (1 << np.arange(d))
+        while len(members):
+            # Mass and centre of mass of the nodes on this level
+            local = node_of - level_start
+            size = level_end - level_start
+            level_mass = np.bincount(local, masses[members], minlength=size)
+            level = slice(level_start, level_end)
+            self.mass[level] = level_mass
+            for k in range(d):
+                weighted = np.bincount(local, masses[members] * positions[members, k], minlength=size)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    self.com[level, k] = np.where(level_mass > 0, weighted / level_mass, self.center[level, k])
+            bodies = np.bincount(local, minlength=size)
+            self.child_count[level] = 0
+
+            split = (bodies > self.leaf_size) & (depth < self.max_depth)
+            body_split = split[local]
+            leaf_of[members[~body_split]] = node_of[~body_split]
+            members, node_of = members[body_split], node_of[body_split]
+            if not len(members):
+                break
+
+            # Children: one per occupied octant (quadrant) of every split node
+            octant = (positions[members] > self.center[node_of]) @ bits
+            keys, inverse = np.unique((node_of - level_start) * branches + octant, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            parents = level_start + keys // branches
+            self._reserve(count + len(keys), d)
+            children = slice(count, count + len(keys))
+            signs = ((keys % branches)[:, None] & bits) > 0
+            self.half[children] = self.half[parents] / 2
+            self.center[children] = self.center[parents] + np.where(signs, 1.0, -1.0) * self.half[children, None]
+            first = np.unique(parents, return_index=True)
+            self.child_start[first[0]] = count + first[1]
+            self.child_count[first[0]] = np.bincount(parents - level_start, minlength=size)[first[0] - level_start]
+
+            node_of = count + inverse
+            level_start, level_end = count, count + len(keys)
+            count += len(keys)
+            depth += 1
+
+        self.node_count = count
+        self.order = np.argsort(leaf_of, kind='stable')
+        leaves = np.unique(leaf_of)
+        self.leaf_count[:count] = 0
+        self.leaf_count[leaves] = np.bincount(leaf_of)[leaves]
+        self.leaf_start[leaves] = np.searchsorted(leaf_of[self.order], leaves)
+        self._positions, self._masses = positions, masses
+
+    def _accumulate(self, out, targets, sources, masses, first):
+        # out[target - first] += G m (source - target) / (r^2 + eps^2)^1.5
+        diff = sources - self._positions[targets]
+        r2 = np.einsum('ij,ij->i', diff, diff) + self.softening**2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = np.where(r2 > 0, self.G * masses / (r2 * np.sqrt(r2)), 0.0)
+        for k in range(out.shape[1]):
+            out[:, k] += np.bincount(targets - first, diff[:, k] * factor, minlength=len(out))
+
+    def __call__(self, positions, masses, out=None):
+        positions = np.asarray(positions, dtype=float)
+        masses = np.asarray(masses, dtype=float)
+        if out is None:
+            out = np.empty_like(positions)
+        self.build(positions, masses)
+        # Opening criterion of Barnes (1994): a node is far when r > size / theta + |com - center|, which also
+        # opens nodes whose centre of mass sits off to the side of the target
+        count = self.node_count
+        reach = self.reach2[:count]
+        with np.errstate(divide='ignore'):
+            np.divide(4 * self.half[:count], 2 * self.theta, out=reach)  # size = 2 * half
+        reach += np.linalg.norm(self.com[:count] - self.center[:count], axis=1)
+        reach **= 2
+        # A target inside a node is at most sqrt(d) * half from its centre, so the criterion alone can accept such
+        # a node only for theta > 2 / sqrt(d)
+        n, d = positions.shape
+        contains_check = self.theta * np.sqrt(d) > 2 * (1 - 1e-9)
+        for first in range(0, n, self.chunk):
+            last = min(first + self.chunk, n)
+            block = out[first:last]
+            block.fill(0)
+            targets = np.arange(first, last)
+            nodes = np.zeros(len(targets), dtype=np.intp)
+            while len(targets):
+                diff = self.com[nodes] - positions[targets]
+                r2 = np.einsum('ij,ij->i', diff, diff)
+                far = self.reach2[nodes] < r2
+                if contains_check:
+                    # A node whose box contains the target is never far: its centre of mass would include the
+                    # target's own mass and pull the target towards itself
+                    candidates = np.flatnonzero(far)
+                    offset = np.abs(positions[targets[candidates]] - self.center[nodes[candidates]])
+                    far[candidates[np.all(offset <= self.half[nodes[candidates], None], axis=1)]] = False
+                self._accumulate(block, targets[far], self.com[nodes[far]], self.mass[nodes[far]], first)
+
+                near_targets, near_nodes = targets[~far], nodes[~far]
+                leaf = self.child_count[near_nodes] == 0
+                # Leaves that are too close: every body in them directly (the target itself adds nothing)
+                leaf_targets, leaf_nodes = near_targets[leaf], near_nodes[leaf]
+                group, offsets = _expand(self.leaf_count[leaf_nodes])
+                bodies = self.order[self.leaf_start[leaf_nodes][group] + offsets]
+                others = bodies != leaf_targets[group]
+                self._accumulate(block, leaf_targets[group][others], positions[bodies[others]],
+                                 masses[bodies[others]], first)
+                # Other nodes that are too close: continue with their children
+                open_targets, open_nodes = near_targets[~leaf], near_nodes[~leaf]
+                group, offsets = _expand(self.child_count[open_nodes])
+                targets = open_targets[group]
+                nodes = self.child_start[open_nodes][group] + offsets
+        return out
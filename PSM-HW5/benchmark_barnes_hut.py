@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+
+import main
+from barnes_hut import BarnesHut
+from nbody import DirectSum, NBody
+
+# Accuracy against speed of the Barnes-Hut solver compared with the direct sum, for a self-gravitating disk of
+# equal-mass bodies (2D, quadtree) and a ball (3D, octree) at several opening angles. The error is the RMS of
+# the acceleration errors relative to the RMS acceleration. Then both solvers drive the midpoint scheme of
+# main.py for a few steps through NBody, and the year of main.midpoint_method, to show the drop-in use.
+
+sizes = [1000, 4000, 16000]
+thetas = [0.3, 0.5, 0.7, 1.0]
+softening = 0.01
+
+
+def bodies(n, d, seed=0):
+    rng = np.random.default_rng(seed)
+    direction = rng.normal(size=(n, d))
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    radius = rng.random(n)**(1 / d) * rng.uniform(0.2, 1.0, n)  # Denser towards the middle
+    return direction * radius[:, None], np.full(n, 1 / n)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    for d in (2, 3):
+        print(f"\n{d}D")
+        print(f"{'N':>7} {'solver':>12} {'time (s)':>9} {'speedup':>8} {'RMS error':>10}")
+        for n in sizes:
+            positions, masses = bodies(n, d)
+            direct_time, reference = timed(DirectSum(G=1, softening=softening), positions, masses)
+            print(f"{n:>7} {'direct':>12} {direct_time:>9.3f} {1:>8.1f} {0:>10.1e}")
+            scale = np.sqrt(np.mean(np.sum(reference**2, axis=1)))
+            for theta in thetas:
+                solver = BarnesHut(G=1, theta=theta, softening=softening)
+                solver(positions, masses)  # Allocate the node arrays
+                tree_time, accelerations = timed(solver, positions, masses)
+                error = np.sqrt(np.mean(np.sum((accelerations - reference)**2, axis=1))) / scale
+                print(f"{n:>7} {f'theta={theta}':>12} {tree_time:>9.3f} {direct_time / tree_time:>8.1f} {error:>10.1e}")
+
+    # Drop-in use in the midpoint scheme: a rotating disk, 20 steps with either solver
+    positions, masses = bodies(4000, 2, seed=1)
+    velocities = np.column_stack([-positions[:, 1], positions[:, 0]])
+    runs = {}
+    for name, solver in [('direct', DirectSum(G=1, softening=softening)),
+                         ('theta=0.5', BarnesHut(G=1, theta=0.5, softening=softening))]:
+        system = NBody(positions, velocities, masses, solver=solver)
+        elapsed, _ = timed(system.run, 0.005, 20, 'midpoint')
+        runs[name] = (elapsed, system.positions)
+    difference = np.max(np.abs(runs['theta=0.5'][1] - runs['direct'][1]))
+    print(f"\nMidpoint, 4000 bodies, 20 steps: direct {runs['direct'][0]:.2f} s, Barnes-Hut {runs['theta=0.5'][0]:.2f} s, "
+          f"largest position difference {difference:.1e} (disk radius 1)")
+
+    # main.midpoint_method with the solver in its right-hand side; at any theta the node holding the Moon and the
+    # Earth is opened for both of them
+    args = (main.earth_pos, main.earth_vel, main.moon_pos, main.moon_vel, main.dt, main.duration)
+    _, reference = main.midpoint_method(*args, solver=DirectSum())
+    for theta in (0.5, 10.0):
+        elapsed, (_, moon) = timed(main.midpoint_method, *args, None, BarnesHut(theta=theta))
+        print(f"main.midpoint_method, one year, theta={theta}: {elapsed:.2f} s, largest Moon position difference to "
+              f"the direct sum {np.max(np.abs(moon - reference)) / main.R_zk:.1e} Earth-Moon distances")
@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+from main import earth_pos, earth_vel, moon_pos, moon_vel, R_zk
+from nbody import solar_system
+from respa import RESPA, ForceGroup, all_accelerations, earth_moon_respa
+
+# Accuracy against force evaluations over one year: single-step velocity Verlet at the one-day step of main.py and
+# at finer steps, against RESPA with the Moon sub-cycled. Errors are the largest position errors against velocity
+# Verlet at 15 minutes, in Earth-Moon distances, per body: the Earth and the Moon around the Sun, and the Moon
+# relative to the Earth (what a one-day step under-resolves). RESPA only buys the last one: the pair's motion
+# around the Sun keeps the error of the outer step, which the summary after the table spells out.
+# "Sun terms" counts evaluations of the Sun's pull on one body or on the barycentre, "Earth-Moon" evaluations of
+# the Earth-Moon pull.
+
+day = 24 * 3600
+duration = 365 * day
+
+
+def single_step(dt):
+    return RESPA([earth_pos, moon_pos], [earth_vel, moon_vel], [ForceGroup(all_accelerations)]), dt
+
+
+def counts(integrator):
+    evaluations = integrator.evaluations
+    if len(evaluations) == 1:
+        return 2 * evaluations[0], evaluations[0]
+    slow, tidal, fast = evaluations
+    return slow + 3 * tidal, fast  # A tidal evaluation takes two bodies and the barycentre
+
+
+if __name__ == "__main__":
+    reference = solar_system(recoil=False).run(day / 96, 96 * 365, 'verlet', every=96)[:, 1:]
+    runs = [
+        ('Verlet dt=1 day', *single_step(day)),
+        ('Verlet dt=1/4 day', *single_step(day / 4)),
+        ('Verlet dt=1/16 day', *single_step(day / 16)),
+        ('RESPA 1 day / 4 / 4', earth_moon_respa(earth_pos, earth_vel, moon_pos, moon_vel, 4, 4), day),
+        ('RESPA 1 day / 2 / 8', earth_moon_respa(earth_pos, earth_vel, moon_pos, moon_vel, 2, 8), day),
+        ('RESPA 1/4 day / 1 / 4', earth_moon_respa(earth_pos, earth_vel, moon_pos, moon_vel, 1, 4), day / 4),
+    ]
+    print(f"{'integrator':>22} {'Sun terms':>10} {'Earth-Moon':>11} {'time (s)':>9} {'Earth err':>10} {'Moon err':>10} "
+          f"{'Moon-Earth err':>15}")
+    results = {}
+    for name, integrator, dt in runs:
+        steps = int(round(duration / dt))
+        start = time.perf_counter()
+        trajectory = integrator.run(dt, steps, every=int(round(day / dt)))
+        elapsed = time.perf_counter() - start
+        earth_error, moon_error = np.max(np.linalg.norm(trajectory - reference, axis=2), axis=0) / R_zk
+        relative = (trajectory[:, 1] - trajectory[:, 0]) - (reference[:, 1] - reference[:, 0])
+        relative_error = np.max(np.linalg.norm(relative, axis=1)) / R_zk
+        sun_terms, earth_moon = counts(integrator)
+        results[name] = (sun_terms, earth_error, relative_error)
+        print(f"{name:>22} {sun_terms:>10} {earth_moon:>11} {elapsed:>9.2f} {earth_error:>10.2e} {moon_error:>10.2e} "
+              f"{relative_error:>15.2e}")
+
+    # The trade-off: each RESPA run against Verlet at its innermost step (same Earth-Moon evaluations) and at its
+    # outer step (same slow-force step)
+    print()
+    for name, outer, inner in [('RESPA 1 day / 4 / 4', 'Verlet dt=1 day', 'Verlet dt=1/16 day'),
+                               ('RESPA 1 day / 2 / 8', 'Verlet dt=1 day', 'Verlet dt=1/16 day'),
+                               ('RESPA 1/4 day / 1 / 4', 'Verlet dt=1/4 day', 'Verlet dt=1/16 day')]:
+        sun_terms, earth_error, relative_error = results[name]
+        print(f"{name}: the Moon around the Earth to {relative_error:.1e} ({inner}: {results[inner][2]:.1e}) with "
+              f"{sun_terms / results[inner][0]:.0%} of its Sun terms, but the Earth around the Sun only to "
+              f"{earth_error:.1e} ({outer}: {results[outer][1]:.1e}, {inner}: {results[inner][1]:.1e})")
@@ -1,6 +1,13 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'PSM-common'))  # Shared solver core
+from models import earth_moon, simulate
+from ode_core import as_table
+
 # Constants
 G = 6.6743e-11   # Gravitational constant (Nm^2/kg^2)
 M_s = 1.989e30   # Mass of the Sun (kg)
@@ -34,59 +41,47 @@ def gravitational_force(m1, m2, pos1, pos2):
     return force_magnitude * force_direction
 
 
-def midpoint_method(earth_pos, earth_vel, moon_pos, moon_vel, dt, duration):
-    # Store the simulation results
-    earth_trajectory = [earth_pos]
-    moon_trajectory = [moon_pos]
-
-    time = 0
-    while time < duration:
-        # Forces acting on Earth and Moon
-        force_on_earth = gravitational_force(M_z, M_s, earth_pos, np.array([0, 0]))
-        force_on_moon = gravitational_force(M_k, M_z, moon_pos, earth_pos) + gravitational_force(M_k, M_s, moon_pos, np.array([0, 0]))
-
-        # Initial Euler step to estimate midpoint velocity
-        mid_earth_vel = earth_vel + force_on_earth / M_z * dt / 2
-        mid_moon_vel = moon_vel + force_on_moon / M_k * dt / 2
-
-        # Midpoint positions
-        mid_earth_pos = earth_pos + mid_earth_vel * dt / 2
-        mid_moon_pos = moon_pos + mid_moon_vel * dt / 2
-
-        # Recalculate forces at midpoint
-        mid_force_on_earth = gravitational_force(M_z, M_s, mid_earth_pos, np.array([0, 0]))
-        mid_force_on_moon = gravitational_force(M_k, M_z, mid_moon_pos, mid_earth_pos) + gravitational_force(M_k, M_s, mid_moon_pos, np.array([0, 0]))
-
-        # Update velocities and positions using midpoint values
-        earth_vel += mid_force_on_earth / M_z * dt
-        moon_vel += mid_force_on_moon / M_k * dt
-        earth_pos += mid_earth_vel * dt
-        moon_pos += mid_moon_vel * dt
-
-        earth_trajectory.append(earth_pos.copy())
-        moon_trajectory.append(moon_pos.copy())
-
-        time += dt
-
-    return earth_trajectory, moon_trajectory
-
-
-# Run the simulation
-earth_trajectory, moon_trajectory = midpoint_method(earth_pos, earth_vel, moon_pos, moon_vel, dt, duration)
-
-# Convert to arrays for plotting
-earth_trajectory = np.array(earth_trajectory)
-moon_trajectory = np.array(moon_trajectory)
-
-# Plot Earth and Moon trajectories
-plt.figure(figsize=(10, 10))
-plt.plot(earth_trajectory[:, 0], earth_trajectory[:, 1], label='Earth Trajectory')
-plt.plot(moon_trajectory[:, 0], moon_trajectory[:, 1], label='Moon Trajectory')
-plt.scatter([0], [0], color='yellow', label='Sun')  # Sun's position
-plt.xlabel('X Position (m)')
-plt.ylabel('Y Position (m)')
-plt.title('Earth and Moon Trajectory around the Sun')
-plt.legend()
-plt.grid(True)
-plt.axis('equal')  # To maintain aspect ratio
-plt.show()
+def orbital_energy(earth_pos, earth_vel, moon_pos, moon_vel):
+    # Total energy of Earth and Moon around the Sun fixed in the origin: kinetic energies plus the Sun-Earth,
+    # Sun-Moon and Earth-Moon potential energies. Positions and velocities can be (..., 2) arrays of states
+    KE = 0.5 * M_z * np.sum(earth_vel**2, axis=-1) + 0.5 * M_k * np.sum(moon_vel**2, axis=-1)
+    PE = (-G * M_s * M_z / np.linalg.norm(earth_pos, axis=-1)
+          - G * M_s * M_k / np.linalg.norm(moon_pos, axis=-1)
+          - G * M_z * M_k / np.linalg.norm(moon_pos - earth_pos, axis=-1))
+    return KE + PE
+
+
+def midpoint_method(earth_pos, earth_vel, moon_pos, moon_vel, dt, duration, sink=None, solver=None):
+    # Earth and Moon trajectories, (steps + 1, 2) arrays of positions, from the midpoint method of the shared
+    # solver core (the same forces as gravitational_force, Sun fixed in the origin). With a sink
+    # (PSM-common/trajectory.py, dtype ode_core.result_dtype(models.earth_moon().fields)) the full states are
+    # streamed into it instead and the sink is returned.
+    # solver computes the accelerations: None sums the pair forces directly, or pass an N-body force solver such
+    # as nbody.DirectSum() or barnes_hut.BarnesHut(theta=0.5)
+    model = earth_moon(G, M_s, M_z, solver)
+    y0 = np.concatenate([earth_pos, moon_pos, earth_vel, moon_vel])
+    if sink is not None:
+        return simulate(model, y0, dt, duration, 'midpoint', sink=sink)
+    states = as_table(simulate(model, y0, dt, duration, 'midpoint'))
+    return states[:, 1:3], states[:, 3:5]
+
+if __name__ == "__main__":
+    # Run the simulation
+    earth_trajectory, moon_trajectory = midpoint_method(earth_pos, earth_vel, moon_pos, moon_vel, dt, duration)
+
+    # Convert to arrays for plotting
+    earth_trajectory = np.array(earth_trajectory)
+    moon_trajectory = np.array(moon_trajectory)
+
+    # Plot Earth and Moon trajectories
+    plt.figure(figsize=(10, 10))
+    plt.plot(earth_trajectory[:, 0], earth_trajectory[:, 1], label='Earth Trajectory')
+    plt.plot(moon_trajectory[:, 0], moon_trajectory[:, 1], label='Moon Trajectory')
+    plt.scatter([0], [0], color='yellow', label='Sun')  # Sun's position
+    plt.xlabel('X Position (m)')
+    plt.ylabel('Y Position (m)')
+    plt.title('Earth and Moon Trajectory around the Sun')
+    plt.legend()
+    plt.grid(True)
+    plt.axis('equal')  # To maintain aspect ratio
+    plt.show()
@@ -0,0 +1,117 @@
+import numpy as np
+
+from main import G, M_s, M_z, M_k
+
+# Multiple-time-step (r-RESPA) integration: the forces are split into groups from slow to fast, and every group
+# gets its own step. The slowest group kicks the velocities with its own step, the next group sub-cycles that
+# step in `substeps` pieces, and so on; only the fastest group's step drifts the positions. Each level is a
+# velocity Verlet step, so the scheme stays symplectic.
+# For main.py the Sun's pull on the Earth-Moon pair as a whole changes over the year, while the Earth-Moon pull
+# and the Sun's tidal pull (the difference between the Sun's pull on each body and on their barycentre) change
+# over the month. The first is evaluated once per (day-long) outer step, the others are sub-cycled inside it.
+# Only the motion within the pair gains from the sub-steps: the barycentre, and with it the Earth and the Moon
+# seen from the Sun, keeps the error of the outer step (benchmark_respa.py).
+# Unlike main.py the Earth also feels the Moon, as in nbody.py.
+
+
+class ForceGroup:
+    # acceleration(positions, out) of one group of forces and the number of its steps per step of the group
+    # above it (ignored for the slowest group)
+    def __init__(self, acceleration, substeps=1):
+        self.acceleration = acceleration
+        self.substeps = substeps
+        self.evaluations = 0
+
+
+def sun_accelerations(positions, out):
+    # The Sun, fixed in the origin as in main.py, on Earth and Moon (positions rows)
+    r = np.sqrt(np.einsum('ij,ij->i', positions, positions))
+    np.multiply(positions, (-G * M_s / r**3)[:, None], out=out)
+    return out
+
+
+def sun_barycenter_accelerations(positions, out):
+    # Slow group: the Sun's pull on the Earth-Moon barycentre, the same acceleration for both bodies
+    barycenter = (M_z * positions[0] + M_k * positions[1]) / (M_z + M_k)
+    out[:] = -G * M_s / np.dot(barycenter, barycenter)**1.5 * barycenter
+    return out
+
+
+def sun_tidal_accelerations(positions, out):
+    # Medium group: what the Sun's pull on each body adds to the pull on the barycentre
+    sun_accelerations(positions, out)
+    out -= sun_barycenter_accelerations(positions, np.empty_like(out))
+    return out
+
+
+def earth_moon_accelerations(positions, out):
+    # Fast group: Earth and Moon on each other
+    moon_earth = positions[1] - positions[0]
+    pull = G / np.dot(moon_earth, moon_earth)**1.5 * moon_earth
+    out[0], out[1] = M_k * pull, -M_z * pull
+    return out
+
+
+def all_accelerations(positions, out):
+    # Every force as one group, i.e. plain velocity Verlet
+    sun_accelerations(positions, out)
+    out += earth_moon_accelerations(positions, np.empty_like(out))
+    return out
+
+
+class RESPA:
+    def __init__(self, positions, velocities, groups):
+        # groups: ForceGroups from the slowest to the fastest
+        self.positions = np.array(positions, dtype=float)
+        self.velocities = np.array(velocities, dtype=float)
+        self.groups = groups
+        self._accelerations = [np.empty_like(self.positions) for _ in groups]
+        self._fresh = [False] * len(groups)  # Whether a group's accelerations belong to the current positions
+
+    def _kick(self, level, h):
+        if not self._fresh[level]:
+            group = self.groups[level]
+            group.acceleration(self.positions, self._accelerations[level])
+            group.evaluations += 1
+            self._fresh[level] = True
+        self.velocities += self._accelerations[level] * h
+
+    def _step(self, level, h):
+        self._kick(level, h / 2)
+        if level + 1 < len(self.groups):
+            substeps = self.groups[level + 1].substeps
+            for _ in range(substeps):
+                self._step(level + 1, h / substeps)
+        else:
+            self.positions += self.velocities * h
+            self._fresh = [False] * len(self.groups)
+        self._kick(level, h / 2)
+
+    def run(self, dt, steps, every=1, sink=None):
+        # dt is the step of the slowest group; returns the positions at the start and every `every`-th step,
+        # or streams them into sink (PSM-common/trajectory.py, record shape (bodies, d)) and returns that
+        if sink is None:
+            trajectory = np.empty((steps // every + 1,) + self.positions.shape)
+            trajectory[0] = self.positions
+        else:
+            sink.append(self.positions)
+        for i in range(1, steps + 1):
+            self._step(0, dt)
+            if i % every == 0:
+                if sink is None:
+                    trajectory[i // every] = self.positions
+                else:
+                    sink.append(self.positions)
+        return trajectory if sink is None else sink
+
+    @property
+    def evaluations(self):
+        return [group.evaluations for group in self.groups]
+
+
+def earth_moon_respa(earth_pos, earth_vel, moon_pos, moon_vel, tidal_substeps=4, moon_substeps=4):
+    # The system of main.py: per outer step the Sun's tidal pull is applied tidal_substeps times and the
+    # Earth-Moon pull tidal_substeps * moon_substeps times
+    return RESPA([earth_pos, moon_pos], [earth_vel, moon_vel],
+                 [ForceGroup(sun_barycenter_accelerations), ForceGroup(sun_tidal_accelerations, tidal_substeps),
+                  ForceGroup(earth_moon_accelerations, moon_substeps)])
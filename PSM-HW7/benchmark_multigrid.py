@@ -0,0 +1,53 @@
+import sys
+import time
+
+import numpy as np
+
+from heat_solver import initialize_plate, jacobi_sweep, residual_norm
+from main import edge_temperature, update_temperature
+from multigrid import multigrid_solve
+
+# Compares the original 1000-iteration update_temperature loop with V- and F-cycle multigrid.
+# Multigrid is asked for the residual the original loop ends with. For large plates the Python loop would
+# take hours, so its time is extrapolated from a few sweeps and its residual comes from the vectorized
+# Jacobi sweep (same arithmetic, identical values).
+# Usage: python benchmark_multigrid.py [n ...]
+
+sizes = [int(arg) for arg in sys.argv[1:]] or [41, 65, 129, 257, 513, 1025, 2049, 4097]
+iterations = 1000  # As in main.py before the solvers were added
+measured_limit = 65  # Largest n for which the full Python loop is actually run
+
+
+def time_reference(T, n):
+    sweeps = iterations if n <= measured_limit else 3
+    start = time.perf_counter()
+    for _ in range(sweeps):
+        T = update_temperature(T, n)
+    elapsed = time.perf_counter() - start
+    return elapsed * iterations / sweeps, sweeps < iterations
+
+
+def reference_residual(T):
+    buffers = (T.copy(), T.copy())
+    for i in range(iterations):
+        jacobi_sweep(buffers[i % 2], buffers[(i + 1) % 2])
+    return residual_norm(buffers[iterations % 2], np.empty((T.shape[0] - 2, T.shape[1] - 2)))
+
+
+print(f"{'n':>6} {'loop time (s)':>16} {'loop residual':>14} {'V cycles':>9} {'V time (s)':>11} "
+      f"{'F cycles':>9} {'F time (s)':>11} {'V cycles to 1e-6':>17}")
+for n in sizes:
+    T = initialize_plate(n, edge_temperature)
+    loop_time, estimated = time_reference(T, n)
+    target = reference_residual(T)
+
+    results = []
+    for cycle in ('V', 'F'):
+        start = time.perf_counter()
+        _, cycles, _ = multigrid_solve(T, cycle=cycle, tol=target)
+        results.append((cycles, time.perf_counter() - start))
+    _, cycles_tight, _ = multigrid_solve(T, cycle='V', tol=1e-6)
+
+    loop_label = f"{loop_time:.2f}" + (" (est.)" if estimated else "")
+    print(f"{n:>6} {loop_label:>16} {target:>14.2e} {results[0][0]:>9} {results[0][1]:>11.3f} "
+          f"{results[1][0]:>9} {results[1][1]:>11.3f} {cycles_tight:>17}")
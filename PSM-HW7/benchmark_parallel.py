@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from heat_solver import initialize_plate, solve_plate
+from main import edge_temperature
+from parallel_solver import parallel_jacobi
+
+# Strong scaling of the domain-decomposed Jacobi solver: a fixed number of sweeps on one plate,
+# from 1 worker up to the core count, against the serial vectorized sweep.
+# Usage: python benchmark_parallel.py [n] [sweeps]
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8192
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    cores = os.cpu_count()
+    worker_counts = sorted({2**k for k in range(cores.bit_length()) if 2**k <= cores} | {cores})
+
+    T = initialize_plate(n, edge_temperature)
+    start = time.perf_counter()
+    serial, _, _ = solve_plate(T, 'jacobi', tol=0, max_iterations=sweeps, check_every=sweeps)
+    serial_time = time.perf_counter() - start
+    print(f"n = {n}, {sweeps} sweeps, {cores} cores")
+    print(f"{'workers':>8} {'time (s)':>10} {'speedup':>8} {'efficiency':>11} {'identical':>10}")
+    print(f"{'serial':>8} {serial_time:>10.3f} {1:>8.2f} {1:>11.2f} {'-':>10}")
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        result, _, _ = parallel_jacobi(T, workers, tol=0, max_iterations=sweeps, check_every=sweeps)
+        elapsed = time.perf_counter() - start
+        speedup = serial_time / elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {speedup:>8.2f} {speedup / workers:>11.2f} "
+              f"{str(np.array_equal(result, serial)):>10}")
@@ -0,0 +1,78 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+# Direct sparse solver for the plate. The 5-point Laplacian only depends on the grid size, so it is built and
+# LU-factorized once per size and cached; every new set of edge temperatures then costs one pair of
+# triangular solves. The right-hand side is linear in the four edge values, so a whole batch of boundary
+# configurations is turned into one multi-right-hand-side solve.
+
+EDGES = ('top', 'bottom', 'left', 'right')
+
+_factorizations = {}  # (n, m) -> (SuperLU factorization, (interior cells, 4) edge coupling matrix)
+
+
+def _second_difference(size):
+    return sp.diags([-1, 2, -1], [-1, 0, 1], shape=(size, size), dtype=float)
+
+
+def laplacian(n, m=None):
+    # 5-point Laplacian (4 on the diagonal, -1 for each neighbour) over the (n-2) x (m-2) interior, row-major
+    m = n if m is None else m
+    p, q = n - 2, m - 2
+    return (sp.kron(sp.identity(p), _second_difference(q)) + sp.kron(_second_difference(p), sp.identity(q))).tocsc()
+
+
+def _edge_coupling(n, m):
+    # Column k holds, for every interior cell, how many of its neighbours lie on edge EDGES[k]
+    p, q = n - 2, m - 2
+    coupling = np.zeros((p, q, 4))
+    coupling[0, :, 0] = 1   # top
+    coupling[-1, :, 1] = 1  # bottom
+    coupling[:, 0, 2] = 1   # left
+    coupling[:, -1, 3] = 1  # right
+    return coupling.reshape(p * q, 4)
+
+
+def get_factorization(n, m=None):
+    m = n if m is None else m
+    key = (n, m)
+    if key not in _factorizations:
+        _factorizations[key] = (splu(laplacian(n, m)), _edge_coupling(n, m))
+    return _factorizations[key]
+
+
+def clear_factorization_cache():
+    _factorizations.clear()
+
+
+def _edge_values(edge_temperatures):
+    return np.array([[float(edges[edge]) for edges in edge_temperatures] for edge in EDGES])
+
+
+def _fill_boundaries(plates, values):
+    # plates: (k, n, m), values: (4, k); corners stay at 0 as in main.py
+    plates[:, 0, 1:-1] = values[0][:, None]
+    plates[:, -1, 1:-1] = values[1][:, None]
+    plates[:, 1:-1, 0] = values[2][:, None]
+    plates[:, 1:-1, -1] = values[3][:, None]
+
+
+def solve_direct_batch(n, edge_temperatures, m=None):
+    # Solve the plate for a list of edge_temperature dicts at once, returns a (k, n, m) array
+    m = n if m is None else m
+    values = _edge_values(edge_temperatures)
+    plates = np.zeros((len(edge_temperatures), n, m))
+    _fill_boundaries(plates, values)
+    if n < 3 or m < 3 or not edge_temperatures:
+        return plates
+
+    lu, coupling = get_factorization(n, m)
+    interior = lu.solve(coupling @ values)  # (interior cells, k), one multi-right-hand-side solve
+    plates[:, 1:-1, 1:-1] = interior.T.reshape(len(edge_temperatures), n - 2, m - 2)
+    return plates
+
+
+def solve_direct(n, edge_temperature, m=None):
+    # Solve the plate for a single edge_temperature dict, returns an (n, m) array
+    return solve_direct_batch(n, [edge_temperature], m)[0]
@@ -0,0 +1,125 @@
+import numpy as np
+
+# Vectorized solvers for the steady-state heat distribution in a square plate (Laplace equation, 5-point stencil).
+# Every sweep writes into buffers allocated once before the iteration starts, so nothing is allocated per iteration.
+
+METHODS = ('jacobi', 'gauss-seidel', 'sor')
+
+
+def initialize_plate(n, edge_temperature, m=None):
+    # Build an n x m grid with the edges set from the edge_temperature dict (corners stay at 0 as in main.py)
+    m = n if m is None else m
+    T = np.zeros((n, m))
+    T[1:-1, 0] = edge_temperature['left']     # Left edge without corners
+    T[1:-1, -1] = edge_temperature['right']   # Right edge without corners
+    T[0, 1:-1] = edge_temperature['top']      # Top edge without corners
+    T[-1, 1:-1] = edge_temperature['bottom']  # Bottom edge without corners
+    return T
+
+
+def optimal_omega(n, m=None):
+    # Optimal SOR relaxation factor for the Dirichlet problem on an n x m grid,
+    # derived from the spectral radius of the Jacobi iteration matrix
+    m = n if m is None else m
+    rho = 0.5 * (np.cos(np.pi / (n - 1)) + np.cos(np.pi / (m - 1)))
+    return 2 / (1 + np.sqrt(1 - rho**2))
+
+
+def stencil_views(T, row_start, col_start, step):
+    # Views of the cells (starting at row_start/col_start with the given stride) and their four neighbours
+    center = T[row_start:-1:step, col_start:-1:step]
+    up = T[row_start - 1:-2:step, col_start:-1:step]
+    down = T[row_start + 1::step, col_start:-1:step]
+    left = T[row_start:-1:step, col_start - 1:-2:step]
+    right = T[row_start:-1:step, col_start + 1::step]
+    return center, up, down, left, right
+
+
+def color_views(T):
+    # Red cells have an even (i + j), black cells an odd one; each color is made of two strided sub-lattices
+    red = [stencil_views(T, 1, 1, 2), stencil_views(T, 2, 2, 2)]
+    black = [stencil_views(T, 1, 2, 2), stencil_views(T, 2, 1, 2)]
+    return red, black
+
+
+def neighbour_sum(up, down, left, right, out):
+    np.add(up, down, out=out)
+    np.add(out, left, out=out)
+    np.add(out, right, out=out)
+    return out
+
+
+def jacobi_sweep(T, T_new):
+    # One Jacobi sweep: every interior cell of T_new becomes the average of its neighbours in T
+    center, up, down, left, right = stencil_views(T, 1, 1, 1)
+    interior = T_new[1:-1, 1:-1]
+    neighbour_sum(up, down, left, right, interior)
+    np.multiply(interior, 0.25, out=interior)
+    return T_new
+
+
+def _relax_color(views, scratch, omega):
+    # Gauss-Seidel (omega == 1) or SOR update of one color, in place
+    for (center, up, down, left, right), buffer in zip(views, scratch):
+        if center.size == 0:
+            continue
+        if omega == 1:
+            neighbour_sum(up, down, left, right, center)
+            np.multiply(center, 0.25, out=center)
+        else:
+            neighbour_sum(up, down, left, right, buffer)
+            np.multiply(buffer, 0.25 * omega, out=buffer)
+            np.multiply(center, 1 - omega, out=center)
+            np.add(center, buffer, out=center)
+
+
+def residual_norm(T, r):
+    # Max norm of the scaled residual (neighbour average - T) over the interior, i.e. how far T is from
+    # satisfying the 5-point equations, in temperature units. r is a preallocated (n-2) x (m-2) buffer.
+    center, up, down, left, right = stencil_views(T, 1, 1, 1)
+    neighbour_sum(up, down, left, right, r)
+    np.multiply(r, 0.25, out=r)
+    np.subtract(r, center, out=r)
+    np.abs(r, out=r)
+    return r.max()
+
+
+def solve_plate(T, method='sor', tol=1e-6, max_iterations=1_000_000, omega=None, check_every=10):
+    # Iterate on T (boundary values already set) until the residual drops below tol.
+    # Returns the solution, the number of sweeps done and the final residual.
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+
+    T = np.array(T, dtype=float)
+    if T.shape[0] < 3 or T.shape[1] < 3:
+        return T, 0, 0.0
+    r = np.empty((T.shape[0] - 2, T.shape[1] - 2))
+
+    if method == 'jacobi':
+        # Double buffer: both arrays carry the same boundary, sweeps alternate between them
+        T_other = T.copy()
+        buffers = (T, T_other)
+    else:
+        if method == 'gauss-seidel':
+            omega = 1
+        elif omega is None:
+            omega = optimal_omega(*T.shape)
+        red, black = color_views(T)
+        scratch = [np.empty(views[0].shape) for views in red + black]
+
+    residual = residual_norm(T, r)
+    iterations = 0
+    while residual > tol and iterations < max_iterations:
+        if method == 'jacobi':
+            jacobi_sweep(buffers[iterations % 2], buffers[(iterations + 1) % 2])
+        else:
+            _relax_color(red, scratch[:2], omega)
+            _relax_color(black, scratch[2:], omega)
+        iterations += 1
+        if iterations % check_every == 0 or iterations == max_iterations:
+            current = buffers[iterations % 2] if method == 'jacobi' else T
+            residual = residual_norm(current, r)
+
+    if method == 'jacobi':
+        T = buffers[iterations % 2]
+    return T, iterations, residual
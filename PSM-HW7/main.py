@@ -1,16 +1,13 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from heat_solver import initialize_plate, solve_plate
+
 # Constants
 n = 41  # Total nodes in one dimension
 edge_temperature = {'top': 200, 'bottom': 150, 'left': 100, 'right': 50}  # edge temperatures as in Lab7.pdf (in Celsius)
-
-# Initialize the temperature grid
-temperature = np.zeros((n, n))
-temperature[1:-1, 0] = edge_temperature['left']     # Left edge without corners
-temperature[1:-1, -1] = edge_temperature['right']   # Right edge without corners
-temperature[0, 1:-1] = edge_temperature['top']      # Top edge without corners
-temperature[-1, 1:-1] = edge_temperature['bottom']  # Bottom edge without corners
+method = 'sor'  # 'jacobi', 'gauss-seidel' or 'sor' (relaxation factor chosen automatically)
+tolerance = 1e-6  # Stop once no cell is further than this from the average of its neighbours (in Celsius)
 
 
 def update_temperature(T, n):
@@ -21,16 +18,19 @@ def update_temperature(T, n):
     return T_new
 
 
-# Iteratively solve the system using an approximation method
-iterations = 1000  # Number of iterations to refine the solution
-for _ in range(iterations):
-    temperature = update_temperature(temperature, n)
+if __name__ == "__main__":
+    # Initialize the temperature grid (edges from edge_temperature, corners stay at 0)
+    temperature = initialize_plate(n, edge_temperature)
+
+    # Iteratively solve the system until the residual drops below the tolerance
+    temperature, iterations, residual = solve_plate(temperature, method=method, tol=tolerance)
+    print(f"{method}: {iterations} sweeps, residual {residual:.2e}")
 
-# Plot the temperature distribution
-plt.figure(figsize=(10, 8))
-plt.imshow(temperature, cmap='inferno', interpolation='nearest')
-plt.colorbar(label='Temperature (°C)')
-plt.title('Temperature Distribution in a Square Plate')
-plt.xlabel('X Coordinate')
-plt.ylabel('Y Coordinate')
-plt.show()
+    # Plot the temperature distribution
+    plt.figure(figsize=(10, 8))
+    plt.imshow(temperature, cmap='inferno', interpolation='nearest')
+    plt.colorbar(label='Temperature (°C)')
+    plt.title('Temperature Distribution in a Square Plate')
+    plt.xlabel('X Coordinate')
+    plt.ylabel('Y Coordinate')
+    plt.show()
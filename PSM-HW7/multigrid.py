@@ -0,0 +1,160 @@
+import numpy as np
+
+from heat_solver import color_views, optimal_omega, residual_norm, stencil_views
+
+# Geometric multigrid for the same Dirichlet plate problem as main.py.
+# Level 0 is the plate itself (spacing h = 1); every coarser level halves the number of intervals,
+# so a grid coarsens as long as (n - 1) and (m - 1) are even. 2^k + 1 grids coarsen all the way down.
+# On each level we solve (4u - sum of neighbours) / h^2 = f, with f = 0 on the plate and u = boundary values.
+
+COARSEST_SIZE = 5  # Stop coarsening once a side has this many nodes or fewer
+CYCLES = ('V', 'F')
+
+
+def _level_shapes(shape):
+    shapes = [shape]
+    n, m = shape
+    while (n - 1) % 2 == 0 and (m - 1) % 2 == 0 and min(n, m) > COARSEST_SIZE:
+        n, m = (n - 1) // 2 + 1, (m - 1) // 2 + 1
+        shapes.append((n, m))
+    return shapes
+
+
+class _Level:
+    # All buffers of one grid level, allocated once before the cycles start
+    def __init__(self, shape, h):
+        self.h2 = float(h)**2
+        self.u = np.zeros(shape)
+        self.f = np.zeros(shape)
+        self.r = np.zeros(shape)
+        self.correction = np.zeros(shape)
+        self.red, self.black = color_views(self.u)
+        self.f_red, self.f_black = color_views(self.f)
+        self.scratch = [np.empty(views[0].shape) for views in self.red + self.black]
+        self.restrict_scratch = None  # set for every level that has a coarser one
+        self.omega = optimal_omega(*shape)
+
+
+def _smooth(level, sweeps, omega=1.0):
+    # Red-black Gauss-Seidel (omega = 1) or SOR sweeps on (4u - sum) / h^2 = f, in place
+    scratch = iter(level.scratch)
+    colors = ((level.red, level.f_red), (level.black, level.f_black))
+    buffers = [[next(scratch) for _ in views] for views, _ in colors]
+    for _ in range(sweeps):
+        for (views, f_views), color_buffers in zip(colors, buffers):
+            for (center, up, down, left, right), f_view, buffer in zip(views, f_views, color_buffers):
+                if center.size == 0:
+                    continue
+                np.multiply(f_view[0], level.h2, out=buffer)
+                np.add(buffer, up, out=buffer)
+                np.add(buffer, down, out=buffer)
+                np.add(buffer, left, out=buffer)
+                np.add(buffer, right, out=buffer)
+                np.multiply(buffer, 0.25 * omega, out=buffer)
+                np.multiply(center, 1 - omega, out=center)
+                np.add(center, buffer, out=center)
+
+
+def _compute_residual(level):
+    # r = f - (4u - sum of neighbours) / h^2 on the interior, zero on the boundary
+    center, up, down, left, right = stencil_views(level.u, 1, 1, 1)
+    r = level.r[1:-1, 1:-1]
+    np.add(up, down, out=r)
+    np.add(r, left, out=r)
+    np.add(r, right, out=r)
+    np.multiply(r, 0.25, out=r)
+    np.subtract(r, center, out=r)
+    np.multiply(r, 4 / level.h2, out=r)
+    np.add(r, level.f[1:-1, 1:-1], out=r)
+
+
+def _restrict(fine, coarse):
+    # Full-weighting restriction of the fine residual into the coarse right-hand side
+    r = fine.r
+    out = coarse.f[1:-1, 1:-1]
+    tmp = fine.restrict_scratch
+    np.add(r[1:-2:2, 2:-1:2], r[3::2, 2:-1:2], out=out)      # north + south
+    np.add(out, r[2:-1:2, 1:-2:2], out=out)                   # west
+    np.add(out, r[2:-1:2, 3::2], out=out)                     # east
+    np.multiply(out, 2, out=out)
+    np.multiply(r[2:-1:2, 2:-1:2], 4, out=tmp)                # center
+    np.add(out, tmp, out=out)
+    np.add(r[1:-2:2, 1:-2:2], r[1:-2:2, 3::2], out=tmp)       # corners
+    np.add(tmp, r[3::2, 1:-2:2], out=tmp)
+    np.add(tmp, r[3::2, 3::2], out=tmp)
+    np.add(out, tmp, out=out)
+    np.multiply(out, 1 / 16, out=out)
+
+
+def _prolongate_and_correct(coarse, fine):
+    # Bilinear interpolation of the coarse error, added onto the fine solution.
+    # The coarse error is zero on the boundary, so the fine boundary values are left untouched.
+    e = coarse.u
+    c = fine.correction
+    c[::2, ::2] = e
+    np.add(e[:-1, :], e[1:, :], out=c[1::2, ::2])
+    np.multiply(c[1::2, ::2], 0.5, out=c[1::2, ::2])
+    np.add(e[:, :-1], e[:, 1:], out=c[::2, 1::2])
+    np.multiply(c[::2, 1::2], 0.5, out=c[::2, 1::2])
+    odd = c[1::2, 1::2]
+    np.add(e[:-1, :-1], e[1:, :-1], out=odd)
+    np.add(odd, e[:-1, 1:], out=odd)
+    np.add(odd, e[1:, 1:], out=odd)
+    np.multiply(odd, 0.25, out=odd)
+    np.add(fine.u, c, out=fine.u)
+
+
+def _solve_coarsest(level, tol=1e-12, max_sweeps=10_000):
+    # SOR on the coarsest grid until its residual is negligible compared to the right-hand side
+    scale = max(np.abs(level.f).max(), 1e-300)
+    for _ in range(0, max_sweeps, 10):
+        _smooth(level, 10, level.omega)
+        _compute_residual(level)
+        if np.abs(level.r).max() <= tol * scale:
+            break
+
+
+def _cycle(levels, index, cycle, pre, post):
+    level = levels[index]
+    if index == len(levels) - 1:
+        _solve_coarsest(level)
+        return
+
+    coarse = levels[index + 1]
+    _smooth(level, pre)
+    _compute_residual(level)
+    _restrict(level, coarse)
+    coarse.u.fill(0)
+    if cycle == 'F':
+        # F-cycle: an F-cycle on the coarse level followed by a V-cycle there
+        _cycle(levels, index + 1, 'F', pre, post)
+        _cycle(levels, index + 1, 'V', pre, post)
+    else:
+        _cycle(levels, index + 1, 'V', pre, post)
+    _prolongate_and_correct(coarse, level)
+    _smooth(level, post)
+
+
+def multigrid_solve(T, cycle='V', tol=1e-6, max_cycles=100, pre=2, post=2):
+    # Solve the plate with T's boundary values (interior used as the initial guess) until residual_norm <= tol.
+    # Returns the solution, the number of cycles done and the final residual.
+    if cycle not in CYCLES:
+        raise ValueError(f"Unknown cycle '{cycle}', expected one of {CYCLES}")
+
+    shapes = _level_shapes(np.shape(T))
+    levels = [_Level(shape, 2**i) for i, shape in enumerate(shapes)]
+    for fine, coarse in zip(levels, levels[1:]):
+        fine.restrict_scratch = np.empty((coarse.u.shape[0] - 2, coarse.u.shape[1] - 2))
+    levels[0].u[:] = T
+    r = np.empty((shapes[0][0] - 2, shapes[0][1] - 2))
+
+    residual = residual_norm(levels[0].u, r)
+    cycles = 0
+    while residual > tol and cycles < max_cycles:
+        if len(levels) == 1:
+            _smooth(levels[0], 10, levels[0].omega)  # Grid cannot be coarsened, fall back to plain SOR
+        else:
+            _cycle(levels, 0, cycle, pre, post)
+        cycles += 1
+        residual = residual_norm(levels[0].u, r)
+    return levels[0].u, cycles, residual
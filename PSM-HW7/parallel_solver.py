@@ -0,0 +1,91 @@
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from heat_solver import jacobi_sweep, residual_norm
+
+# Domain-decomposed Jacobi for large plates. Both Jacobi buffers live in shared memory and the interior rows are
+# split into one horizontal strip per worker process. A worker only writes its own strip; the row above and
+# below it (its one-cell halo) belong to the neighbouring strips and are read straight from shared memory after
+# the barrier that ends every sweep, so no array is ever pickled. Every cell goes through exactly the same
+# operations as in heat_solver.jacobi_sweep and residual checks happen at the same sweeps as solve_plate,
+# so the result is bit for bit the serial Jacobi solution.
+
+
+def _attach(name, shape, dtype=float):
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _worker(index, rows, names, shape, workers, barrier, tol, max_iterations, check_every):
+    memories, arrays = zip(*(_attach(name, shape) for name in names[:2]))
+    status_memory, status = _attach(names[2], (workers + 1,))
+    first, last = rows
+    # Strip views including the halo rows; jacobi_sweep writes only their interior rows (the owned ones)
+    strips = [array[first - 1:last + 1] for array in arrays]
+    r = np.empty((last - first, shape[1] - 2))
+
+    def global_residual(strip):
+        status[index] = residual_norm(strip, r) if last > first else 0.0
+        barrier.wait()
+        residual = status[:workers].max()
+        barrier.wait()  # nobody may overwrite status before every worker has read it
+        return residual
+
+    residual = global_residual(strips[0])
+    iterations = 0
+    while residual > tol and iterations < max_iterations:
+        if last > first:
+            jacobi_sweep(strips[iterations % 2], strips[(iterations + 1) % 2])
+        barrier.wait()  # halo rows of the new buffer are complete
+        iterations += 1
+        if iterations % check_every == 0 or iterations == max_iterations:
+            residual = global_residual(strips[iterations % 2])
+
+    if index == 0:
+        status[workers] = iterations
+    del strips, arrays, status
+    for memory in memories + (status_memory,):
+        memory.close()
+
+
+def parallel_jacobi(T, workers=None, tol=1e-6, max_iterations=1_000_000, check_every=10):
+    # Same contract as heat_solver.solve_plate(T, 'jacobi', ...): returns the solution, sweeps and residual
+    T = np.asarray(T, dtype=float)
+    n, m = T.shape
+    if n < 3 or m < 3:
+        return T.copy(), 0, 0.0
+    workers = min(workers or os.cpu_count(), n - 2)
+
+    memories = [shared_memory.SharedMemory(create=True, size=T.nbytes) for _ in range(2)]
+    status_memory = shared_memory.SharedMemory(create=True, size=(workers + 1) * 8)
+    try:
+        buffers = [np.ndarray(T.shape, dtype=float, buffer=memory.buf) for memory in memories]
+        for buffer in buffers:
+            buffer[:] = T
+        status = np.ndarray((workers + 1,), dtype=float, buffer=status_memory.buf)
+
+        names = [memory.name for memory in memories] + [status_memory.name]
+        bounds = np.linspace(1, n - 1, workers + 1).astype(int)
+        barrier = mp.Barrier(workers)
+        processes = [mp.Process(target=_worker, args=(i, (bounds[i], bounds[i + 1]), names, T.shape, workers,
+                                                       barrier, tol, max_iterations, check_every))
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if any(process.exitcode != 0 for process in processes):
+            raise RuntimeError("A parallel Jacobi worker failed")
+
+        iterations = int(status[workers])
+        result = buffers[iterations % 2].copy()
+        residual = residual_norm(result, np.empty((n - 2, m - 2)))
+        del buffers, status
+    finally:
+        for memory in memories + [status_memory]:
+            memory.close()
+            memory.unlink()
+    return result, iterations, residual
@@ -0,0 +1,131 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from heat_solver import neighbour_sum, stencil_views
+from direct_solver import laplacian, _second_difference
+
+# Time-dependent heat equation dT/dt = alpha * (d2T/dx2 + d2T/dy2) on the same plate as main.py.
+# The grid and edges come from initialize_plate (edges held at their edge_temperature values), the interior of
+# the initial grid is the starting temperature. r = alpha * dt / dx^2 is the mesh ratio.
+#   ftcs            explicit forward-time centred-space, stable only for r <= 1/4
+#   crank-nicolson  implicit, unconditionally stable; the 2D banded system is LU-factorized once
+#   adi             Peaceman-Rachford alternating direction implicit; two tridiagonal half steps,
+#                   each tridiagonal matrix is factorized once and solved for all rows/columns together
+
+METHODS = ('ftcs', 'crank-nicolson', 'adi')
+FTCS_LIMIT = 0.25  # Stability limit of r for the explicit scheme in 2D
+
+
+class TransientHeat:
+    def __init__(self, T0, alpha, dx, dt, method='crank-nicolson'):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+        self.T = np.array(T0, dtype=float)
+        n, m = self.T.shape
+        self.method = method
+        self.dt = dt
+        self.time = 0.0
+        self.r = alpha * dt / dx**2
+        if method == 'ftcs' and self.r > FTCS_LIMIT:
+            raise ValueError(f"FTCS is unstable for r = alpha*dt/dx^2 = {self.r:.3g} > {FTCS_LIMIT}; "
+                             f"use dt <= {FTCS_LIMIT * dx**2 / alpha:.3g} or an implicit method")
+
+        # Buffers reused by every step
+        self.interior = self.T[1:-1, 1:-1]
+        self.work = np.empty((n - 2, m - 2))
+        half = self.r / 2
+        if method == 'ftcs':
+            self.T_other = self.T.copy()
+        elif method == 'crank-nicolson':
+            # (I + r/2 K) T_new = T + r/2 (S + g), K = 5-point Laplacian matrix, S = stencil sum incl. edges,
+            # g = the constant edge contribution
+            size = (n - 2) * (m - 2)
+            self.lu = splu((sp.identity(size, format='csc') + half * laplacian(n, m)).tocsc())
+            self.boundary = self._edge_contribution()
+        else:
+            self.lu_rows = splu((sp.identity(m - 2) + half * _second_difference(m - 2)).tocsc())
+            self.lu_cols = splu((sp.identity(n - 2) + half * _second_difference(n - 2)).tocsc())
+
+    def _edge_contribution(self):
+        # Sum of the neighbours lying on the edges, for every interior cell
+        edges_only = self.T.copy()
+        edges_only[1:-1, 1:-1] = 0
+        _, up, down, left, right = stencil_views(edges_only, 1, 1, 1)
+        return neighbour_sum(up, down, left, right, np.empty(self.work.shape))
+
+    def _stencil(self, T, out):
+        # out = sum of the four neighbours - 4 * T over the interior
+        center, up, down, left, right = stencil_views(T, 1, 1, 1)
+        neighbour_sum(up, down, left, right, out)
+        np.multiply(out, 0.25, out=out)
+        np.subtract(out, center, out=out)
+        np.multiply(out, 4, out=out)
+        return out
+
+    def _second_difference_axis(self, axis, out):
+        # out = T[i-1] - 2 T[i] + T[i+1] along one axis over the interior (edges included as neighbours)
+        T = self.T
+        if axis == 0:
+            before, after = T[:-2, 1:-1], T[2:, 1:-1]
+        else:
+            before, after = T[1:-1, :-2], T[1:-1, 2:]
+        np.add(before, after, out=out)
+        np.subtract(out, self.interior, out=out)
+        np.subtract(out, self.interior, out=out)
+        return out
+
+    def step(self):
+        half = self.r / 2
+        work = self.work
+        if self.method == 'ftcs':
+            self._stencil(self.T, work)
+            np.multiply(work, self.r, out=work)
+            np.add(self.interior, work, out=self.T_other[1:-1, 1:-1])
+            self.T, self.T_other = self.T_other, self.T
+            self.interior = self.T[1:-1, 1:-1]
+        elif self.method == 'crank-nicolson':
+            self._stencil(self.T, work)
+            np.add(work, self.boundary, out=work)
+            np.multiply(work, half, out=work)
+            np.add(work, self.interior, out=work)
+            self.interior[:] = self.lu.solve(work.reshape(-1)).reshape(work.shape)
+        else:
+            T = self.T
+            # Half step 1: implicit along x (rows), explicit along y
+            self._second_difference_axis(0, work)
+            np.multiply(work, half, out=work)
+            np.add(work, self.interior, out=work)
+            work[:, 0] += half * T[1:-1, 0]
+            work[:, -1] += half * T[1:-1, -1]
+            self.interior[:] = self.lu_rows.solve(work.T).T
+            # Half step 2: implicit along y (columns), explicit along x
+            self._second_difference_axis(1, work)
+            np.multiply(work, half, out=work)
+            np.add(work, self.interior, out=work)
+            work[0, :] += half * T[0, 1:-1]
+            work[-1, :] += half * T[-1, 1:-1]
+            self.interior[:] = self.lu_cols.solve(work)
+        self.time += self.dt
+        return self.T
+
+    def run(self, steps, snapshot_every=None, snapshot_path=None):
+        # Advance the plate by the given number of steps. With snapshot_path, the grid at step 0, every
+        # snapshot_every steps and always the final step is streamed into a memory-mapped .npy file of shape
+        # (snapshots, n, m), which is returned opened read-only; otherwise the final grid is returned.
+        if snapshot_path is None:
+            for _ in range(steps):
+                self.step()
+            return self.T
+
+        snapshot_every = snapshot_every or 1
+        snapshots = np.lib.format.open_memmap(snapshot_path, mode='w+', dtype=self.T.dtype,
+                                              shape=(-(-steps // snapshot_every) + 1,) + self.T.shape)
+        snapshots[0] = self.T
+        for i in range(1, steps + 1):
+            self.step()
+            if i % snapshot_every == 0 or i == steps:
+                snapshots[-(-i // snapshot_every)] = self.T
+        snapshots.flush()
+        del snapshots
+        return np.load(snapshot_path, mmap_mode='r')
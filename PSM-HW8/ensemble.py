@@ -0,0 +1,111 @@
+import numpy as np
+
+# Ensemble version of the integrators in psm-task8.py: N trajectories (initial conditions and/or parameters
+# A, B, C) advanced together. The state is an (N, 3) array of x, y, z rows, the system is evaluated
+# column-wise for all members at once, and every stage writes into buffers allocated before the loop.
+# Output goes into a (steps // every + 1, N, 3) array (or any array-like of that shape, e.g. a memmap).
+
+METHODS = ('euler', 'midpoint', 'rk4')
+
+
+def ensemble_system(xyz, A, B, C, out, tmp):
+    # Derivatives of all members at once; A, B, C are scalars or (N,) arrays, out is (N, 3), tmp is (N,)
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    dxdt, dydt, dzdt = out[:, 0], out[:, 1], out[:, 2]
+    np.subtract(y, x, out=dxdt)       # A * (y - x)
+    np.multiply(dxdt, A, out=dxdt)
+    np.subtract(B, z, out=dydt)       # -x * z + B * x - y = x * (B - z) - y
+    np.multiply(dydt, x, out=dydt)
+    np.subtract(dydt, y, out=dydt)
+    np.multiply(x, y, out=dzdt)       # x * y - C * z
+    np.multiply(z, C, out=tmp)
+    np.subtract(dzdt, tmp, out=dzdt)
+    return out
+
+
+def _parameter(value, n):
+    # Scalars stay scalars, anything else becomes an (N,) array broadcasting against the state columns
+    if np.ndim(value) == 0:
+        return float(value)
+    return np.broadcast_to(np.asarray(value, dtype=float).reshape(-1), (n,)).copy()
+
+
+class EnsembleIntegrator:
+    def __init__(self, initial, A, B, C, step_size, method='rk4'):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+        self.xyz = np.array(initial, dtype=float).reshape(-1, 3)
+        n = len(self.xyz)
+        self.A, self.B, self.C = (_parameter(p, n) for p in (A, B, C))
+        self.step_size = step_size
+        self.method = method
+        self.k = [np.empty_like(self.xyz) for _ in range(4)]
+        self.stage = np.empty_like(self.xyz)
+        self.tmp = np.empty(n)
+
+    def _system(self, xyz, out):
+        return ensemble_system(xyz, self.A, self.B, self.C, out, self.tmp)
+
+    def step(self):
+        h, xyz, stage = self.step_size, self.xyz, self.stage
+        k1, k2, k3, k4 = self.k
+        if self.method == 'euler':
+            self._system(xyz, k1)
+            np.multiply(k1, h, out=k1)
+            np.add(xyz, k1, out=xyz)
+        elif self.method == 'midpoint':
+            self._system(xyz, k1)
+            np.multiply(k1, h / 2, out=stage)
+            np.add(stage, xyz, out=stage)
+            self._system(stage, k2)
+            np.multiply(k2, h, out=k2)
+            np.add(xyz, k2, out=xyz)
+        else:
+            self._system(xyz, k1)
+            np.multiply(k1, h / 2, out=stage)
+            np.add(stage, xyz, out=stage)
+            self._system(stage, k2)
+            np.multiply(k2, h / 2, out=stage)
+            np.add(stage, xyz, out=stage)
+            self._system(stage, k3)
+            np.multiply(k3, h, out=stage)
+            np.add(stage, xyz, out=stage)
+            self._system(stage, k4)
+            # xyz += h / 6 * (k1 + 2 * k2 + 2 * k3 + k4), accumulated in k2
+            np.add(k2, k3, out=k2)
+            np.multiply(k2, 2, out=k2)
+            np.add(k2, k1, out=k2)
+            np.add(k2, k4, out=k2)
+            np.multiply(k2, h / 6, out=k2)
+            np.add(xyz, k2, out=xyz)
+        return xyz
+
+    def run(self, num_steps, every=1, out=None, store=True, sink=None):
+        # Advance num_steps steps. With store, the initial state and every `every`-th state are written into out
+        # (allocated when not given) which is returned; without it only the final (N, 3) state is returned.
+        # With a sink (PSM-common/trajectory.py, record shape (N, 3)) the states are streamed into it instead and
+        # the sink is returned.
+        if sink is not None:
+            sink.append(self.xyz)
+            for i in range(1, num_steps + 1):
+                self.step()
+                if i % every == 0:
+                    sink.append(self.xyz)
+            return sink
+        if not store:
+            for _ in range(num_steps):
+                self.step()
+            return self.xyz
+        if out is None:
+            out = np.empty((num_steps // every + 1,) + self.xyz.shape)
+        out[0] = self.xyz
+        for i in range(1, num_steps + 1):
+            self.step()
+            if i % every == 0:
+                out[i // every] = self.xyz
+        return out
+
+
+def integrate_ensemble(initial, A, B, C, step_size, num_steps, method='rk4', every=1, out=None, store=True,
+                       sink=None):
+    return EnsembleIntegrator(initial, A, B, C, step_size, method).run(num_steps, every, out, store, sink)
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Headless: no window is ever opened
+
+from life_engine import ActiveLifeEngine, LifeEngine, random_grid
+from life_renderer import GridRenderer
+
+# Generations per second of the engines and frames per second of the renderer (headless), per grid size.
+# Usage: python benchmark_life.py [grid_size ...]
+
+sizes = [int(arg) for arg in sys.argv[1:]] or [256, 1024, 4096]
+rules = {"survive": "2 3", "reproduce": "3"}
+generations = 20
+window = 700
+
+
+def rate(function, repeats=generations):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return repeats / (time.perf_counter() - start)
+
+
+print(f"{'size':>6} {'dense gen/s':>12} {'packed gen/s':>13} {'active gen/s':>13} "
+      f"{'full frame/s':>13} {'dirty frame/s':>14}")
+for size in sizes:
+    grid = random_grid(size, seed=0)
+    dense = LifeEngine(grid, rules, packed=False)
+    packed_rate = rate(LifeEngine(grid, rules, packed=True).step) if size % 64 == 0 else float('nan')
+    active = ActiveLifeEngine(grid, rules)
+
+    renderer = GridRenderer(size, size, window, window, headless=True)
+
+    def full_frame():
+        renderer.invalidate()
+        renderer.draw(dense.grid)
+
+    def dirty_frame():
+        renderer.draw(dense.step())
+
+    print(f"{size:>6} {rate(dense.step):>12.1f} {packed_rate:>13.1f} {rate(active.step):>13.1f} "
+          f"{rate(full_frame):>13.1f} {rate(dirty_frame):>14.1f}")
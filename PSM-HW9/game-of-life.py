@@ -1,5 +1,8 @@
 import pygame
-import random
+
+from life_engine import ActiveLifeEngine, LifeEngine, random_grid
+from life_renderer import GridRenderer
+from life_scheduler import SimulationScheduler
 
 # Initialize PyGame
 pygame.init()
@@ -7,7 +10,9 @@ pygame.init()
 # Constants
 SCREEN_INFO = pygame.display.Info()
 WINDOW_SIZE = int(SCREEN_INFO.current_h * 0.7)  # Set a base window size (can be adjusted)
-FPS = 10
+FPS = 30  # Display rate
+GENERATIONS_PER_SECOND = 10  # Simulation rate, None runs the simulation as fast as possible
+ACTIVE_TILES = False  # Only recompute the parts of the board that are still changing (mostly dead boards)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -84,35 +89,9 @@ class InputBox:
         return self.text
 
 
-# Function to draw the grid
-def draw_grid(surface, grid, cell_size):
-    for row in range(len(grid)):
-        for col in range(len(grid[row])):
-            color = GRAY if grid[row][col] == 1 else BLACK
-            pygame.draw.rect(surface, color, (col * cell_size, row * cell_size, cell_size, cell_size))
-
-
-# Function to update the grid based on the rules
-def update_grid(grid, rules):
-    new_grid = [[0 for _ in range(len(grid))] for _ in range(len(grid))]
-    survive_conditions = [int(n) for n in rules["survive"].split()]
-    reproduce_conditions = [int(n) for n in rules["reproduce"].split()]
-
-    for row in range(len(grid)):
-        for col in range(len(grid[row])):
-            live_neighbors = sum(
-                grid[(row + i) % len(grid)][(col + j) % len(grid[row])]  # neighboring cell values are taken from the previous frame
-                for i in [-1, 0, 1]
-                for j in [-1, 0, 1]
-                if not (i == 0 and j == 0)
-            )
-            if grid[row][col] == 1:
-                if live_neighbors in survive_conditions:
-                    new_grid[row][col] = 1
-            else:
-                if live_neighbors in reproduce_conditions:
-                    new_grid[row][col] = 1
-    return new_grid
+# Size in pixels of the square area the grid is drawn on (cells shrink below one pixel on very large grids)
+def grid_pixels(cell_size, grid_size):
+    return cell_size * grid_size if cell_size > 0 else WINDOW_SIZE
 
 
 # Function to draw the pause menu
@@ -141,6 +120,7 @@ def draw_message(surface, message):
     text = font.render(message, True, YELLOW)
     text_rect = text.get_rect(center=(WINDOW_SIZE // 2, font_size // 2 + 10))
     surface.blit(text, text_rect)
+    return text_rect
 
 
 def draw_bottom_message(surface, message):
@@ -149,6 +129,7 @@ def draw_bottom_message(surface, message):
     text = font.render(message, True, YELLOW)
     text_rect = text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE - font_size // 2 - 10))
     surface.blit(text, text_rect)
+    return text_rect
 
 
 # Main game loop
@@ -183,13 +164,8 @@ while not initial_grid_size_entered:
     pygame.display.flip()
     clock.tick(FPS)
 
-# Create a 2D grid
-grid = [[0 for _ in range(grid_size)] for _ in range(grid_size)]
-
-# Randomize initial grid
-for i in range(grid_size):
-    for j in range(grid_size):
-        grid[i][j] = random.choices([0, 1], weights=[80, 20])[0]  # 20% chance for the cell to be initially alive
+# Create a randomized 2D grid (20% chance for the cell to be initially alive)
+grid = random_grid(grid_size, alive=0.2)
 
 # Game rules (can be changed by user during runtime)
 rules = {
@@ -197,6 +173,16 @@ rules = {
     "reproduce": "3"
 }
 
+# Simulation engine (bit-packed when the grid size is a multiple of 64)
+engine = ActiveLifeEngine(grid, rules) if ACTIVE_TILES else LifeEngine(grid, rules)
+
+# Run the simulation in a background thread, the loop below only draws the latest finished generation
+scheduler = SimulationScheduler(engine, GENERATIONS_PER_SECOND).start()
+
+# Renderer that only repaints the cells which changed since the previous frame
+renderer = GridRenderer(grid_size, grid_size, grid_pixels(CELL_SIZE, grid_size), grid_pixels(CELL_SIZE, grid_size))
+message_rects = []
+
 # Initialize input box with existing rules
 rules_input_box = InputBox(WINDOW_SIZE * 0.1, WINDOW_SIZE * 0.5, WINDOW_SIZE * 0.8, WINDOW_SIZE * 0.1,
                            f"{rules['reproduce']} / {rules['survive']}")
@@ -208,32 +194,52 @@ while running:
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_TAB:
                 paused = not paused
-                if not paused:
+                renderer.invalidate()  # The menu or the messages have to be repainted
+                if paused:
+                    scheduler.pause()
+                else:
                     # Update rules from input box when unpausing
                     rules_text = rules_input_box.get_text()
                     if ' / ' in rules_text:
                         reproduce_rules, survive_rules = rules_text.split(' / ')
                         rules["reproduce"] = reproduce_rules.strip()
                         rules["survive"] = survive_rules.strip()
+                        scheduler.set_rules(rules)
+                    scheduler.resume()
         if paused:
             rules_input_box.handle_event(event)
         if event.type == pygame.VIDEORESIZE:
             WINDOW_SIZE = min(event.w, event.h)  # Maintain a square window
             screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE), pygame.RESIZABLE)
             CELL_SIZE = int(WINDOW_SIZE / grid_size)
+            renderer.resize(grid_pixels(CELL_SIZE, grid_size), grid_pixels(CELL_SIZE, grid_size))
             rules_input_box.update_position(WINDOW_SIZE * 0.1, WINDOW_SIZE * 0.5, WINDOW_SIZE * 0.8, WINDOW_SIZE * 0.1)
 
-    if not paused:
-        grid = update_grid(grid, rules)
-
-    screen.fill(GRAY)
-    draw_grid(screen, grid, CELL_SIZE)
-    if not paused:
-        draw_message(screen, "Press TAB to pause and change rules")
-        draw_bottom_message(screen, "All the windows of the program are resizable")
-    else:
-        draw_pause_menu(screen, rules_input_box)
-    pygame.display.flip()
+    # Sample the latest generation finished by the simulation thread
+    with scheduler.latest() as grid:
+        if paused or not renderer.valid:
+            # Full repaint of the window
+            screen.fill(GRAY)
+            renderer.invalidate()
+            renderer.draw(grid, screen)
+            if not paused:
+                message_rects = [draw_message(screen, "Press TAB to pause and change rules"),
+                                 draw_bottom_message(screen, "All the windows of the program are resizable")]
+            else:
+                draw_pause_menu(screen, rules_input_box)
+            pygame.display.flip()
+        else:
+            # Only the changed cells, then the messages again on top of freshly repainted cells
+            dirty_rects = renderer.draw(grid, screen)
+            if dirty_rects:
+                for rect in message_rects:
+                    screen.fill(GRAY, rect)
+                    renderer.redraw_area(rect, screen)
+                message_rects = [draw_message(screen, "Press TAB to pause and change rules"),
+                                 draw_bottom_message(screen, "All the windows of the program are resizable")]
+                dirty_rects += message_rects
+            pygame.display.update(dirty_rects)
     clock.tick(FPS)
 
+scheduler.stop()
 pygame.quit()
@@ -0,0 +1,221 @@
+import numpy as np
+
+from life_engine import parse_rules
+
+# HashLife: the (unbounded) plane is a quadtree whose identical sub-squares are shared (hash-consed), and the
+# centre of every square after 2^j generations is memoized on the node itself. Repeating structure in space
+# and in time is therefore computed once, which lets a run jump billions of generations.
+# A node of level k is a 2^k x 2^k square; the root is centred on the origin, x grows to the right (columns)
+# and y grows downwards (rows), like the grid in game-of-life.py.
+
+
+class _Node:
+    __slots__ = ('nw', 'ne', 'sw', 'se', 'level', 'population', 'results')
+
+    def __init__(self, nw, ne, sw, se, level, population):
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.level = level
+        self.population = population
+        self.results = {}  # j -> centre of this square after 2^j generations
+
+
+class HashLife:
+    def __init__(self, rules, max_nodes=2_000_000):
+        # max_nodes caps the node cache; once exceeded after a step, every node not reachable from the current
+        # pattern is dropped together with the memoized results
+        self.max_nodes = max_nodes
+        self.generation = 0
+        self.dead = _Node(None, None, None, None, 0, 0)
+        self.alive = _Node(None, None, None, None, 0, 1)
+        self._nodes = {}
+        self._empty = [self.dead]
+        self.root = self._empty_node(3)
+        self.survive = self.reproduce = None
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        survive, reproduce = parse_rules(rules)
+        if 0 in reproduce:
+            # With B0 the empty plane itself changes every generation, there is no finite pattern to follow
+            raise ValueError("HashLife works on an unbounded plane and cannot run rules where cells are born "
+                             "with 0 live neighbours")
+        if (survive, reproduce) != (self.survive, self.reproduce):
+            self._clear_results()  # Memoized futures were computed under the old rules
+        self.survive, self.reproduce = survive, reproduce
+
+    @property
+    def population(self):
+        return self.root.population
+
+    @property
+    def node_count(self):
+        return len(self._nodes)
+
+    # Node construction
+
+    def _join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _Node(nw, ne, sw, se, nw.level + 1,
+                         nw.population + ne.population + sw.population + se.population)
+            self._nodes[key] = node
+        return node
+
+    def _empty_node(self, level):
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self._join(e, e, e, e))
+        return self._empty[level]
+
+    def _expand(self, node):
+        # Same pattern one level up, centred: each quadrant moves to the inner corner of an empty square
+        e = self._empty_node(node.level - 1)
+        return self._join(self._join(e, e, e, node.nw), self._join(e, e, node.ne, e),
+                          self._join(e, node.sw, e, e), self._join(node.se, e, e, e))
+
+    # Evolution
+
+    def _life_4x4(self, node):
+        # Level 2 base case: the centre 2x2 after one generation
+        cells = np.zeros((4, 4), dtype=int)
+        for qi, row in enumerate(((node.nw, node.ne), (node.sw, node.se))):
+            for qj, quadrant in enumerate(row):
+                for ci, pair in enumerate(((quadrant.nw, quadrant.ne), (quadrant.sw, quadrant.se))):
+                    for cj, leaf in enumerate(pair):
+                        cells[2 * qi + ci, 2 * qj + cj] = leaf.population
+        new = []
+        for i in (1, 2):
+            for j in (1, 2):
+                count = cells[i - 1:i + 2, j - 1:j + 2].sum() - cells[i, j]
+                alive = count in self.survive if cells[i, j] else count in self.reproduce
+                new.append(self.alive if alive else self.dead)
+        return self._join(*new)
+
+    def _successor(self, node, j):
+        # Centre (level - 1) of a level >= 2 node after 2^j generations, j <= level - 2
+        if node.population == 0:
+            return self._empty_node(node.level - 1)
+        result = node.results.get(j)
+        if result is not None:
+            return result
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            join, step = self._join, self._successor
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # The nine overlapping level - 1 sub-squares, each advanced 2^j generations (or 2^(level-3))
+            half = min(j, node.level - 3)
+            c1 = step(nw, half)
+            c2 = step(join(nw.ne, ne.nw, nw.se, ne.sw), half)
+            c3 = step(ne, half)
+            c4 = step(join(nw.sw, nw.se, sw.nw, sw.ne), half)
+            c5 = step(join(nw.se, ne.sw, sw.ne, se.nw), half)
+            c6 = step(join(ne.sw, ne.se, se.nw, se.ne), half)
+            c7 = step(sw, half)
+            c8 = step(join(sw.ne, se.nw, sw.se, se.sw), half)
+            c9 = step(se, half)
+            if j < node.level - 2:
+                # Small step: the time is already spent, just cut out the centres
+                result = join(join(c1.se, c2.sw, c4.ne, c5.nw), join(c2.se, c3.sw, c5.ne, c6.nw),
+                              join(c4.se, c5.sw, c7.ne, c8.nw), join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                # Full step: a second round of 2^(level-3) generations on the four overlapping squares
+                result = join(step(join(c1, c2, c4, c5), half), step(join(c2, c3, c5, c6), half),
+                              step(join(c4, c5, c7, c8), half), step(join(c5, c6, c8, c9), half))
+        node.results[j] = result
+        return result
+
+    def _padded(self, node):
+        # True if the pattern lies in the middle half of node, so its successor loses nothing
+        e = self._empty_node(node.level - 2)
+        return (node.nw.nw is e and node.nw.ne is e and node.nw.sw is e and
+                node.ne.nw is e and node.ne.ne is e and node.ne.se is e and
+                node.sw.nw is e and node.sw.sw is e and node.sw.se is e and
+                node.se.ne is e and node.se.sw is e and node.se.se is e)
+
+    def step_power(self, j):
+        # Advance the pattern by 2^j generations
+        root = self.root
+        while root.level < j + 2 or not self._padded(root):
+            root = self._expand(root)
+        # A 2^j step can move information 2^j cells, so pad once more to keep everything inside the result
+        root = self._expand(root)
+        self.root = self._successor(root, j)
+        self.generation += 2**j
+        if len(self._nodes) > self.max_nodes:
+            self.collect_garbage()
+
+    def advance(self, generations):
+        # Advance by any number of generations, one power-of-two step per set bit
+        j = 0
+        while generations:
+            if generations & 1:
+                self.step_power(j)
+            generations >>= 1
+            j += 1
+
+    # Memory management
+
+    def _clear_results(self):
+        for node in self._nodes.values():
+            node.results.clear()
+
+    def collect_garbage(self):
+        # Keep only the nodes reachable from the root (and the empty squares), forget all memoized results
+        self._clear_results()
+        keep = {}
+        stack = [self.root] + self._empty[1:]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key not in keep:
+                keep[key] = node
+                stack.extend(key)
+        self._nodes = keep
+
+    # Conversion from and to arrays
+
+    def _from_array(self, cells, level):
+        if level == 0:
+            return self.alive if cells[0, 0] else self.dead
+        if not cells.any():
+            return self._empty_node(level)
+        h = 1 << (level - 1)
+        return self._join(self._from_array(cells[:h, :h], level - 1), self._from_array(cells[:h, h:], level - 1),
+                          self._from_array(cells[h:, :h], level - 1), self._from_array(cells[h:, h:], level - 1))
+
+    def set_grid(self, grid):
+        # Load a 0/1 array (e.g. LifeEngine.grid) with its top-left cell at (x, y) = (0, 0)
+        grid = np.asarray(grid, dtype=np.uint8)
+        level = max(1, int(np.ceil(np.log2(max(grid.shape + (2,))))))
+        cells = np.zeros((1 << level, 1 << level), dtype=np.uint8)
+        cells[:grid.shape[0], :grid.shape[1]] = grid
+        e = self._empty_node(level)
+        self.root = self._join(e, e, e, self._from_array(cells, level))
+        self.generation = 0
+
+    def _to_array(self, node, top, left, out, out_top, out_left):
+        # Write the part of node (whose top-left cell is at (left, top)) that falls inside out
+        size = 1 << node.level
+        rows, cols = out.shape
+        if (node.population == 0 or top >= out_top + rows or left >= out_left + cols or
+                top + size <= out_top or left + size <= out_left):
+            return
+        if node.level == 0:
+            out[top - out_top, left - out_left] = 1
+            return
+        h = size // 2
+        self._to_array(node.nw, top, left, out, out_top, out_left)
+        self._to_array(node.ne, top, left + h, out, out_top, out_left)
+        self._to_array(node.sw, top + h, left, out, out_top, out_left)
+        self._to_array(node.se, top + h, left + h, out, out_top, out_left)
+
+    def get_grid(self, top, left, rows, cols):
+        # 0/1 window of the plane with its top-left cell at (x, y) = (left, top)
+        out = np.zeros((rows, cols), dtype=np.uint8)
+        corner = -(1 << (self.root.level - 1))
+        self._to_array(self.root, corner, corner, out, top, left)
+        return out
@@ -0,0 +1,241 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Game of Life engine independent of pygame. The board is a torus stored either as a uint8 array (one byte per
+# cell) or bit-packed into uint64 words (64 cells per word along a row, needs a width divisible by 64).
+# Rules use the same dict as game-of-life.py: {"survive": "2 3", "reproduce": "3"}.
+
+
+@lru_cache(maxsize=None)
+def _parse_rules(survive, reproduce):
+    def counts(text):
+        values = [int(token) for token in text.split()]
+        if any(not 0 <= value <= 8 for value in values):
+            raise ValueError(f"Neighbour counts must be between 0 and 8, got '{text}'")
+        return frozenset(values)
+    return counts(survive), counts(reproduce)
+
+
+def parse_rules(rules):
+    # (survive counts, reproduce counts) as frozensets, parsed once per distinct rule text
+    return _parse_rules(rules["survive"].strip(), rules["reproduce"].strip())
+
+
+def rule_table(rules):
+    # 18-entry lookup table: index = 9 * current state + live neighbours -> next state
+    survive, reproduce = parse_rules(rules)
+    table = np.zeros(18, dtype=np.uint8)
+    table[list(reproduce)] = 1
+    table[[9 + count for count in survive]] = 1
+    return table
+
+
+def random_grid(rows, cols=None, alive=0.2, seed=None):
+    # Random board with the given fraction of live cells (20% as in game-of-life.py)
+    cols = rows if cols is None else cols
+    return (np.random.default_rng(seed).random((rows, cols)) < alive).astype(np.uint8)
+
+
+def pack(grid):
+    # (rows, cols) 0/1 array -> (rows, cols // 64) uint64, column j in bit j % 64 of word j // 64
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    return np.packbits(grid, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+
+def unpack(words, out=None):
+    bits = np.unpackbits(words.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+    if out is None:
+        return bits
+    out[:] = bits
+    return out
+
+
+def _full_add(a, b, c):
+    partial = a ^ b
+    return partial ^ c, (a & b) | (c & partial)
+
+
+class LifeEngine:
+    def __init__(self, grid, rules, packed=None):
+        grid = np.asarray(grid, dtype=np.uint8)
+        self.rows, self.cols = grid.shape
+        if packed is None:
+            packed = self.cols % 64 == 0
+        if packed and self.cols % 64:
+            raise ValueError("The bit-packed engine needs a width divisible by 64")
+        self.packed = packed
+        self.generation = 0
+        self.set_rules(rules)
+
+        if packed:
+            self.words = pack(grid)
+            self._grid = np.empty((self.rows, self.cols), dtype=np.uint8)
+            self._grid_generation = -1
+        else:
+            # Buffers reused every generation: padded torus, neighbour counts, table indices and two grids
+            self._grid = grid.copy()
+            self._next = np.empty_like(self._grid)
+            self._padded = np.empty((self.rows + 2, self.cols + 2), dtype=np.uint8)
+            self._count = np.empty_like(self._grid)
+            self._index = np.empty_like(self._grid)
+
+    def set_rules(self, rules):
+        self.survive, self.reproduce = parse_rules(rules)
+        self.table = rule_table(rules)
+
+    @property
+    def grid(self):
+        # Current board as a (rows, cols) uint8 array (owned by the engine, do not modify)
+        if self.packed and self._grid_generation != self.generation:
+            unpack(self.words, self._grid)
+            self._grid_generation = self.generation
+        return self._grid
+
+    def step(self, generations=1):
+        for _ in range(generations):
+            if self.packed:
+                self._step_packed()
+            else:
+                self._step_dense()
+            self.generation += 1
+        return self.grid
+
+    def neighbour_counts(self):
+        # Live neighbour count of every cell on the torus (dense layout)
+        grid, padded, count = self._grid, self._padded, self._count
+        padded[1:-1, 1:-1] = grid
+        padded[0, 1:-1] = grid[-1]
+        padded[-1, 1:-1] = grid[0]
+        padded[:, 0] = padded[:, -2]
+        padded[:, -1] = padded[:, 1]
+        np.add(padded[:-2, :-2], padded[:-2, 1:-1], out=count)
+        for di, dj in ((0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)):
+            np.add(count, padded[di:di + self.rows, dj:dj + self.cols], out=count)
+        return count
+
+    def _step_dense(self):
+        count = self.neighbour_counts()
+        np.multiply(self._grid, 9, out=self._index)
+        np.add(self._index, count, out=self._index)
+        np.take(self.table, self._index, out=self._next)
+        self._grid, self._next = self._next, self._grid
+
+    def _step_packed(self):
+        w = self.words
+        one, carry = np.uint64(1), np.uint64(63)
+        # West/east neighbours inside a row: shift by one bit, carrying the edge bit over from the adjacent word
+        west = (w << one) | (np.roll(w, 1, axis=1) >> carry)
+        east = (w >> one) | (np.roll(w, -1, axis=1) << carry)
+        up, down = np.roll(w, 1, axis=0), np.roll(w, -1, axis=0)
+        neighbours = (west, east, up, down,
+                      np.roll(west, 1, axis=0), np.roll(west, -1, axis=0),
+                      np.roll(east, 1, axis=0), np.roll(east, -1, axis=0))
+
+        # Bit-sliced adder: the 8 one-bit neighbour planes summed into the 4-bit count (bit0..bit3)
+        s1, c1 = _full_add(*neighbours[0:3])
+        s2, c2 = _full_add(*neighbours[3:6])
+        s3, c3 = neighbours[6] ^ neighbours[7], neighbours[6] & neighbours[7]
+        bit0, c4 = _full_add(s1, s2, s3)
+        twos, c5 = _full_add(c1, c2, c3)
+        bit1, c6 = twos ^ c4, twos & c4
+        bit2, bit3 = c5 ^ c6, c5 & c6
+        planes = (bit0, bit1, bit2, bit3)
+
+        def count_is(k):
+            mask = ~np.zeros_like(w)
+            for bit, plane in enumerate(planes):
+                mask &= plane if k >> bit & 1 else ~plane
+            return mask
+
+        born = np.zeros_like(w)
+        for k in self.reproduce:
+            born |= count_is(k)
+        stays = np.zeros_like(w)
+        for k in self.survive:
+            stays |= count_is(k)
+        self.words = (w & stays) | (~w & born)
+
+
+def _tile_starts(size, tile):
+    # Start of every tile along one axis; the last tile is shifted back so all tiles have the same size
+    # (it may overlap its neighbour, which only means a few cells are computed twice)
+    return np.array([min(k * tile, size - tile) for k in range(-(-size // tile))])
+
+
+class ActiveLifeEngine:
+    # Dense-engine results at a cost proportional to activity. The torus is cut into tiles and every tile keeps
+    # two flags: changed (generation t differs from t-1) and flipped (t differs from t-2). If nothing changed
+    # around a tile, it stays as it is; if everything around it is period-2, it becomes generation t-1 again.
+    # Generation t+1 is written over the t-1 buffer, so both kinds of tiles already hold the right cells and
+    # are skipped. Only the remaining tiles are gathered with their halo and updated in one batch.
+    def __init__(self, grid, rules, tile=32):
+        grid = np.asarray(grid, dtype=np.uint8)
+        self.rows, self.cols = grid.shape
+        self.generation = 0
+        self.set_rules(rules)
+
+        self._grid = grid.copy()
+        self._previous = grid.copy()
+        tile_rows, tile_cols = min(tile, self.rows), min(tile, self.cols)
+        row_starts, col_starts = _tile_starts(self.rows, tile_rows), _tile_starts(self.cols, tile_cols)
+        # Cell indices (with a one-cell halo wrapped around the torus) of every tile row and tile column
+        self._halo_rows = (row_starts[:, None] + np.arange(-1, tile_rows + 1)) % self.rows
+        self._halo_cols = (col_starts[:, None] + np.arange(-1, tile_cols + 1)) % self.cols
+        self.changed = np.ones((len(row_starts), len(col_starts)), dtype=bool)
+        self.flipped = np.ones_like(self.changed)
+        self.active_tiles = self.changed.size
+
+    def set_rules(self, rules):
+        self.survive, self.reproduce = parse_rules(rules)
+        self.table = rule_table(rules)
+        if hasattr(self, 'changed'):
+            # The skip logic assumes the same rules as the previous generations, start over with every tile
+            self.changed[:] = True
+            self.flipped[:] = True
+
+    @property
+    def grid(self):
+        return self._grid
+
+    @staticmethod
+    def _dilate(flags):
+        # A tile needs work if any of the 3x3 tiles around it (on the torus) has the flag set
+        near = flags | np.roll(flags, 1, axis=0) | np.roll(flags, -1, axis=0)
+        return near | np.roll(near, 1, axis=1) | np.roll(near, -1, axis=1)
+
+    def step(self, generations=1):
+        for _ in range(generations):
+            self._step()
+            self.generation += 1
+        return self.grid
+
+    def _step(self):
+        active = self._dilate(self.changed) & self._dilate(self.flipped)
+        tile_i, tile_j = np.nonzero(active)
+        self.active_tiles = len(tile_i)
+
+        # Generation t+1 goes into the t-1 buffer; skipped tiles already hold their next state there
+        current, previous = self._grid, self._previous
+        new_changed = np.zeros_like(self.changed)  # still tiles: nothing changes, nothing flips
+        new_flipped = np.zeros_like(self.flipped)
+        if self.active_tiles:
+            rows = self._halo_rows[tile_i][:, :, None]
+            cols = self._halo_cols[tile_j][:, None, :]
+            block = current[rows, cols]
+            counts = block[:, :-2, :-2] + block[:, :-2, 1:-1]
+            for di, dj in ((0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)):
+                counts += block[:, di:di + counts.shape[1], dj:dj + counts.shape[2]]
+            centre = block[:, 1:-1, 1:-1]
+            new = self.table[9 * centre + counts]
+
+            inner_rows, inner_cols = rows[:, 1:-1], cols[:, :, 1:-1]
+            new_changed[tile_i, tile_j] = (new != centre).any(axis=(1, 2))
+            new_flipped[tile_i, tile_j] = (new != previous[inner_rows, inner_cols]).any(axis=(1, 2))
+            previous[inner_rows, inner_cols] = new
+
+        # Period-2 tiles keep their changed flag (t+1 differs from t exactly when t differed from t-1)
+        period_two = ~active & self._dilate(self.changed)
+        new_changed[period_two] = self.changed[period_two]
+        self.changed, self.flipped = new_changed, new_flipped
+        self._grid, self._previous = previous, current
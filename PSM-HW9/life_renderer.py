@@ -0,0 +1,103 @@
+import numpy as np
+import pygame
+
+# Renders a Game of Life grid through one 8-bit palette surface holding a pixel per cell. The surface is
+# scaled onto the target in one go for a full redraw; afterwards only the tiles with cells that changed
+# since the last frame are scaled and blitted, and their screen rects are returned for
+# pygame.display.update. With headless=True the target is an off-screen surface, no window is needed.
+
+BLACK = (0, 0, 0)
+GRAY = (128, 128, 128)
+
+TILE = 16  # Cells per side of the blocks in which changes are tracked
+FULL_REDRAW_FRACTION = 0.5  # Above this fraction of dirty tiles one full blit is cheaper
+
+
+class GridRenderer:
+    def __init__(self, rows, cols, width, height, headless=False, dead_color=BLACK, alive_color=GRAY):
+        self.rows, self.cols = rows, cols
+        self.cells = pygame.Surface((cols, rows), depth=8)
+        self.cells.set_palette([dead_color, alive_color] + [BLACK] * 254)
+        self.last = np.zeros((rows, cols), dtype=np.uint8)
+        self.headless = headless
+        self.target = None
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        # Area of the target covered by the grid; the next draw repaints everything
+        self.width, self.height = width, height
+        self.x_edges = np.arange(self.cols + 1) * width // self.cols  # First pixel column of every cell
+        self.y_edges = np.arange(self.rows + 1) * height // self.rows
+        self.scaled = pygame.Surface((width, height), depth=8)
+        self.scaled.set_palette(self.cells.get_palette())
+        if self.headless:
+            self.target = pygame.Surface((width, height))
+        self.invalidate()
+
+    def invalidate(self):
+        self.valid = False
+
+    def draw(self, grid, surface=None):
+        # Bring the target (surface, or the off-screen one when headless) up to date with grid.
+        # Returns the list of rects that changed on it.
+        surface = self.target if surface is None else surface
+        grid = np.asarray(grid, dtype=np.uint8)
+        if not self.valid:
+            return [self._draw_full(grid, surface)]
+
+        diff = grid != self.last
+        tile_rows, tile_cols = -(-self.rows // TILE), -(-self.cols // TILE)
+        padded = np.zeros((tile_rows * TILE, tile_cols * TILE), dtype=bool)
+        padded[:self.rows, :self.cols] = diff
+        dirty = padded.reshape(tile_rows, TILE, tile_cols, TILE).any(axis=(1, 3))
+        count = np.count_nonzero(dirty)
+        if count == 0:
+            return []
+        if count > FULL_REDRAW_FRACTION * dirty.size:
+            return [self._draw_full(grid, surface)]
+
+        pygame.surfarray.blit_array(self.cells, grid.T)
+        np.copyto(self.last, grid)
+        rects = []
+        for tile_row, runs in self._row_runs(dirty):
+            top, bottom = tile_row * TILE, min((tile_row + 1) * TILE, self.rows)
+            for first, last in runs:
+                left, right = first * TILE, min(last * TILE, self.cols)
+                rects.append(self._blit_cells(surface, top, bottom, left, right))
+        return rects
+
+    @staticmethod
+    def _row_runs(dirty):
+        # Consecutive dirty tiles in a tile row are merged into one run, so one blit covers them
+        for tile_row in np.flatnonzero(dirty.any(axis=1)):
+            row = np.concatenate(([False], dirty[tile_row], [False]))
+            edges = np.flatnonzero(row[1:] != row[:-1])
+            yield tile_row, zip(edges[::2], edges[1::2])
+
+    def _blit_cells(self, surface, top, bottom, left, right):
+        x, y = self.x_edges[left], self.y_edges[top]
+        size = (self.x_edges[right] - x, self.y_edges[bottom] - y)
+        rect = pygame.Rect(int(x), int(y), int(size[0]), int(size[1]))
+        if rect.w and rect.h:
+            part = self.cells.subsurface((left, top, right - left, bottom - top))
+            surface.blit(pygame.transform.scale(part, rect.size), rect)
+        return rect
+
+    def _draw_full(self, grid, surface):
+        pygame.surfarray.blit_array(self.cells, grid.T)
+        np.copyto(self.last, grid)
+        pygame.transform.scale(self.cells, (self.width, self.height), self.scaled)
+        self.valid = True
+        return surface.blit(self.scaled, (0, 0))
+
+    def redraw_area(self, rect, surface=None):
+        # Repaint the cells under a screen rect from the last drawn grid (e.g. after text was drawn over them)
+        surface = self.target if surface is None else surface
+        rect = pygame.Rect(rect).clip(pygame.Rect(0, 0, self.width, self.height))
+        if rect.w and rect.h:
+            left = int(np.searchsorted(self.x_edges, rect.left, side='right')) - 1
+            right = int(np.searchsorted(self.x_edges, rect.right, side='left'))
+            top = int(np.searchsorted(self.y_edges, rect.top, side='right')) - 1
+            bottom = int(np.searchsorted(self.y_edges, rect.bottom, side='left'))
+            return self._blit_cells(surface, top, min(bottom, self.rows), left, min(right, self.cols))
+        return rect
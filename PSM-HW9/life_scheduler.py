@@ -0,0 +1,100 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from life_engine import parse_rules
+
+# Runs a Game of Life engine (LifeEngine, ActiveLifeEngine) in a background thread, independently of the
+# display rate. Finished generations are published through a triple buffer: the worker copies each new
+# generation into its back buffer and swaps it with the ready buffer, the render loop swaps the ready buffer
+# with its reading buffer when a newer generation is there. Only the index swaps happen under the lock, so
+# neither thread waits while the other copies or draws. After start() only the worker thread touches the
+# engine; rule changes are handed over and applied between two generations.
+
+
+class SimulationScheduler:
+    def __init__(self, engine, generations_per_second=None):
+        # generations_per_second: target simulation rate, None (or 0) runs as fast as possible
+        self.engine = engine
+        self.generations_per_second = generations_per_second
+        self._buffers = [engine.grid.copy() for _ in range(3)]
+        self._back, self._ready, self._reading = 0, 1, 2
+        self._fresh = False  # The ready buffer holds a generation the reader has not taken yet
+        self._generation = engine.generation
+        self._lock = threading.Lock()
+        self._pending_rules = None
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._resumed.set()  # Wake the worker if it is paused
+        self._thread.join()
+
+    def pause(self):
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    @property
+    def paused(self):
+        return not self._resumed.is_set()
+
+    def set_rules(self, rules):
+        parse_rules(rules)  # Invalid rules raise here, in the caller, rather than in the worker
+        with self._lock:
+            self._pending_rules = dict(rules)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @contextmanager
+    def latest(self):
+        # Latest finished generation; the array is only valid inside the with block. The reading buffer is
+        # never written by the worker, so the lock is only held to take the newest ready buffer.
+        with self._lock:
+            if self._fresh:
+                self._ready, self._reading = self._reading, self._ready
+                self._fresh = False
+        yield self._buffers[self._reading]
+
+    def _publish(self):
+        back = self._back
+        np.copyto(self._buffers[back], self.engine.grid)
+        with self._lock:
+            self._back, self._ready = self._ready, back
+            self._fresh = True
+            self._generation = self.engine.generation
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while not self._stopped.is_set():
+            if not self._resumed.is_set():
+                self._resumed.wait()
+                next_time = time.perf_counter()
+                continue
+
+            with self._lock:
+                rules, self._pending_rules = self._pending_rules, None
+            if rules is not None:
+                self.engine.set_rules(rules)
+            self.engine.step()
+            self._publish()
+
+            if self.generations_per_second:
+                next_time += 1 / self.generations_per_second
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    self._stopped.wait(delay)
+                else:
+                    next_time = time.perf_counter()  # Falling behind, do not try to catch up in a burst
@@ -0,0 +1,141 @@
+import numpy as np
+
+# Adaptive-step Dormand-Prince 5(4) integrator for any right-hand side f(t, y) -> dy/dt.
+# The embedded 4th-order solution estimates the local error, steps whose scaled error exceeds 1 are rejected
+# and retried, and a PI controller picks the next step size. Solutions at requested times come from the
+# 4th-order continuous extension of each step (dense output), so output times never restrict the step size.
+
+# Butcher tableau (c, a, 5th-order weights b, error weights e = b - b*) and dense output coefficients
+C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+]
+B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+D = np.array([-12715105075/11282082432, 0, 87487479700/32700410799, -10690763975/1880347072,
+              701980252875/199316789632, -1453857185/822651844, 69997945/29380423])
+
+SAFETY = 0.9
+MIN_FACTOR, MAX_FACTOR = 0.2, 10.0
+ALPHA, BETA = 0.7 / 5, 0.4 / 5  # PI controller exponents (Hairer & Wanner)
+
+
+def _error_norm(error, y, y_new, rtol, atol):
+    scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+    return np.sqrt(np.mean((error / scale)**2))
+
+
+def _initial_step(f, t, y, f0, direction, rtol, atol):
+    # Hairer's starting step: make the first Euler step change y by about the tolerance
+    scale = atol + rtol * np.abs(y)
+    d0, d1 = np.sqrt(np.mean((y / scale)**2)), np.sqrt(np.mean((f0 / scale)**2))
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    f1 = f(t + direction * h0, y + direction * h0 * f0)
+    d2 = np.sqrt(np.mean(((f1 - f0) / scale)**2)) / h0
+    h1 = max(1e-6, h0 * 1e-3) if max(d1, d2) <= 1e-15 else (0.01 / max(d1, d2))**(1 / 5)
+    return min(100 * h0, h1)
+
+
+def _dense(y, y_new, k, h):
+    # Coefficients of the continuous extension on [t, t + h]
+    dy = y_new - y
+    spline = h * k[0] - dy
+    return y, dy, spline, dy - h * k[6] - spline, h * np.tensordot(D, k, axes=1)
+
+
+def _evaluate_dense(coefficients, theta):
+    r1, r2, r3, r4, r5 = coefficients
+    theta1 = 1 - theta
+    return r1 + theta * (r2 + theta1 * (r3 + theta * (r4 + theta1 * r5)))
+
+
+def solve_adaptive(f, t_span, y0, t_eval=None, rtol=1e-6, atol=1e-9, first_step=None, max_step=np.inf,
+                   max_steps=1_000_000, sink=None):
+    # Integrate y' = f(t, y) over t_span = (t0, t1).
+    # Returns (t, y, stats): the accepted step times and states, or the states at t_eval when given
+    # (y has shape (len(t), *y0.shape)), and a dict with nfev, accepted and rejected step counts.
+    # With a sink (trajectory.py, record shape (1 + y0.size,): t followed by the flattened state) the same rows
+    # are streamed into it as they are produced instead, and (sink, stats) is returned.
+    t0, t1 = map(float, t_span)
+    y = np.array(y0, dtype=float)
+    direction = 1.0 if t1 >= t0 else -1.0
+    t_eval = None if t_eval is None else np.asarray(t_eval, dtype=float)
+    stats = {'nfev': 0, 'accepted': 0, 'rejected': 0}
+
+    def rhs(t, y):
+        stats['nfev'] += 1
+        return np.asarray(f(t, y), dtype=float)
+
+    k = np.empty((7,) + y.shape)
+    k[0] = rhs(t0, y)
+    h = first_step or _initial_step(rhs, t0, y, k[0], direction, rtol, atol)
+    previous_error = 1.0
+
+    times, states = [], []
+    if sink is not None:
+        row = np.empty(1 + y.size)
+    elif t_eval is not None:
+        out = np.empty((len(t_eval),) + y.shape)
+
+    def emit(time, state, index=None):
+        if sink is not None:
+            row[0], row[1:] = time, state.ravel()
+            sink.append(row)
+        elif index is not None:
+            out[index] = state
+        else:
+            times.append(time)
+            states.append(state)
+
+    if t_eval is not None:
+        next_eval = 0
+        while next_eval < len(t_eval) and t_eval[next_eval] == t0:
+            emit(t0, y, next_eval)
+            next_eval += 1
+    else:
+        emit(t0, y.copy())
+
+    t = t0
+    while direction * (t1 - t) > 0:
+        if stats['accepted'] + stats['rejected'] >= max_steps:
+            raise RuntimeError(f"solve_adaptive: more than {max_steps} steps needed, stopped at t = {t}")
+        h = min(h, max_step, abs(t1 - t))
+        step = direction * h
+        for i in range(1, 7):
+            k[i] = rhs(t + C[i] * step, y + step * np.tensordot(A[i], k[:i], axes=1))
+        y_new = y + step * np.tensordot(B[:6], k[:6], axes=1)
+        error = _error_norm(step * np.tensordot(E, k, axes=1), y, y_new, rtol, atol)
+
+        if error <= 1:
+            t_new = t1 if h == abs(t1 - t) else t + step  # Land exactly on t1
+            if t_eval is not None:
+                coefficients = None
+                while next_eval < len(t_eval) and direction * (t_eval[next_eval] - t_new) <= 0:
+                    if coefficients is None:
+                        coefficients = _dense(y, y_new, k, step)
+                    emit(t_eval[next_eval], _evaluate_dense(coefficients, (t_eval[next_eval] - t) / step), next_eval)
+                    next_eval += 1
+            else:
+                emit(t_new, y_new)
+            # PI control of the next step from this and the previous error
+            factor = SAFETY * max(error, 1e-10)**-ALPHA * previous_error**BETA
+            h *= min(MAX_FACTOR, max(MIN_FACTOR, factor))
+            previous_error = max(error, 1e-4)
+            t, y = t_new, y_new
+            k[0] = k[6]  # First same as last
+            stats['accepted'] += 1
+        else:
+            h *= max(MIN_FACTOR, SAFETY * error**(-1 / 5))
+            stats['rejected'] += 1
+
+    if sink is not None:
+        return sink, stats
+    if t_eval is not None:
+        return t_eval, out, stats
+    return np.array(times), np.array(states), stats
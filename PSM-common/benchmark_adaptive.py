@@ -0,0 +1,84 @@
+import numpy as np
+
+from adaptive import solve_adaptive
+from homework import load
+
+# Function evaluations needed for a given accuracy: adaptive Dormand-Prince (several tolerances) against
+# fixed-step RK4 (several step sizes), on the right-hand sides of the homeworks. The error is the relative
+# norm of the final state against a Dormand-Prince run at rtol = 1e-12 (tighter tolerances hit round-off on the orbital model).
+
+hw3 = load('PSM-HW3', 'main.py')
+hw5 = load('PSM-HW5', 'main.py')
+hw8 = load('PSM-HW8', 'psm-task8.py')
+
+
+def lorenz(t, xyz):
+    # The system of differential equations of PSM-HW8
+    x, y, z = xyz
+    return np.array([hw8.A * (y - x), -x * z + hw8.B * x - y, x * y - hw8.C * z])
+
+
+def pendulum(t, state):
+    # The k-terms of improved_euler_method / rk4_method in PSM-HW3
+    a, w = state
+    return np.array([w, -hw3.g / hw3.l * np.sin(a)])
+
+
+def earth_moon(t, state):
+    # Sun fixed at the origin, forces from gravitational_force in PSM-HW5
+    earth_pos, earth_vel, moon_pos, moon_vel = state.reshape(4, 2)
+    sun = np.zeros(2)
+    force_on_earth = hw5.gravitational_force(hw5.M_z, hw5.M_s, earth_pos, sun)
+    force_on_moon = (hw5.gravitational_force(hw5.M_k, hw5.M_z, moon_pos, earth_pos) +
+                     hw5.gravitational_force(hw5.M_k, hw5.M_s, moon_pos, sun))
+    return np.concatenate([earth_vel, force_on_earth / hw5.M_z, moon_vel, force_on_moon / hw5.M_k])
+
+
+def rk4_fixed(f, t_span, y0, dt):
+    t, y = t_span[0], np.array(y0, dtype=float)
+    steps = int(round((t_span[1] - t_span[0]) / dt))
+    for _ in range(steps):
+        k1 = f(t, y)
+        k2 = f(t + dt / 2, y + dt / 2 * k1)
+        k3 = f(t + dt / 2, y + dt / 2 * k2)
+        k4 = f(t + dt, y + dt * k3)
+        y = y + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        t += dt
+    return y, 4 * steps
+
+
+day = 24 * 3600
+earth_moon_y0 = np.concatenate([hw5.earth_pos, hw5.earth_vel, hw5.moon_pos, hw5.moon_vel]).astype(float)
+earth_moon_scale = np.array([hw5.R_zs] * 2 + [3e4] * 2 + [hw5.R_zs] * 2 + [3e4] * 2)  # m and m/s
+models = [
+    # name, right-hand side, time span, initial state, error scale, RK4 step sizes, DOPRI5 tolerances
+    ('Lorenz (HW8)', lorenz, (0, 5), [hw8.x0, hw8.y0, hw8.z0], 1.0, [0.01, 0.005, 0.0025, 0.00125],
+     [1e-4, 1e-6, 1e-8, 1e-10]),
+    ('Pendulum (HW3)', pendulum, (0, hw3.duration), [hw3.a, hw3.w], 1.0, [0.1, 0.05, 0.02, 0.01],
+     [1e-4, 1e-6, 1e-8, 1e-10]),
+    # Looser tolerances let the Moon's orbit around the Earth go unresolved (errors are relative to the
+    # Earth-Sun distance), so the Moon can fall into the Earth
+    ('Earth-Moon (HW5)', earth_moon, (0, 365 * day), earth_moon_y0, earth_moon_scale,
+     [4 * day, 2 * day, day, day / 2, day / 4], [1e-7, 1e-8, 1e-9, 1e-10]),
+]
+
+if __name__ == "__main__":
+    for name, f, span, y0, scale, steps, tolerances in models:
+        _, reference, _ = solve_adaptive(f, span, y0, [span[1]], rtol=1e-12, atol=1e-12 * np.asarray(scale))
+        reference = reference[-1]
+
+        def relative_error(y):
+            return np.linalg.norm((y - reference) / scale) / np.linalg.norm(reference / scale)
+
+        print(f"\n{name}")
+        print(f"{'method':>10} {'setting':>12} {'evaluations':>12} {'error':>10} {'digits':>7} {'evals/digit':>12}")
+        rows = []
+        for dt in steps:
+            y, nfev = rk4_fixed(f, span, y0, dt)
+            rows.append(('RK4', f"dt={dt:g}", nfev, relative_error(y)))
+        for tol in tolerances:
+            _, y, stats = solve_adaptive(f, span, y0, [span[1]], rtol=tol, atol=tol * np.asarray(scale))
+            rows.append(('DOPRI5', f"tol={tol:g}", stats['nfev'], relative_error(y[-1])))
+        for method, setting, nfev, error in rows:
+            digits = -np.log10(max(error, 1e-16))
+            print(f"{method:>10} {setting:>12} {nfev:>12} {error:>10.2e} {digits:>7.2f} {nfev / max(digits, 1e-3):>12.0f}")
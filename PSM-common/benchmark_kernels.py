@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+
+import kernels
+from homework import load
+
+# Speedup of the kernels in kernels.py over the homework scripts, per model and method, at a small time step.
+# The scripts run ode_core's unrolled step on Python floats plus vectorized intermediate columns. "python" is the
+# same kernel run uncompiled, i.e. the fallback without Numba, which is no faster than the scripts; the speedup
+# comes from compiling. "numba" is the compiled kernel, its first call (compilation) excluded.
+
+hw2 = load('PSM-HW2', 'with-intermediates.py')
+hw3 = load('PSM-HW3', 'main.py')
+
+PENDULUM_DT, PENDULUM_DURATION = 1e-4, 10
+PROJECTILE_DT, PROJECTILE_DURATION = 1e-5, 5
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def pendulum_runs(method):
+    hw3.duration = PENDULUM_DURATION
+    script = hw3.rk4_method if method == 'rk4' else hw3.improved_euler_method
+    kernel = kernels.PENDULUM_METHODS[method]
+    steps = int(round(PENDULUM_DURATION / PENDULUM_DT))
+    args = (float(hw3.a), float(hw3.w), PENDULUM_DT, hw3.l, float(hw3.m), hw3.g, steps, np.empty((steps + 1, 6)))
+    return (lambda: script(hw3.a, hw3.w, PENDULUM_DT, hw3.l, hw3.g)), kernel, args
+
+
+def projectile_runs(method):
+    hw2.duration = PROJECTILE_DURATION
+    script = hw2.midpoint_method if method == 'midpoint' else hw2.euler_method
+    kernel = kernels.PROJECTILE_METHODS[method]
+    steps = int(np.ceil(PROJECTILE_DURATION / PROJECTILE_DT))
+    args = (0.0, 0.0, hw2.v0x, hw2.v0y, PROJECTILE_DT, hw2.k, hw2.m, hw2.g, steps, np.empty((steps + 1, 13)))
+    return (lambda: script(hw2.v0x, hw2.v0y, hw2.s0, PROJECTILE_DT, 0, hw2.k, hw2.m, hw2.g)), kernel, args
+
+
+if __name__ == "__main__":
+    print(f"Numba {'available' if kernels.HAVE_NUMBA else 'not installed, kernels run as Python'}")
+    print(f"{'model':>22} {'steps':>9} {'script (s)':>11} {'python (s)':>11} {'numba (s)':>10} {'speedup':>8}")
+    for name, runs, method in [('pendulum improved Euler', pendulum_runs, 'improved_euler'),
+                               ('pendulum RK4', pendulum_runs, 'rk4'),
+                               ('projectile Euler', projectile_runs, 'euler'),
+                               ('projectile midpoint', projectile_runs, 'midpoint')]:
+        script, kernel, args = runs(method)
+        script_time, results = timed(script)
+        python_time, rows = timed(getattr(kernel, 'py_func', kernel), *args)
+        if kernels.HAVE_NUMBA:
+            kernel(*args)  # Compile
+            compiled_time, rows = timed(kernel, *args)
+        else:
+            compiled_time = python_time
+        # Same table as the script, time column included: both write the time at the end of each step and
+        # stop after the same step
+        assert rows == len(results)
+        assert np.allclose(results, args[-1][:rows], rtol=1e-9, atol=1e-9)
+        print(f"{name:>22} {len(results) - 1:>9} {script_time:>11.3f} {python_time:>11.3f} {compiled_time:>10.4f} "
+              f"{script_time / compiled_time:>7.0f}x")
@@ -0,0 +1,117 @@
+import time
+
+import numpy as np
+
+from homework import load
+
+# The homework scripts before and after they moved onto ode_core: the "old loop" columns are the loops the
+# scripts had (copied below, PSM-HW3 improved Euler and RK4 with their per-step energies, PSM-HW8 RK4 on
+# NumPy arrays), "ode_core" are the script functions as they are now, energies included. Both produce the same
+# table; the rows are compared.
+
+hw3 = load('PSM-HW3', 'main.py')
+hw8 = load('PSM-HW8', 'psm-task8.py')
+
+DT, DURATION = 1e-3, 100
+LORENZ_DT, LORENZ_STEPS = 1e-3, 100_000
+
+
+def old_improved_euler(a, w, dt, l, g):
+    results = [(0, a, w, 0, 0, 0)]
+    time = 0
+    while time < DURATION:
+        k1a = w
+        k1w = -g / l * np.sin(a)
+
+        a_mid = a + k1a * dt / 2
+        w_mid = w + k1w * dt / 2
+
+        k2a = w_mid
+        k2w = -g / l * np.sin(a_mid)
+
+        a += k2a * dt
+        w += k2w * dt
+
+        PE, KE, TE = hw3.calculate_energies(a, w, l, hw3.m, g)
+        results.append((time, a, w, PE, KE, TE))
+        time += dt
+    return results
+
+
+def old_rk4(a, w, dt, l, g):
+    results = [(0, a, w, 0, 0, 0)]
+    time = 0
+    while time < DURATION:
+        k1a = w
+        k1w = -g / l * np.sin(a)
+
+        a2 = a + k1a * dt / 2
+        w2 = w + k1w * dt / 2
+        k2a = w2
+        k2w = -g / l * np.sin(a2)
+
+        a3 = a + k2a * dt / 2
+        w3 = w + k2w * dt / 2
+        k3a = w3
+        k3w = -g / l * np.sin(a3)
+
+        a4 = a + k3a * dt
+        w4 = w + k3w * dt
+        k4a = w4
+        k4w = -g / l * np.sin(a4)
+
+        a += (k1a + 2*k2a + 2*k3a + k4a) / 6 * dt
+        w += (k1w + 2*k2w + 2*k3w + k4w) / 6 * dt
+
+        PE, KE, TE = hw3.calculate_energies(a, w, l, hw3.m, g)
+        results.append((time, a, w, PE, KE, TE))
+        time += dt
+    return results
+
+
+def lorenz_system(xyz):
+    x, y, z = xyz
+    return np.array([hw8.A * (y - x), -x * z + hw8.B * x - y, x * y - hw8.C * z])
+
+
+def old_lorenz_rk4(x0, y0, z0, step_size):
+    xyz = np.array([x0, y0, z0])
+    results = [xyz.copy()]
+    current_step = 0
+    while current_step < LORENZ_STEPS:
+        k1 = lorenz_system(xyz)
+        k2 = lorenz_system(xyz + step_size / 2 * k1)
+        k3 = lorenz_system(xyz + step_size / 2 * k2)
+        k4 = lorenz_system(xyz + step_size * k3)
+        delta_xyz = step_size / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        xyz += delta_xyz
+        results.append(xyz.copy())
+        current_step += 1
+    return np.array(results)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, np.asarray(result)
+
+
+if __name__ == "__main__":
+    hw3.duration = DURATION
+    hw8.num_steps = LORENZ_STEPS
+    pendulum_args = (hw3.a, hw3.w, DT, hw3.l, hw3.g)
+    lorenz_args = (hw8.x0, hw8.y0, hw8.z0, LORENZ_DT)
+    print(f"{'run':>24} {'steps':>8} {'old loop (s)':>13} {'ode_core (s)':>13} {'speedup':>8}")
+    for name, old, new, args, columns, compared in [
+            ('HW3 improved Euler', old_improved_euler, hw3.improved_euler_method, pendulum_args, slice(1, 6), None),
+            ('HW3 RK4', old_rk4, hw3.rk4_method, pendulum_args, slice(1, 6), None),
+            # Chaotic: the different summation order of the stages (1e-13 apart at first) takes over after
+            # about 25 time units, so only the first 20000 rows are compared
+            ('HW8 RK4', old_lorenz_rk4, hw8.rk4_method, lorenz_args, slice(0, 3), 20_000)]:
+        old_time, old_rows = timed(old, *args)
+        new_time, new_rows = timed(new, *args)
+        # The old time counter can add a last step and the old first row has zero energies; compare the rows
+        # after the first step that both have
+        n = min(len(old_rows), len(new_rows), compared or len(new_rows))
+        assert np.allclose(old_rows[1:n, columns], new_rows[1:n, columns], rtol=1e-9, atol=1e-9)
+        print(f"{name:>24} {len(new_rows) - 1:>8} {old_time:>13.3f} {new_time:>13.3f} {old_time / new_time:>7.1f}x")
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+
+from homework import load
+from ode_core import as_table, integrate
+from symplectic import as_rhs, earth_moon_acceleration, integrate_symplectic, pendulum_acceleration
+
+# Energy error against wall time: symplectic integrators (velocity Verlet, leapfrog, Yoshida 4) against the
+# midpoint and RK4 schemes of the homeworks (through ode_core), over long runs at several step sizes. The error
+# is the largest relative deviation of the total energy from its initial value over the run, from
+# calculate_energies of PSM-HW3 for the pendulum and orbital_energy of PSM-HW5 for Earth and Moon.
+
+hw3 = load('PSM-HW3', 'main.py')
+hw5 = load('PSM-HW5', 'main.py')
+
+day = 24 * 3600
+SYMPLECTIC = ('verlet', 'leapfrog', 'yoshida4')
+RUNGE_KUTTA = ('midpoint', 'rk4')
+
+
+def pendulum_energy(q, v):
+    _, _, TE = hw3.calculate_energies(q[:, 0], v[:, 0], hw3.l, hw3.m, hw3.g)
+    return TE
+
+
+def earth_moon_energy(q, v):
+    return hw5.orbital_energy(q[:, 0], v[:, 0], q[:, 1], v[:, 1])
+
+
+models = [
+    # name, acceleration, q0, v0, duration, step sizes, energy of (q, v) trajectories
+    ('Pendulum (HW3), 500 s', pendulum_acceleration(hw3.l, hw3.g), [float(hw3.a)], [hw3.w], 500,
+     [0.01, 0.05, 0.1, 0.2], pendulum_energy),
+    ('Earth-Moon (HW5), 10 years', earth_moon_acceleration(hw5.G, hw5.M_s, hw5.M_z, hw5.M_k),
+     [hw5.earth_pos, hw5.moon_pos], [hw5.earth_vel, hw5.moon_vel], 3650 * day,
+     [day / 8, day / 4, day / 2, day], earth_moon_energy),
+]
+
+
+def run(method, acceleration, q0, v0, dt, steps):
+    q0, v0 = np.array(q0, dtype=float), np.array(v0, dtype=float)
+    if method in SYMPLECTIC:
+        q, v, _ = integrate_symplectic(acceleration, q0, v0, dt, steps, method)
+        return q, v
+    size = q0.size
+    fields = [f'q{i}' for i in range(size)] + [f'v{i}' for i in range(size)]
+    result = integrate(as_rhs(acceleration, q0.shape), np.concatenate([q0.ravel(), v0.ravel()]), dt, steps,
+                       fields, method)
+    states = as_table(result)[:, 1:]
+    return states[:, :size].reshape((-1,) + q0.shape), states[:, size:].reshape((-1,) + q0.shape)
+
+
+if __name__ == "__main__":
+    for name, acceleration, q0, v0, duration, steps_sizes, energy in models:
+        print(f"\n{name}")
+        print(f"{'method':>10} {'dt':>10} {'time (s)':>9} {'max |dE/E0|':>12}")
+        for method in RUNGE_KUTTA + SYMPLECTIC:
+            for dt in steps_sizes:
+                start = time.perf_counter()
+                q, v = run(method, acceleration, q0, v0, dt, int(round(duration / dt)))
+                elapsed = time.perf_counter() - start
+                E = energy(q, v)
+                error = np.max(np.abs(E - E[0])) / abs(E[0])
+                print(f"{method:>10} {dt:>10g} {elapsed:>9.3f} {error:>12.2e}")
@@ -0,0 +1,18 @@
+import importlib.util
+from pathlib import Path
+
+# Loads the homework scripts (PSM-HW*/...) as modules so the shared code can reuse their functions and
+# constants. The scripts only run their simulations and plots under `if __name__ == "__main__"`.
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load(folder, filename):
+    # e.g. load('PSM-HW8', 'psm-task8.py'); every script gets its own module name, so the main.py files
+    # of different homeworks do not clash
+    path = ROOT / folder / filename
+    name = f"{folder}_{path.stem}".replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,172 @@
+import math
+
+import numpy as np
+
+# Compiled fixed-step kernels for the scalar simulations of PSM-HW2 (projectile with drag) and PSM-HW3
+# (pendulum). Same arithmetic as the homework scripts (ode_core), but on plain floats with math.sin/cos,
+# the energies computed inline and every row written straight into a preallocated NumPy array.
+# With Numba installed the kernels are compiled with njit, without it they run as ordinary Python functions.
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Stand-in for numba.njit, used both as @njit and as @njit(...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+# Output columns, as in the DataFrames of the homework scripts
+PENDULUM_COLUMNS = ('time', 'a', 'w', 'PE', 'KE', 'TE')
+PROJECTILE_COLUMNS = ('t', 'Sx', 'Sy', 'Vx', 'Vy', 'DSx', 'DSy', 'Fx', 'Fy', 'ax', 'ay', 'DVx', 'DVy')
+
+
+@njit(cache=True)
+def _pendulum_first_row(out, a, w, l, m, g):
+    PE = m * g * l * (1 - math.cos(a))
+    KE = 0.5 * m * (l * w)**2
+    out[0, 0], out[0, 1], out[0, 2], out[0, 3], out[0, 4], out[0, 5] = 0.0, a, w, PE, KE, PE + KE
+
+
+@njit(cache=True)
+def pendulum_improved_euler(a, w, dt, l, m, g, steps, out):
+    # Fills out[:steps + 1] (columns PENDULUM_COLUMNS) and returns the number of rows written
+    _pendulum_first_row(out, a, w, l, m, g)
+    for i in range(1, steps + 1):
+        k1a = w
+        k1w = -g / l * math.sin(a)
+        k2a = w + k1w * dt / 2
+        k2w = -g / l * math.sin(a + k1a * dt / 2)
+        a += k2a * dt
+        w += k2w * dt
+        PE = m * g * l * (1 - math.cos(a))  # calculate_energies of PSM-HW3, inline
+        KE = 0.5 * m * (l * w)**2
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3], out[i, 4], out[i, 5] = i * dt, a, w, PE, KE, PE + KE
+    return steps + 1
+
+
+@njit(cache=True)
+def pendulum_rk4(a, w, dt, l, m, g, steps, out):
+    _pendulum_first_row(out, a, w, l, m, g)
+    for i in range(1, steps + 1):
+        k1a = w
+        k1w = -g / l * math.sin(a)
+        k2a = w + k1w * dt / 2
+        k2w = -g / l * math.sin(a + k1a * dt / 2)
+        k3a = w + k2w * dt / 2
+        k3w = -g / l * math.sin(a + k2a * dt / 2)
+        k4a = w + k3w * dt
+        k4w = -g / l * math.sin(a + k3a * dt)
+        a += (k1a + 2*k2a + 2*k3a + k4a) / 6 * dt
+        w += (k1w + 2*k2w + 2*k3w + k4w) / 6 * dt
+        PE = m * g * l * (1 - math.cos(a))  # calculate_energies of PSM-HW3, inline
+        KE = 0.5 * m * (l * w)**2
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3], out[i, 4], out[i, 5] = i * dt, a, w, PE, KE, PE + KE
+    return steps + 1
+
+
+@njit(cache=True)
+def _projectile_first_row(out, sx, sy, vx, vy, k, m, g):
+    Fx, Fy = -k * vx, m * g - k * vy
+    out[0, 0], out[0, 1], out[0, 2], out[0, 3], out[0, 4] = 0.0, sx, sy, vx, vy
+    out[0, 5], out[0, 6], out[0, 7], out[0, 8] = 0.0, 0.0, Fx, Fy
+    out[0, 9], out[0, 10], out[0, 11], out[0, 12] = Fx / m, Fy / m, 0.0, 0.0
+
+
+@njit(cache=True)
+def projectile_euler(sx, sy, vx, vy, dt, k, m, g, steps, out):
+    # Fills out (columns PROJECTILE_COLUMNS) for at most `steps` steps, stopping after the step that takes
+    # the projectile below the ground like the homework loop; returns the number of rows written
+    _projectile_first_row(out, sx, sy, vx, vy, k, m, g)
+    for i in range(1, steps + 1):
+        Fx = -k * vx
+        Fy = m * g - k * vy
+        ax, ay = Fx / m, Fy / m
+        DVx, DVy = ax * dt, ay * dt
+        DSx, DSy = vx * dt, vy * dt
+        sx += DSx
+        sy += DSy
+        vx += DVx
+        vy += DVy
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3], out[i, 4] = i * dt, sx, sy, vx, vy
+        out[i, 5], out[i, 6], out[i, 7], out[i, 8] = DSx, DSy, Fx, Fy
+        out[i, 9], out[i, 10], out[i, 11], out[i, 12] = ax, ay, DVx, DVy
+        if sy < 0:
+            return i + 1
+    return steps + 1
+
+
+@njit(cache=True)
+def projectile_midpoint(sx, sy, vx, vy, dt, k, m, g, steps, out):
+    _projectile_first_row(out, sx, sy, vx, vy, k, m, g)
+    for i in range(1, steps + 1):
+        mid_vx = vx + (-k * vx) / m * dt / 2
+        mid_vy = vy + (m * g - k * vy) / m * dt / 2
+        mid_Fx = -k * mid_vx
+        mid_Fy = m * g - k * mid_vy
+        mid_ax, mid_ay = mid_Fx / m, mid_Fy / m
+        DVx, DVy = mid_ax * dt, mid_ay * dt
+        DSx, DSy = mid_vx * dt, mid_vy * dt
+        sx += DSx
+        sy += DSy
+        vx += DVx
+        vy += DVy
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3], out[i, 4] = i * dt, sx, sy, vx, vy
+        out[i, 5], out[i, 6], out[i, 7], out[i, 8] = DSx, DSy, mid_Fx, mid_Fy
+        out[i, 9], out[i, 10], out[i, 11], out[i, 12] = mid_ax, mid_ay, DVx, DVy
+        if sy < 0:
+            return i + 1
+    return steps + 1
+
+
+# Kernels by method name, 'improved_euler' and 'euler' as in the homework scripts
+PENDULUM_METHODS = {'rk4': pendulum_rk4, 'improved_euler': pendulum_improved_euler}
+PROJECTILE_METHODS = {'midpoint': projectile_midpoint, 'euler': projectile_euler}
+
+
+def _kernel(methods, method):
+    if method not in methods:
+        raise ValueError(f"Unknown method '{method}', expected one of {tuple(methods)}")
+    return methods[method]
+
+
+def _run(kernel, state, dt, parameters, steps, width, stop_column=None, sink=None, chunk=4096):
+    # Rows of kernel(*state, dt, *parameters, steps, out). With a sink (trajectory.py, record shape (width,)) the
+    # kernel runs `chunk` steps at a time, each call starting from the last row of the one before, and the rows
+    # are streamed into the sink, which is returned; stop_column ends the run when it goes negative.
+    if sink is None:
+        out = np.empty((steps + 1, width))
+        return out[:kernel(*state, dt, *parameters, steps, out)]
+    out = np.empty((min(chunk, steps) + 1, width))
+    done, first = 0, 0
+    while True:
+        count = min(chunk, steps - done)
+        rows = kernel(*state, dt, *parameters, count, out)
+        out[:rows, 0] += done * dt
+        sink.extend(out[first:rows])
+        done += rows - 1
+        if done >= steps or rows < count + 1 or (stop_column is not None and out[rows - 1, stop_column] < 0):
+            return sink
+        state = tuple(out[rows - 1, 1:1 + len(state)])
+        first = 1  # The first row of the next call repeats this last one
+
+
+def simulate_pendulum(a, w, dt, duration, l=1.0, m=1.0, g=9.81, method='rk4', sink=None):
+    # Returns a (steps + 1, 6) array with the columns PENDULUM_COLUMNS, or streams the rows into the sink
+    kernel = _kernel(PENDULUM_METHODS, method)
+    steps = int(round(duration / dt))
+    return _run(kernel, (float(a), float(w)), float(dt), (float(l), float(m), float(g)), steps,
+                len(PENDULUM_COLUMNS), sink=sink)
+
+
+def simulate_projectile(v0, angle, dt, duration, k=0.5, m=1.0, g=-9.81, method='midpoint', sink=None):
+    # Launch from the origin with speed v0 at angle (degrees); returns rows with the columns PROJECTILE_COLUMNS,
+    # or streams them into the sink
+    kernel = _kernel(PROJECTILE_METHODS, method)
+    steps = int(math.ceil(duration / dt))
+    vx, vy = v0 * math.cos(math.radians(angle)), v0 * math.sin(math.radians(angle))
+    return _run(kernel, (0.0, 0.0, vx, vy), float(dt), (float(k), float(m), float(g)), steps,
+                len(PROJECTILE_COLUMNS), stop_column=2, sink=sink)
@@ -0,0 +1,98 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from ode_core import integrate
+
+# The homework models as thin right-hand sides for ode_core.integrate. Each factory takes the model's
+# parameters (defaults are the constants of the homework script) and returns a Model: rhs(t, y, out) writing
+# dy/dt into out, the names of the state fields and an optional stop(t, y) condition. The right-hand sides only
+# index y and out, so simulate runs them on Python floats (ode_core.integrate with scalar=True).
+
+Model = namedtuple('Model', ['rhs', 'fields', 'stop'])
+
+
+def projectile(k=0.5, m=1.0, g=-9.81):
+    # PSM-HW2: point mass with linear drag, state (sx, sy, vx, vy), stops when it falls below the ground
+    def rhs(t, y, out):
+        out[0], out[1] = y[2], y[3]
+        out[2] = -k * y[2] / m
+        out[3] = g - k * y[3] / m
+        return out
+
+    return Model(rhs, ('sx', 'sy', 'vx', 'vy'), lambda t, y: y[1] < 0)
+
+
+def pendulum(l=1.0, g=9.81):
+    # PSM-HW3: state (a, w), angle and angular velocity
+    def rhs(t, y, out):
+        out[0] = y[1]
+        out[1] = -g / l * math.sin(y[0])
+        return out
+
+    return Model(rhs, ('a', 'w'), None)
+
+
+def rolling_sphere(I, m=1.0, r=0.1, alpha=np.radians(30), g=9.81):
+    # PSM-HW4: sphere with moment of inertia I rolling down the incline, state (Sx, Vx, beta, w)
+    acceleration = g * np.sin(alpha) / (1 + I / (m * r**2))
+
+    def rhs(t, y, out):
+        out[0], out[1] = y[1], acceleration
+        out[2], out[3] = y[3], acceleration / r
+        return out
+
+    return Model(rhs, ('Sx', 'Vx', 'beta', 'w'), None)
+
+
+def earth_moon(G=6.6743e-11, M_s=1.989e30, M_z=5.972e24, solver=None):
+    # PSM-HW5: Earth and Moon around a fixed Sun in the origin.
+    # State (ex, ey, mx, my, evx, evy, mvx, mvy); positions first, then velocities.
+    # solver: an N-body force solver, solver(positions, masses, out) -> accelerations (PSM-HW5 nbody.DirectSum or
+    # barnes_hut.BarnesHut, which bring their own G), called on the Sun, Earth and a massless Moon, so that as in the
+    # script the Earth does not feel the Moon. Without one the three pair forces are summed directly here.
+    if solver is not None:
+        positions = np.zeros((3, 2))  # Sun, Earth, Moon; the Sun stays in the origin
+        masses = np.array([M_s, M_z, 0.0])
+        accelerations = np.empty((3, 2))
+
+        def rhs(t, y, out):
+            positions[1:] = (y[0], y[1]), (y[2], y[3])
+            solver(positions, masses, accelerations)
+            out[0], out[1], out[2], out[3] = y[4], y[5], y[6], y[7]
+            out[4], out[5], out[6], out[7] = accelerations[1:].ravel().tolist()
+            return out
+
+        return Model(rhs, ('ex', 'ey', 'mx', 'my', 'evx', 'evy', 'mvx', 'mvy'), None)
+
+    def rhs(t, y, out):
+        ex, ey, mx, my = y[0], y[1], y[2], y[3]
+        out[0], out[1], out[2], out[3] = y[4], y[5], y[6], y[7]
+        sun_on_earth = -G * M_s / (ex * ex + ey * ey)**1.5
+        sun_on_moon = -G * M_s / (mx * mx + my * my)**1.5
+        dx, dy = mx - ex, my - ey
+        earth_on_moon = -G * M_z / (dx * dx + dy * dy)**1.5
+        out[4], out[5] = sun_on_earth * ex, sun_on_earth * ey
+        out[6], out[7] = sun_on_moon * mx + earth_on_moon * dx, sun_on_moon * my + earth_on_moon * dy
+        return out
+
+    return Model(rhs, ('ex', 'ey', 'mx', 'my', 'evx', 'evy', 'mvx', 'mvy'), None)
+
+
+def lorenz(A=10, B=25, C=8/3):
+    # PSM-HW8: state (x, y, z)
+    def rhs(t, y, out):
+        out[0] = A * (y[1] - y[0])
+        out[1] = -y[0] * y[2] + B * y[0] - y[1]
+        out[2] = y[0] * y[1] - C * y[2]
+        return out
+
+    return Model(rhs, ('x', 'y', 'z'), None)
+
+
+def simulate(model, y0, dt, duration, method='rk4', t0=0.0, out=None, sink=None):
+    # Integrate a model over duration in steps of dt, returns the structured result array (or the sink the rows
+    # were streamed into)
+    steps = int(round(duration / dt))
+    return integrate(model.rhs, y0, dt, steps, model.fields, method, t0, model.stop, out, sink, scalar=True)
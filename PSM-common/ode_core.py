@@ -0,0 +1,135 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# One fixed-step explicit Runge-Kutta loop for every simulation. A method is a Butcher tableau, a model is a
+# right-hand side rhs(t, y, out) that writes dy/dt for the state vector y into out (see models.py).
+# Results go into a preallocated NumPy structured array with a 't' field and one field per state variable.
+
+Tableau = namedtuple('Tableau', ['c', 'a', 'b'])
+
+TABLEAUS = {
+    'euler': Tableau(c=[0], a=[[]], b=[1]),
+    # Midpoint method; also the "improved Euler" of PSM-HW3 (second slope taken at the half step)
+    'midpoint': Tableau(c=[0, 1/2], a=[[], [1/2]], b=[0, 1]),
+    'heun': Tableau(c=[0, 1], a=[[], [1]], b=[1/2, 1/2]),
+    'rk4': Tableau(c=[0, 1/2, 1/2, 1], a=[[], [1/2], [0, 1/2], [0, 0, 1]], b=[1/6, 1/3, 1/3, 1/6]),
+}
+TABLEAUS['improved_euler'] = TABLEAUS['midpoint']
+
+
+def result_dtype(fields):
+    return np.dtype([('t', float)] + [(name, float) for name in fields])
+
+
+def as_table(result):
+    # Plain (rows, 1 + fields) float view of a result array: t, then the state variables
+    return result.view(np.float64).reshape(len(result), len(result.dtype.names))
+
+
+def integrate(rhs, y0, dt, steps, fields, method='rk4', t0=0.0, stop=None, out=None, sink=None, chunk=4096,
+              scalar=False):
+    # Take `steps` steps of size dt from y0 at t0 and return a structured array of steps + 1 rows
+    # (t and the fields). stop(t, y) -> True ends the run after that step, the result is then shorter.
+    # out can be a preallocated structured array (e.g. a memmap) of at least steps + 1 rows.
+    # With a sink (trajectory.py, dtype result_dtype(fields)) the rows are streamed into it in blocks of chunk
+    # rows instead, and the sink is returned.
+    # scalar=True runs the stages on lists of Python floats, y and out of rhs are then lists that it may only index
+    # (as the models of models.py do). For the few state variables of the homeworks this is several times faster
+    # than NumPy calls on tiny arrays.
+    tableau = TABLEAUS[method] if isinstance(method, str) else method
+    stages = len(tableau.b)
+    a_dt = [np.asarray(row, dtype=float) * dt for row in tableau.a]  # Coefficients scaled by the step once
+    c_dt = np.asarray(tableau.c, dtype=float) * dt
+    b_dt = np.asarray(tableau.b, dtype=float) * dt
+
+    y = np.array(y0, dtype=float)
+    if len(fields) != y.size:
+        raise ValueError(f"{len(fields)} field names for a state of {y.size} values")
+    if sink is not None:
+        out = np.empty(min(chunk, steps + 1), dtype=result_dtype(fields))
+    elif out is None:
+        out = np.empty(steps + 1, dtype=result_dtype(fields))
+    table = as_table(out)
+    if scalar:
+        return _integrate_scalar(rhs, y, dt, steps, tableau, t0, stop, out, sink, chunk)
+
+    k = np.zeros((stages, y.size))
+    stage = np.empty_like(y)
+    table[0, 0], table[0, 1:] = t0, y
+    t = t0
+    row = 0
+    for i in range(1, steps + 1):
+        for s in range(stages):
+            if s:
+                np.dot(a_dt[s], k[:s], out=stage)
+                np.add(stage, y, out=stage)
+                rhs(t + c_dt[s], stage, k[s])
+            else:
+                rhs(t, y, k[0])
+        np.dot(b_dt, k, out=stage)
+        np.add(y, stage, out=y)
+        t = t0 + i * dt
+        row = i if sink is None else i % len(out)
+        if sink is not None and row == 0:
+            sink.extend(out)
+        table[row, 0], table[row, 1:] = t, y
+        if stop is not None and stop(t, y):
+            break
+    if sink is not None:
+        sink.extend(out[:row + 1])
+        return sink
+    return out[:row + 1]
+
+
+@lru_cache(maxsize=None)
+def _unrolled_step(c, a, b, dt, size):
+    # One step of the tableau for `size` state variables on Python floats, with every stage and component written
+    # out: step(rhs, t, y, k) -> new y, k holds one list per stage for the slopes. Zero coefficients are left out.
+    # Generic loops or comprehensions over two or three components cost more than the arithmetic itself.
+    def combine(i, coefficients):
+        return ' + '.join([f'y{i}'] + [f'{coefficient * dt!r} * k{j}[{i}]'
+                                       for j, coefficient in enumerate(coefficients) if coefficient])
+
+    lines = ['def step(rhs, t, y, k):', f"    {', '.join(f'y{i}' for i in range(size))}, = y"]
+    lines += [f'    k{s} = k[{s}]' for s in range(len(b))]
+    lines.append('    rhs(t, y, k0)')
+    for s in range(1, len(b)):
+        stage = ', '.join(combine(i, a[s]) for i in range(size))
+        lines.append(f'    rhs(t + {c[s] * dt!r}, [{stage}], k{s})')
+    lines.append(f"    return [{', '.join(combine(i, b) for i in range(size))}]")
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    return namespace['step']
+
+
+def _integrate_scalar(rhs, y, dt, steps, tableau, t0, stop, out, sink, chunk):
+    # The loop of integrate on Python floats with an unrolled step; the rows are collected in a list and copied
+    # into the result array a block at a time
+    table = as_table(out)
+    step = _unrolled_step(tuple(tableau.c), tuple(map(tuple, tableau.a)), tuple(tableau.b), dt, y.size)
+    y = y.tolist()
+    k = [[0.0] * len(y) for _ in tableau.b]
+    block_rows = len(out) if sink is not None else min(chunk, len(out))
+    block = [(t0, *y)]
+    start = 0  # Row of the result array that block[0] goes to
+    t = t0
+    for i in range(1, steps + 1):
+        y = step(rhs, t, y, k)
+        t = t0 + i * dt
+        if len(block) == block_rows:
+            table[start:start + block_rows] = block
+            if sink is not None:
+                sink.extend(out)
+            else:
+                start += block_rows
+            block = []
+        block.append((t, *y))
+        if stop is not None and stop(t, y):
+            break
+    table[start:start + len(block)] = block
+    if sink is not None:
+        sink.extend(out[:len(block)])
+        return sink
+    return out[:start + len(block)]
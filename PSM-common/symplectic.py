@@ -0,0 +1,96 @@
+import numpy as np
+
+# Symplectic integrators for separable Hamiltonian models, q'' = acceleration(q): velocity Verlet
+# (kick-drift-kick), leapfrog (drift-kick-drift) and Yoshida's 4th-order composition of leapfrog. Unlike the
+# midpoint and RK4 loops their energy error stays bounded instead of drifting, so much larger steps can be used
+# over long runs. q and v can have any shape (e.g. (2,) for the pendulum, (bodies, 2) for orbits, (N,) for an
+# ensemble of pendulums); acceleration(q, out) writes the accelerations into out.
+
+_W1 = 1 / (2 - 2**(1 / 3))
+_W0 = -2**(1 / 3) / (2 - 2**(1 / 3))
+
+# A step is a sequence of ('kick', d) and ('drift', c) substeps: v += d * dt * a(q) and q += c * dt * v
+SCHEMES = {
+    'verlet': [('kick', 1/2), ('drift', 1), ('kick', 1/2)],
+    'leapfrog': [('drift', 1/2), ('kick', 1), ('drift', 1/2)],
+    'yoshida4': [('drift', _W1 / 2), ('kick', _W1), ('drift', (_W0 + _W1) / 2), ('kick', _W0),
+                 ('drift', (_W0 + _W1) / 2), ('kick', _W1), ('drift', _W1 / 2)],
+}
+
+
+def integrate_symplectic(acceleration, q0, v0, dt, steps, method='verlet', every=1, sink=None):
+    # Returns (q, v) arrays of shape (steps // every + 1, *q0.shape) holding the initial and every `every`-th state,
+    # and the number of acceleration evaluations (velocity Verlet reuses the last one of the previous step).
+    # With a sink (trajectory.py, record shape (2, *q0.shape)) the (q, v) pairs are streamed into it instead and
+    # (sink, evaluations) is returned.
+    scheme = SCHEMES[method]
+    q, v = np.array(q0, dtype=float), np.array(v0, dtype=float)
+    if sink is None:
+        q_out = np.empty((steps // every + 1,) + q.shape)
+        v_out = np.empty_like(q_out)
+        q_out[0], v_out[0] = q, v
+    else:
+        sink.append((q, v))
+
+    a = np.empty_like(q)
+    delta = np.empty_like(q)
+    stale = True  # Whether a still has to be evaluated at the current q
+    evaluations = 0
+    for i in range(1, steps + 1):
+        for kind, coefficient in scheme:
+            if kind == 'drift':
+                np.multiply(v, coefficient * dt, out=delta)
+                np.add(q, delta, out=q)
+                stale = True
+            else:
+                if stale:
+                    acceleration(q, a)
+                    evaluations += 1
+                    stale = False
+                np.multiply(a, coefficient * dt, out=delta)
+                np.add(v, delta, out=v)
+        if i % every == 0:
+            if sink is None:
+                q_out[i // every], v_out[i // every] = q, v
+            else:
+                sink.append((q, v))
+    if sink is not None:
+        return sink, evaluations
+    return q_out, v_out, evaluations
+
+
+def as_rhs(acceleration, shape):
+    # The same model as a first-order rhs(t, y, out) for ode_core.integrate, y = (q, v) flattened
+    size = int(np.prod(shape))
+
+    def rhs(t, y, out):
+        out[:size] = y[size:]
+        acceleration(y[:size].reshape(shape), out[size:].reshape(shape))
+        return out
+
+    return rhs
+
+
+def pendulum_acceleration(l=1.0, g=9.81):
+    # PSM-HW3: q is the angle a (any shape)
+    def acceleration(a, out):
+        np.sin(a, out=out)
+        np.multiply(out, -g / l, out=out)
+        return out
+
+    return acceleration
+
+
+def earth_moon_acceleration(G=6.6743e-11, M_s=1.989e30, M_z=5.972e24, M_k=7.347e22):
+    # PSM-HW5 with the Sun fixed in the origin, q = [earth_pos, moon_pos]. Unlike main.py the Earth also feels the
+    # Moon, which makes the model Hamiltonian (energy from orbital_energy in PSM-HW5/main.py is conserved).
+    def acceleration(q, out):
+        r = np.sqrt(np.einsum('ij,ij->i', q, q))
+        np.multiply(q, (-G * M_s / r**3)[:, None], out=out)
+        moon_earth = q[1] - q[0]
+        pull = G / np.dot(moon_earth, moon_earth)**1.5 * moon_earth
+        out[0] += M_k * pull
+        out[1] -= M_z * pull
+        return out
+
+    return acceleration
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from trajectory import NpySink, RingBuffer, TrajectorySink, open_trajectory
+
+
+def records(start, count):
+    return np.arange(start * 3, (start + count) * 3, dtype=float).reshape(count, 3)
+
+
+@pytest.mark.parametrize('blocks', [
+    [2, 2, 1],           # A block that exactly fills the buffer, then an append
+    [3, 1, 1, 4, 1],
+    [1, 9, 1, 4, 4, 1],  # Blocks longer than the buffer, and full ones with rows already buffered
+    [4, 4, 0, 1],
+])
+def test_npy_sink_mixes_extend_and_append(tmp_path, blocks):
+    path = tmp_path / 'trajectory.npy'
+    written = 0
+    with NpySink(path, shape=(3,), chunk=4) as sink:
+        for count in blocks:
+            if count == 1:
+                sink.append(records(written, 1)[0])
+            else:
+                sink.extend(records(written, count))
+            written += count
+            assert len(sink) == written
+            assert len(open_trajectory(path)) == sink.written
+    np.testing.assert_array_equal(open_trajectory(path), records(0, written))
+
+
+def test_ring_buffer_mixes_extend_and_append():
+    ring = RingBuffer(5, shape=(3,), every=2)
+    data = records(0, 23)
+    ring.extend(data[:3])
+    ring.append(data[3])
+    ring.append(data[4])
+    ring.extend(data[5:17])
+    ring.append(data[17])
+    ring.extend(data[18:])
+    np.testing.assert_array_equal(ring.array(), data[::2][-5:])
+
+
+def test_sink_without_write_is_rejected():
+    class Unfinished(TrajectorySink):
+        pass
+
+    with pytest.raises(TypeError):
+        Unfinished(shape=(3,))
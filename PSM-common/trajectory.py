@@ -0,0 +1,177 @@
+import abc
+
+import numpy as np
+
+# Trajectory sinks: the integrators hand every recorded state to sink.append(record) (or blocks of them to
+# sink.extend(records)) instead of collecting a list, so the memory of a run no longer grows with its length.
+# Every record has the same shape and dtype (e.g. (N, 3) floats, or a structured row of ode_core).
+#   NpySink    - append-only .npy file written in chunks; np.load(path, mmap_mode='r') sees the rows written
+#                so far while the run goes on
+#   HDF5Sink   - resizable HDF5 dataset in single-writer-multiple-reader mode (needs h5py)
+#   RingBuffer - the last `capacity` of every `every`-th records in memory
+# open_trajectory(path) reads the rows written so far from either kind of file.
+
+
+class TrajectorySink(abc.ABC):
+    # Buffers records in chunks of `chunk` and passes full chunks to _write, which every backend implements
+    def __init__(self, shape=(), dtype=float, chunk=4096):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.empty((chunk,) + self.shape, dtype=self.dtype)
+        self._buffered = 0
+        self.written = 0  # Rows handed to _write so far
+
+    def append(self, record):
+        self._buffer[self._buffered] = record
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def extend(self, records):
+        for start in range(0, len(records), len(self._buffer)):
+            block = records[start:start + len(self._buffer)]
+            if self._buffered + len(block) > len(self._buffer):
+                self.flush()
+            if len(block) == len(self._buffer):
+                self._write(block)
+                self.written += len(block)
+            else:
+                self._buffer[self._buffered:self._buffered + len(block)] = block
+                self._buffered += len(block)
+                if self._buffered == len(self._buffer):
+                    self.flush()
+
+    def flush(self):
+        if self._buffered:
+            self._write(self._buffer[:self._buffered])
+            self.written += self._buffered
+            self._buffered = 0
+
+    def close(self):
+        self.flush()
+
+    def __len__(self):
+        return self.written + self._buffered
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abc.abstractmethod
+    def _write(self, rows):
+        # Store a block of rows after the self.written rows stored so far
+        ...
+
+
+class NpySink(TrajectorySink):
+    # The header is written with a fixed size, large enough for any row count, and rewritten after every chunk,
+    # so the file is a valid .npy of the rows written so far at all times
+    def __init__(self, path, shape=(), dtype=float, chunk=4096):
+        super().__init__(shape, dtype, chunk)
+        self.path = path
+        self._file = open(path, 'wb')
+        self._header_size = len(self._header(10**18, pad=False))
+        self._header_size += -self._header_size % 64
+        self._file.write(self._header(0))
+        self._file.flush()
+
+    def _header(self, rows, pad=True):
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                       'shape': (rows,) + self.shape})
+        prefix = 10  # Magic string, version and header length
+        if pad:
+            header = header.ljust(self._header_size - prefix - 1)
+        header = (header + '\n').encode('latin1')
+        return np.lib.format.magic(1, 0) + len(header).to_bytes(2, 'little') + header
+
+    def _write(self, rows):
+        self._file.seek(0, 2)
+        self._file.write(np.ascontiguousarray(rows, dtype=self.dtype).tobytes())
+        self._file.flush()
+        self._file.seek(0)
+        self._file.write(self._header(self.written + len(rows)))  # Rows become visible only once written
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            super().close()
+            self._file.close()
+
+
+class HDF5Sink(TrajectorySink):
+    def __init__(self, path, shape=(), dtype=float, chunk=4096, dataset='trajectory'):
+        import h5py  # Optional dependency, only needed for this backend
+        super().__init__(shape, dtype, chunk)
+        self.path = path
+        self._file = h5py.File(path, 'w', libver='latest')
+        self._dataset = self._file.create_dataset(dataset, shape=(0,) + self.shape, maxshape=(None,) + self.shape,
+                                                  dtype=self.dtype, chunks=(chunk,) + self.shape)
+        self._file.swmr_mode = True  # Readers can open the file while it is being written
+
+    def _write(self, rows):
+        self._dataset.resize(self.written + len(rows), axis=0)
+        self._dataset[self.written:] = rows
+        self._dataset.flush()
+
+    def close(self):
+        if self._file:
+            super().close()
+            self._file.close()
+            self._file = None
+
+
+class RingBuffer(TrajectorySink):
+    # Keeps every `every`-th record, and of those only the last `capacity`
+    def __init__(self, capacity, shape=(), dtype=float, every=1):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.every = every
+        self._data = np.empty((capacity,) + self.shape, dtype=self.dtype)
+        self._seen = 0     # Records offered
+        self.written = 0   # Records kept (including the ones overwritten since)
+
+    def append(self, record):
+        if self._seen % self.every == 0:
+            self._data[self.written % len(self._data)] = record
+            self.written += 1
+        self._seen += 1
+
+    def extend(self, records):
+        kept = records[-self._seen % self.every::self.every]
+        self._seen += len(records)
+        self._write(kept)
+
+    def _write(self, rows):
+        # Into the ring, over the oldest records
+        if len(rows) > len(self._data):  # Older ones would be overwritten within this block anyway
+            self.written += len(rows) - len(self._data)
+            rows = rows[-len(self._data):]
+        position = self.written % len(self._data)
+        head = min(len(rows), len(self._data) - position)
+        self._data[position:position + head] = rows[:head]
+        self._data[:len(rows) - head] = rows[head:]
+        self.written += len(rows)
+
+    def flush(self):
+        pass
+
+    def __len__(self):
+        return min(self.written, len(self._data))
+
+    def array(self):
+        # The kept records, oldest first (a copy)
+        if self.written <= len(self._data):
+            return self._data[:self.written].copy()
+        position = self.written % len(self._data)
+        return np.concatenate([self._data[position:], self._data[:position]])
+
+
+def open_trajectory(path, dataset='trajectory'):
+    # Rows written so far to a NpySink (.npy, memory-mapped) or HDF5Sink (.h5/.hdf5) file, also during a run
+    if str(path).endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    import h5py
+    with h5py.File(path, 'r', libver='latest', swmr=True) as file:
+        return file[dataset][...]